@@ -0,0 +1,79 @@
+"""Micro-benchmark for curtain_wall.util.math_utils: list, NumPy and JIT kernels."""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+CURTAIN_WALL_DIR = Path(__file__).resolve().parents[1] / "core_curtain_wall_system" / "curtain_wall"
+sys.path.insert(0, str(CURTAIN_WALL_DIR))
+
+from util import math_utils, numeric_kernels  # noqa: E402
+
+
+def _legacy_standard_deviation(array: list) -> float:
+    """Two-pass list implementation kept as the baseline."""
+    if not array or len(array) == 1:
+        return 0.0
+    avg = sum(array) / len(array)
+    variance = sum((x - avg) ** 2 for x in array) / len(array)
+    return variance ** 0.5
+
+
+def _best_of(func, repeat: int) -> float:
+    """Best wall time of `repeat` single calls, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(size: int, repeat: int) -> list[dict]:
+    rng = np.random.default_rng(2024)
+    array = rng.normal(200.0, 35.0, size)
+    values = array.tolist()
+
+    cases = {
+        "std / list two-pass": lambda: _legacy_standard_deviation(values),
+        "std / list Welford": lambda: math_utils.standard_deviation(values),
+        "std / numpy": lambda: numeric_kernels.mean_variance(array, use_jit=False),
+        "clamp / list": lambda: [math_utils.clamp(v, 150.0, 250.0) for v in values],
+        "clamp / numpy": lambda: numeric_kernels.clamp_array(array, 150.0, 250.0, use_jit=False),
+        "clamp+normalize / numpy": lambda: numeric_kernels.normalize_array(
+            numeric_kernels.clamp_array(array, 150.0, 250.0, use_jit=False), 150.0, 250.0, use_jit=False
+        ),
+        "clamp_normalize fused / numpy": lambda: numeric_kernels.clamp_normalize(array, 150.0, 250.0, use_jit=False),
+    }
+    if numeric_kernels.HAS_NUMBA:
+        # Warm up so JIT compilation is not timed.
+        numeric_kernels.mean_variance(array[:8])
+        numeric_kernels.clamp_array(array[:8], 0.0, 1.0)
+        numeric_kernels.clamp_normalize(array[:8], 0.0, 1.0)
+        cases.update({
+            "std / jit Welford": lambda: numeric_kernels.mean_variance(array),
+            "clamp / jit": lambda: numeric_kernels.clamp_array(array, 150.0, 250.0),
+            "clamp_normalize fused / jit": lambda: numeric_kernels.clamp_normalize(array, 150.0, 250.0),
+        })
+
+    results = []
+    for name, func in cases.items():
+        seconds = _best_of(func, repeat)
+        results.append({"case": name, "size": size, "seconds": seconds, "rowsPerSecond": size / seconds})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"numba available: {numeric_kernels.HAS_NUMBA}")
+    for size in args.sizes:
+        for row in run(size, args.repeat):
+            print(f"{row['size']:>10,}  {row['case']:<32} {row['seconds'] * 1e3:10.3f} ms  "
+                  f"{row['rowsPerSecond'] / 1e6:10.1f} M rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Load test for curtain_wall/eval_server.py: concurrent single-design requests against localhost."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+import numpy as np
+
+
+async def _worker(session: aiohttp.ClientSession, url: str, count: int, rng: np.random.Generator,
+                  latencies: list[float], errors: list[str]) -> None:
+    for _ in range(count):
+        payload = {
+            "height": float(rng.uniform(1500, 4500)),
+            "width": float(rng.uniform(800, 2200)),
+            "material_strength": float(rng.uniform(150, 350)),
+            "facade_curvature": float(rng.uniform(0, 0.2)),
+        }
+        started = time.perf_counter()
+        async with session.post(url, json=payload) as response:
+            if response.status != 200:
+                # Error bodies are not always JSON (e.g. aiohttp's plain-text 4xx/5xx pages).
+                if response.content_type == "application/json":
+                    errors.append((await response.json()).get("error", str(response.status)))
+                else:
+                    errors.append(f"{response.status}: {(await response.text())[:200]}")
+            else:
+                await response.read()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, requests: int, concurrency: int, seed: int) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(session, f"{base_url}/evaluate", count, np.random.default_rng([seed, i]), latencies, errors)
+            for i, count in enumerate(per_worker)
+        ))
+        elapsed = time.perf_counter() - started
+        async with session.get(f"{base_url}/metrics") as response:
+            server_metrics = await response.json()
+
+    latency_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requestsPerSecond": len(latencies) / elapsed,
+        "clientLatencyMs": {
+            "p50": float(np.percentile(latency_ms, 50)),
+            "p99": float(np.percentile(latency_ms, 99)),
+        },
+        "server": server_metrics,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url.rstrip("/"), args.requests, args.concurrency, args.seed))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""Benchmark suite for every pipeline stage across data sizes.
+
+`run` times the compute methods of the five pipeline modules (charts disabled, no simulate_process sleeps),
+the curtain_wall processors and scripts/generate_initial_data at 10^3 .. 10^7 samples with fixed seeds.
+Each (case, size) job runs in a fresh process; per-stage wall time, rows/s and tracemalloc peak memory come
+from the project's StageProfiler. `compare` flags regressions of a result file against a stored baseline;
+`save-baseline` promotes a result file to that baseline (typical flow: `run`, `save-baseline`, change code,
+`run`, `compare`).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: no max-RSS figure
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[1]
+CORE_DIR = ROOT / "core_curtain_wall_system"
+sys.path[:0] = [str(CORE_DIR), str(CORE_DIR / "curtain_wall"), str(ROOT / "scripts")]
+
+import generate_initial_data as gid  # noqa: E402
+from data_generator import (generate_association_rules, generate_basic_parameters,  # noqa: E402
+                            generate_construction_data)
+from data_association import DataAssociationModule  # noqa: E402
+from error_correction import ErrorCorrectionModule  # noqa: E402
+from log_writer import configure_logging  # noqa: E402
+from model.parameter import Parameter  # noqa: E402
+from parameter_input import ParameterInputModule  # noqa: E402
+from processor.batch_evaluator import BatchEvaluator  # noqa: E402
+from processor.data_associator import DataAssociator  # noqa: E402
+from processor.error_corrector import ErrorCorrector  # noqa: E402
+from processor.parameter_input_processor import ParameterInputProcessor  # noqa: E402
+from processor.structure_verifier import StructureVerifier  # noqa: E402
+from processor.unit_generator import UnitGenerator  # noqa: E402
+from profiler import profiler  # noqa: E402
+from structure_verification import StructureVerificationModule  # noqa: E402
+from unit_generation import UnitGenerationModule  # noqa: E402
+
+DEFAULT_SIZES = [10 ** k for k in range(3, 8)]
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "latest.json"
+DEFAULT_BASELINE = ROOT / "benchmarks" / "results" / "baseline.json"
+
+# Stages that build one Python object per sample are only run up to this size.
+OBJECT_LIMIT = 100_000
+
+# Regression thresholds for `compare`: relative slow-down / memory growth, and a noise floor in seconds.
+TIME_THRESHOLD = 0.10
+MEMORY_THRESHOLD = 0.20
+MIN_SECONDS = 0.005
+
+
+def _pipeline_job(size: int, seed: int) -> list[str]:
+    """The five pipeline modules, calling the compute methods that run() would call, in the same order."""
+    np.random.seed(seed)
+    with profiler.measure("data_generator.generate_basic_parameters", size):
+        basic_params = generate_basic_parameters(size)
+    with profiler.measure("data_generator.generate_construction_data", size):
+        construction_data = generate_construction_data(size)
+
+    param_module = ParameterInputModule(basic_params, generate_association_rules(), render_charts=False)
+    param_module.analyze_matching_degree()
+    processed_params = param_module.generate_processed_dataset()
+
+    unit_module = UnitGenerationModule(processed_params, render_charts=False)
+    unit_module.extract_geometric_features()
+    unit_results = unit_module.generate_unit_shape()
+
+    structure_module = StructureVerificationModule(unit_results, render_charts=False)
+    structure_module.extract_force_and_stress()
+    optimized_params = structure_module.generate_optimized_parameters()
+
+    error_module = ErrorCorrectionModule(optimized_params, render_charts=False)
+    error_module.analyze_deviations()
+    correction_data = error_module.generate_correction_data()
+
+    association_module = DataAssociationModule(correction_data, construction_data, render_charts=False)
+    association_module.analyze_association()
+    association_module.generate_association_record()
+    return []
+
+
+def _processor_columns(size: int, seed: int) -> dict:
+    # Same input ranges as benchmarks/load_test_eval_server.py.
+    rng = np.random.default_rng(seed)
+    return {
+        "height": rng.uniform(1500, 4500, size),
+        "width": rng.uniform(800, 2200, size),
+        "material_strength": rng.uniform(150, 350, size),
+        "facade_curvature": rng.uniform(0, 0.2, size),
+    }
+
+
+def _processors_job(size: int, seed: int) -> list[str]:
+    """curtain_wall: the vectorised BatchEvaluator at every size, the per-object processors up to OBJECT_LIMIT."""
+    columns = _processor_columns(size, seed)
+    evaluator = BatchEvaluator()
+    # Warm up so JIT compilation of the numeric kernels is not timed.
+    evaluator.evaluate({name: values[:8] for name, values in columns.items()})
+    with profiler.measure("BatchEvaluator.evaluate", size):
+        evaluator.evaluate(columns)
+    if size > OBJECT_LIMIT:
+        return [f"per-object processors skipped above {OBJECT_LIMIT:,} samples"]
+
+    params = []
+    for values in zip(*(columns[name] for name in ("height", "width", "material_strength", "facade_curvature"))):
+        param = Parameter()
+        param.height, param.width, param.material_strength, param.facade_curvature = map(float, values)
+        params.append(param)
+    stages = [
+        ("ParameterInputProcessor.process", ParameterInputProcessor().process),
+        ("UnitGenerator.generate", UnitGenerator().generate),
+        ("StructureVerifier.verify", StructureVerifier().verify),
+        ("ErrorCorrector.correct", ErrorCorrector().correct),
+        ("DataAssociator.associate", DataAssociator().associate),
+    ]
+    items = params
+    for stage, func in stages:
+        with profiler.measure(stage, size):
+            items = [func(item) for item in items]
+    return []
+
+
+def _profile_arrays(size: int, seed: int) -> dict:
+    """Column arrays with the distribution of gid.generate_sample_profiles, without building DesignProfile objects."""
+    rng = np.random.default_rng(seed)
+    arrays = {}
+    for key, rule in gid.RULE_SET.items():
+        margin = (rule["max"] - rule["min"]) * 0.1
+        arrays[key] = np.round(rng.uniform(rule["min"] - margin, rule["max"] + margin, size), 4)
+    arrays["wind_speed"] = np.round(rng.uniform(25, 50, size), 4)
+    arrays["thermal_gradient"] = np.round(rng.uniform(8, 24, size), 4)
+    densities = np.array(list(gid.MATERIAL_DENSITY.values()))
+    arrays["density"] = densities[rng.integers(0, len(densities), size)]
+    return arrays
+
+
+def _generate_initial_data_job(size: int, seed: int) -> list[str]:
+    """scripts/generate_initial_data: the batch kernels at every size, build_portfolio up to OBJECT_LIMIT."""
+    arrays = _profile_arrays(size, seed)
+    with profiler.measure("generate_initial_data.analyze_parameter_integrity_batch", size):
+        gid.analyze_parameter_integrity_batch(arrays)
+    with profiler.measure("generate_initial_data.generate_unit_geometry_batch", size):
+        geometry = gid.generate_unit_geometry_batch(arrays)
+    with profiler.measure("generate_initial_data.run_structural_verification_batch", size):
+        gid.run_structural_verification_batch(arrays, geometry)
+    with profiler.measure("generate_initial_data.compute_error_correction_batch", size):
+        corrections = gid.compute_error_correction_batch(arrays, geometry)
+    with profiler.measure("generate_initial_data.build_data_association_batch", size):
+        gid.build_data_association_batch(arrays, corrections)
+    if size > OBJECT_LIMIT:
+        return [f"build_portfolio skipped above {OBJECT_LIMIT:,} samples"]
+    profiles = gid.generate_sample_profiles(size, seed)
+    with profiler.measure("generate_initial_data.build_portfolio", size):
+        gid.build_portfolio(profiles, workers=1)
+    return []
+
+
+def _build_dataset_job(size: int, seed: int) -> list[str]:
+    """The seed dataset has a fixed set of profiles, so this case ignores the requested size."""
+    with profiler.measure("generate_initial_data.build_dataset", len(gid.build_profiles())):
+        gid.build_dataset()
+    return []
+
+
+CASES = {
+    "pipeline": _pipeline_job,
+    "processors": _processors_job,
+    "generate_initial_data": _generate_initial_data_job,
+    "build_dataset": _build_dataset_job,
+}
+# Cases whose input size is fixed by the code under test: run once at that size.
+FIXED_SIZE_CASES = {"build_dataset": lambda: len(gid.build_profiles())}
+
+
+def _run_job(case: str, size: int, seed: int, repeat: int, trace_memory: bool) -> dict:
+    """Runs in a fresh worker process: `repeat` untraced runs for timing, then one traced run for peak memory."""
+    configure_logging(stream=open(os.devnull, "w"), progress_enabled=False)
+    job = CASES[case]
+    stages: dict[str, dict] = {}
+    notes: list[str] = []
+    for _ in range(repeat):
+        profiler.reset()
+        profiler.enable()
+        notes = job(size, seed)
+        order = list(dict.fromkeys(record["阶段"] for record in profiler.records))
+        for item in sorted(profiler.summary(), key=lambda item: order.index(item["阶段"])):
+            best = stages.get(item["阶段"])
+            if best is None or item["墙钟时间(秒)"] < best["seconds"]:
+                stages[item["阶段"]] = {"stage": item["阶段"], "rows": item["处理行数"], "calls": item["调用次数"],
+                                        "seconds": item["墙钟时间(秒)"], "cpuSeconds": item["CPU时间(秒)"],
+                                        "rowsPerSecond": item["吞吐量(行/秒)"], "peakMemoryBytes": None}
+        profiler.disable()
+    if trace_memory:
+        profiler.reset()
+        profiler.enable(trace_memory=True)
+        job(size, seed)
+        for item in profiler.summary():
+            if item["阶段"] in stages:
+                stages[item["阶段"]]["peakMemoryBytes"] = item["内存峰值(字节)"]
+        profiler.disable()
+    # ru_maxrss is in KiB on Linux; the worker is fresh, so this is the job's own peak.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+    return {"stages": list(stages.values()), "notes": notes, "maxRssBytes": max_rss}
+
+
+def run_suite(cases: list[str], sizes: list[int], seed: int, repeat: int, trace_memory: bool) -> dict:
+    results, jobs = [], []
+    for case in cases:
+        for size in ([FIXED_SIZE_CASES[case]()] if case in FIXED_SIZE_CASES else sizes):
+            started = time.perf_counter()
+            job = {"case": case, "size": size, "status": "ok"}
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    outcome = executor.submit(_run_job, case, size, seed, repeat, trace_memory).result()
+            except BrokenProcessPool:
+                job.update(status="failed", reason="worker process died (likely out of memory)")
+                outcome = None
+            except MemoryError:
+                job.update(status="failed", reason="MemoryError")
+                outcome = None
+            except Exception as exc:
+                job.update(status="failed", reason=repr(exc))
+                outcome = None
+            job["seconds"] = time.perf_counter() - started
+            if outcome:
+                job.update(maxRssBytes=outcome["maxRssBytes"], notes=outcome["notes"])
+                for stage in outcome["stages"]:
+                    results.append({"case": case, "size": size, **stage})
+                    _print_row(results[-1])
+            else:
+                print(f"{case:<22} {size:>12,}  {job['status']}: {job['reason']}")
+            jobs.append(job)
+    return {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "cpuCount": os.cpu_count(),
+        "seed": seed,
+        "repeat": repeat,
+        "traceMemory": trace_memory,
+        "jobs": jobs,
+        "results": results,
+    }
+
+
+def _print_row(row: dict) -> None:
+    memory = f"{row['peakMemoryBytes'] / 2 ** 20:9.1f} MiB" if row.get("peakMemoryBytes") is not None else " " * 13
+    print(f"{row['case']:<22} {row['size']:>12,}  {row['stage']:<58} {row['seconds'] * 1e3:11.2f} ms "
+          f"{row['rowsPerSecond'] / 1e6:9.3f} M rows/s {memory}")
+
+
+def compare(baseline: dict, current: dict, time_threshold: float = TIME_THRESHOLD,
+            memory_threshold: float = MEMORY_THRESHOLD, min_seconds: float = MIN_SECONDS) -> list[dict]:
+    """Entries whose time or peak memory grew beyond the thresholds; timings under min_seconds are ignored as noise.
+
+    Baseline stages missing from a job that ran successfully in the current file are reported with metric "missing".
+    """
+    key = lambda row: (row["case"], row["stage"], row["size"])
+    previous = {key(row): row for row in baseline["results"]}
+    regressions = []
+    present = {key(row) for row in current["results"]}
+    current_ok = {(job["case"], job["size"]) for job in current.get("jobs", []) if job["status"] == "ok"}
+    for base in baseline["results"]:
+        if key(base) not in present and (base["case"], base["size"]) in current_ok:
+            regressions.append({**_ident(base), "metric": "missing", "baseline": base["seconds"],
+                                "current": None, "ratio": None})
+    for row in current["results"]:
+        base = previous.get(key(row))
+        if base is None:
+            continue
+        if max(row["seconds"], base["seconds"]) >= min_seconds and row["seconds"] > base["seconds"] * (1 + time_threshold):
+            regressions.append({**_ident(row), "metric": "seconds", "baseline": base["seconds"],
+                                "current": row["seconds"], "ratio": row["seconds"] / base["seconds"]})
+        if row.get("peakMemoryBytes") and base.get("peakMemoryBytes") and \
+                row["peakMemoryBytes"] > base["peakMemoryBytes"] * (1 + memory_threshold):
+            regressions.append({**_ident(row), "metric": "peakMemoryBytes", "baseline": base["peakMemoryBytes"],
+                                "current": row["peakMemoryBytes"], "ratio": row["peakMemoryBytes"] / base["peakMemoryBytes"]})
+    return regressions
+
+
+def _ident(row: dict) -> dict:
+    return {"case": row["case"], "stage": row["stage"], "size": row["size"]}
+
+
+def _load(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write a JSON result file")
+    run_parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--seed", type=int, default=2024)
+    run_parser.add_argument("--repeat", type=int, default=1, help="untraced runs per job; the best time is kept")
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    run_parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline result file")
+    compare_parser.add_argument("current", type=Path, nargs="?", default=DEFAULT_OUTPUT)
+    compare_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    compare_parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    compare_parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    compare_parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS)
+
+    save_parser = commands.add_parser("save-baseline", help="store a result file as the baseline for compare")
+    save_parser.add_argument("current", type=Path, nargs="?", default=DEFAULT_OUTPUT)
+    save_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(args.cases, sorted(args.sizes), args.seed, args.repeat, not args.no_memory)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"results written to {args.output}")
+        return 0
+
+    if not args.current.exists():
+        print(f"no result file at {args.current}; create one with `run_benchmarks.py run`", file=sys.stderr)
+        return 2
+    if args.command == "save-baseline":
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(args.current, args.baseline)
+        print(f"baseline saved: {args.current} -> {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; store one with `run_benchmarks.py save-baseline [RESULT]`",
+              file=sys.stderr)
+        return 2
+
+    baseline, current = _load(args.baseline), _load(args.current)
+    regressions = compare(baseline, current, args.time_threshold, args.memory_threshold, args.min_seconds)
+    for item in regressions:
+        if item["metric"] == "missing":
+            print(f"MISSING    {item['case']:<22} {item['size']:>12,}  {item['stage']:<58} stage not in current run")
+            continue
+        print(f"REGRESSION {item['case']:<22} {item['size']:>12,}  {item['stage']:<58} {item['metric']:<16} "
+              f"{item['baseline']:.4g} -> {item['current']:.4g} (x{item['ratio']:.2f})")
+    # A job that also failed in the baseline (e.g. the size does not fit in this machine's memory) is not a regression.
+    baseline_ok = {(job["case"], job["size"]) for job in baseline.get("jobs", []) if job["status"] == "ok"}
+    failed = [job for job in current.get("jobs", []) if job["status"] != "ok" and (job["case"], job["size"]) in baseline_ok]
+    for job in failed:
+        print(f"FAILED     {job['case']:<22} {job['size']:>12,}  {job.get('reason', '')}")
+    print(f"{len(regressions)} regression(s), {len(failed)} failed job(s) against {args.baseline}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
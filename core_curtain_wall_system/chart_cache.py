@@ -0,0 +1,115 @@
+"""
+图表内容哈希缓存：对每张图表的输入列与样式参数计算哈希并写入图表目录下的清单文件，
+哈希未变化且图片仍存在时跳过重新渲染
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+import charting
+
+# 绘图代码修改后递增，使已有缓存全部失效
+CHART_CODE_VERSION = 1
+
+MANIFEST_NAME = 'chart_manifest.json'
+
+
+def _column_bytes(values):
+    """将一列数据转换为稳定的字节序列"""
+    if hasattr(values, 'cat'):
+        values = values.cat.codes
+    array = np.asarray(values)
+    if array.dtype == object:
+        return '\x1f'.join(map(str, array.tolist())).encode('utf-8')
+    return np.ascontiguousarray(array).tobytes()
+
+
+def chart_key(inputs, style):
+    """计算图表哈希：输入列（按名称排序）+ 样式参数 + 渲染设置"""
+    digest = hashlib.sha256()
+    rows = max((len(values) for values in inputs.values()), default=0)
+    settings = {
+        'version': CHART_CODE_VERSION,
+        'style': style,
+        'aggregated': charting.use_aggregation(rows),
+        'bins': [charting.DENSITY_BINS_2D, charting.DENSITY_BINS_3D],
+    }
+    digest.update(json.dumps(settings, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+    for name in sorted(inputs):
+        values = inputs[name]
+        digest.update(name.encode('utf-8'))
+        digest.update(str(np.asarray(values).dtype).encode('utf-8'))
+        digest.update(_column_bytes(values))
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """图表缓存，按图片所在目录维护清单文件"""
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def render(self, path, inputs, style, draw):
+        """哈希命中且图片存在时跳过，否则调用 draw() 渲染并更新清单；返回是否重新渲染"""
+        key = chart_key(inputs, style)
+        directory = os.path.dirname(path) or '.'
+        name = os.path.basename(path)
+        with self._lock:
+            manifest = self._manifest(directory)
+            entry = manifest.get(name)
+            if self.enabled and entry and entry.get('hash') == key and os.path.exists(path):
+                self.hits += 1
+                return False
+
+        draw()
+
+        with self._lock:
+            self.misses += 1
+            manifest[name] = {
+                'hash': key,
+                'rows': max((len(values) for values in inputs.values()), default=0),
+                'renderedAt': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+            }
+            self._save_manifest(directory, manifest)
+        return True
+
+    def stats(self):
+        """返回命中与未命中统计"""
+        total = self.hits + self.misses
+        return {
+            '命中': self.hits,
+            '未命中': self.misses,
+            '命中率': self.hits / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _manifest(self, directory):
+        directory = os.path.abspath(directory)
+        if directory not in self._manifests:
+            path = os.path.join(directory, MANIFEST_NAME)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._manifests[directory] = json.load(f)
+            except (OSError, ValueError):
+                self._manifests[directory] = {}
+        return self._manifests[directory]
+
+    def _save_manifest(self, directory, manifest):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, MANIFEST_NAME)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+# 全局图表缓存
+chart_cache = ChartCache()
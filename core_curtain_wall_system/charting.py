@@ -0,0 +1,110 @@
+"""
+图表聚合渲染：样本数超过阈值时先用 NumPy 将散点分箱为二维/三维直方图，再绘制密度图像，
+绘图开销只与分箱数相关，不再随样本数增长
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+
+# 超过该样本数时自动切换为聚合渲染，None 表示始终绘制原始散点
+AGGREGATION_THRESHOLD = 100000
+
+# 二维与三维分箱数
+DENSITY_BINS_2D = 200
+DENSITY_BINS_3D = 24
+
+
+def set_aggregation_threshold(threshold):
+    """设置聚合渲染阈值"""
+    global AGGREGATION_THRESHOLD
+    AGGREGATION_THRESHOLD = threshold
+
+
+def use_aggregation(num_samples):
+    """判断当前样本数是否采用聚合渲染"""
+    return AGGREGATION_THRESHOLD is not None and num_samples > AGGREGATION_THRESHOLD
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def _extent(values):
+    low, high = float(np.nanmin(values)), float(np.nanmax(values))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+def bin_2d(x, y, c=None, bins=DENSITY_BINS_2D, x_range=None, y_range=None):
+    """二维分箱，返回计数、颜色均值（c 为空时为 None）与坐标范围"""
+    x, y = _as_array(x), _as_array(y)
+    x_range = x_range or _extent(x)
+    y_range = y_range or _extent(y)
+    counts, _, _ = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+    means = None
+    if c is not None:
+        sums, _, _ = np.histogram2d(x, y, bins=bins, range=[x_range, y_range], weights=_as_array(c))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+    return counts, means, (x_range[0], x_range[1], y_range[0], y_range[1])
+
+
+def density_image(x, y, c=None, cmap='viridis', ax=None, bins=DENSITY_BINS_2D,
+                  x_range=None, y_range=None, alpha=1.0):
+    """绘制二维密度图：有 c 时显示各分箱 c 的均值，否则显示对数计数"""
+    ax = ax or plt.gca()
+    counts, means, extent = bin_2d(x, y, c, bins=bins, x_range=x_range, y_range=y_range)
+    values = means if means is not None else np.log10(counts + 1)
+    image = np.ma.masked_where(counts == 0, values).T
+    return ax.imshow(image, origin='lower', extent=extent, aspect='auto',
+                     cmap=cmap, interpolation='nearest', alpha=alpha)
+
+
+def scatter(x, y, c=None, cmap='viridis', colorbar_label=None, s=50, alpha=0.7):
+    """散点图，样本数超过阈值时改为密度图"""
+    if use_aggregation(len(x)):
+        mappable = density_image(x, y, c, cmap=cmap if c is not None else 'Blues')
+        label = colorbar_label if c is not None else 'log10(样本数+1)'
+    else:
+        mappable = plt.scatter(x, y, c=c, cmap=cmap, s=s, alpha=alpha)
+        label = colorbar_label
+    if label is not None:
+        plt.colorbar(mappable, label=label)
+    return mappable
+
+
+def grouped_scatter(groups):
+    """分组散点图，groups 为 (x, y, 颜色, 图例) 列表；样本数超过阈值时各组绘制为半透明密度图"""
+    total = sum(len(x) for x, _, _, _ in groups)
+    if not use_aggregation(total):
+        for x, y, color, label in groups:
+            plt.scatter(x, y, c=color, label=label, alpha=0.7)
+        return
+
+    non_empty = [(x, y) for x, y, _, _ in groups if len(x)]
+    x_range = _extent(np.concatenate([_as_array(x) for x, _ in non_empty]))
+    y_range = _extent(np.concatenate([_as_array(y) for _, y in non_empty]))
+    for x, y, color, label in groups:
+        if not len(x):
+            continue
+        cmap = {'green': 'Greens', 'red': 'Reds'}.get(color, 'Greys')
+        density_image(x, y, cmap=cmap, x_range=x_range, y_range=y_range, alpha=0.6)
+        # 空的填充区域作为图例代理，调用方的 plt.legend() 可直接收录
+        plt.fill_between([], [], color=color, alpha=0.6, label=label)
+
+
+def scatter_3d(ax, x, y, z, c, cmap='plasma', s=50, alpha=0.7, bins=DENSITY_BINS_3D):
+    """三维散点图，样本数超过阈值时按三维分箱绘制体素中心，点大小表示样本数"""
+    if not use_aggregation(len(x)):
+        return ax.scatter(x, y, z, c=c, cmap=cmap, s=s, alpha=alpha)
+
+    points = np.column_stack([_as_array(x), _as_array(y), _as_array(z)])
+    ranges = [_extent(points[:, i]) for i in range(3)]
+    counts, edges = np.histogramdd(points, bins=bins, range=ranges)
+    sums, _ = np.histogramdd(points, bins=bins, range=ranges, weights=_as_array(c))
+    occupied = np.nonzero(counts)
+    centers = [(edge[:-1] + edge[1:]) / 2 for edge in edges]
+    occupied_counts = counts[occupied]
+    sizes = 10 + 80 * np.log1p(occupied_counts) / np.log1p(occupied_counts.max())
+    return ax.scatter(centers[0][occupied[0]], centers[1][occupied[1]], centers[2][occupied[2]],
+                      c=sums[occupied] / occupied_counts, cmap=cmap, s=sizes, alpha=alpha)
@@ -0,0 +1,136 @@
+"""
+阶段输出列式检查点：每个阶段的数据表按列写为 .npy 文件（字符串/分类列存为整数编码 + 取值表），
+并写入逐行哈希；读取时以内存映射按需加载单列，对比两次运行时无需构建完整的 pandas 数据表
+"""
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from profiler import profiler
+
+STAGE_MANIFEST = 'manifest.json'
+ROW_HASH_FILE = 'row_hash.npy'
+KEY_COLUMN = '样本编号'
+
+# 行哈希的乘法常数（64 位黄金分割数）与缺失编码的哈希值
+_HASH_PRIME = np.uint64(0x9E3779B97F4A7C15)
+_MISSING_HASH = np.uint64(0x5851F42D4C957F2D)
+
+
+def _encode_column(series):
+    """返回 (数组, 取值表)：数值与布尔列原样保存，分类/字符串列转为 int32 编码，缺失编码为 -1"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int32), [str(c) for c in series.cat.categories]
+    if series.dtype == bool or pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(), None
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int32), [str(u) for u in uniques]
+
+
+def _string_hashes(categories):
+    """取值表中每个字符串的 64 位哈希，使编码顺序不同的两次运行得到相同的行哈希"""
+    digests = [hashlib.blake2b(c.encode('utf-8'), digest_size=8).digest() for c in categories]
+    return np.frombuffer(b''.join(digests), dtype=np.uint64).copy() if digests else np.zeros(0, dtype=np.uint64)
+
+
+def column_words(values, categories=None):
+    """将一列转换为 uint64 字（行哈希的输入）：浮点统一 -0.0 与 NaN，整数/布尔按值，编码列按取值字符串"""
+    if categories is not None:
+        table = np.append(_string_hashes(categories), _MISSING_HASH)
+        return table[np.asarray(values)]  # 编码 -1 取表尾的缺失哈希
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        words = values.astype(np.float64) + 0.0
+        words[np.isnan(words)] = np.nan
+        return words.view(np.uint64)
+    return values.astype(np.int64).view(np.uint64)
+
+
+def row_hashes(columns):
+    """逐行组合各列的 uint64 字得到行哈希；columns 为 (数组, 取值表) 的有序列表"""
+    h = None
+    with np.errstate(over='ignore'):
+        for values, categories in columns:
+            words = column_words(values, categories)
+            if h is None:
+                h = np.full(len(words), _HASH_PRIME, dtype=np.uint64)
+            h ^= words
+            h *= _HASH_PRIME
+            h ^= h >> np.uint64(32)
+    return h if h is not None else np.zeros(0, dtype=np.uint64)
+
+
+def save_checkpoint(directory, stage, frame):
+    """将阶段输出写为 directory/stage/ 下的列式检查点，返回写入的字节数"""
+    stage_dir = os.path.join(directory, stage)
+    os.makedirs(stage_dir, exist_ok=True)
+    columns = []
+    encoded = []
+    with profiler.measure('checkpoint.save_checkpoint', len(frame)):
+        for k, name in enumerate(frame.columns):
+            values, categories = _encode_column(frame[name])
+            file_name = f'c{k:03d}.npy'
+            np.save(os.path.join(stage_dir, file_name), values)
+            columns.append({'名称': str(name), '文件': file_name, '类型': values.dtype.str, '取值表': categories})
+            if name != KEY_COLUMN:
+                encoded.append((values, categories))
+        np.save(os.path.join(stage_dir, ROW_HASH_FILE), row_hashes(encoded))
+        manifest = {'阶段': stage, '行数': len(frame), '列': columns}
+        # 清单最后原子写入，中断时不会留下与列文件不一致的清单
+        fd, tmp_path = tempfile.mkstemp(dir=stage_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(stage_dir, STAGE_MANIFEST))
+    return sum(os.path.getsize(os.path.join(stage_dir, name)) for name in os.listdir(stage_dir))
+
+
+class Checkpoint:
+    """一次运行的检查点目录；列以内存映射方式按需读取"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifests = {}
+        for stage in sorted(os.listdir(directory)):
+            path = os.path.join(directory, stage, STAGE_MANIFEST)
+            if os.path.isfile(path):
+                with open(path, encoding='utf-8') as f:
+                    self.manifests[stage] = json.load(f)
+        if not self.manifests:
+            raise FileNotFoundError(f"{directory} 中没有阶段检查点")
+
+    @property
+    def stages(self):
+        return list(self.manifests)
+
+    def rows(self, stage):
+        return self.manifests[stage]['行数']
+
+    def columns(self, stage):
+        return [column['名称'] for column in self.manifests[stage]['列']]
+
+    def column(self, stage, name):
+        """返回 (内存映射数组, 取值表)；数值列的取值表为 None"""
+        for column in self.manifests[stage]['列']:
+            if column['名称'] == name:
+                values = np.load(os.path.join(self.directory, stage, column['文件']), mmap_mode='r')
+                return values, column['取值表']
+        raise KeyError(f"阶段 {stage} 中没有列 {name}")
+
+    def row_hash(self, stage, columns=None):
+        """逐行哈希；columns 与写入时的列集合一致时直接读取已保存的哈希，否则按给定列重新计算"""
+        saved = [name for name in self.columns(stage) if name != KEY_COLUMN]
+        if columns is None or list(columns) == saved:
+            return np.load(os.path.join(self.directory, stage, ROW_HASH_FILE), mmap_mode='r')
+        return row_hashes([self.column(stage, name) for name in columns])
+
+    def frame(self, stage, columns=None):
+        """按需还原为数据表（仅用于少量列的查看）"""
+        data = {}
+        for name in columns or self.columns(stage):
+            values, categories = self.column(stage, name)
+            if categories is None:
+                data[name] = np.asarray(values)
+            else:
+                data[name] = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+        return pd.DataFrame(data)
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import functools
+import json
+import math
+import time
+from collections import Counter, deque
+import numpy as np
+from aiohttp import web
+from model.parameter import Parameter
+from processor.batch_evaluator import BatchEvaluator, INPUT_FIELDS
+from service.association_service import AssociationService
+from main import init_base_parameter
+
+# 延迟统计保留的最近请求数
+LATENCY_WINDOW = 10000
+
+# 响应中保留中文字段名原文；不输出 NaN/Infinity 等非标准 JSON
+_json_dumps = functools.partial(json.dumps, ensure_ascii=False, allow_nan=False)
+
+
+class MicroBatcher:
+    """微批处理器：在时间窗口内收集并发的单设计请求，合并为一个数组批次交给 BatchEvaluator"""
+    def __init__(self, evaluator: BatchEvaluator, window_ms: float = 2.0, max_batch: int = 1024):
+        self.evaluator = evaluator
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = Counter()
+        self.requests = 0
+        self.batches = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, values: dict) -> dict:
+        """提交一个设计，等待所在批次评估完成后返回该设计的结果"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((values, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._run_batch(pending)
+
+    def _run_batch(self, pending: list):
+        columns = {name: np.array([values[name] for values, _, _ in pending], dtype=np.float64)
+                   for name in INPUT_FIELDS}
+        try:
+            outputs = self.evaluator.evaluate(columns)
+        except Exception as exc:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        size = len(pending)
+        self.batches += 1
+        self.requests += size
+        self.batch_sizes[size] += 1
+        finished = time.perf_counter()
+        for i, (_, future, started) in enumerate(pending):
+            result = {name: float(values[i]) for name, values in outputs.items() if name != "关联路径编码"}
+            result["关联路径"] = AssociationService.ASSOCIATION_PATHS[outputs["关联路径编码"][i]]
+            result["批大小"] = size
+            self.latencies.append(finished - started)
+            if not future.done():
+                future.set_result(result)
+
+    def metrics(self) -> dict:
+        """延迟分位数（毫秒，最近 LATENCY_WINDOW 个请求）与批大小直方图（按 2 的幂分桶）"""
+        latencies = np.array(self.latencies) * 1000
+        histogram = Counter()
+        for size, count in self.batch_sizes.items():
+            bucket = 1 << (size - 1).bit_length()
+            histogram[f"<={bucket}"] += count
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if latencies.size else 0.0,
+                "p99": float(np.percentile(latencies, 99)) if latencies.size else 0.0,
+                "max": float(latencies.max()) if latencies.size else 0.0,
+            },
+            "batch_size_histogram": dict(sorted(histogram.items(), key=lambda item: int(item[0][2:]))),
+        }
+
+
+def parse_design(payload: dict, defaults: dict) -> dict:
+    """解析请求体中的设计参数，未提供的字段取基础参数值；NaN、±Infinity 与超出浮点范围的整数视为非法"""
+    values = {}
+    for name in INPUT_FIELDS:
+        value = payload.get(name, defaults[name])
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"参数 {name} 必须为数值")
+        try:
+            value = float(value)
+        except OverflowError:
+            value = math.inf
+        if not math.isfinite(value):
+            raise ValueError(f"参数 {name} 必须为有限数值")
+        values[name] = value
+    return values
+
+
+def create_app(window_ms: float = 2.0, max_batch: int = 1024) -> web.Application:
+    """创建评估服务：POST /evaluate 评估单个设计，GET /metrics 查看延迟与批大小统计"""
+    base_param = Parameter()
+    init_base_parameter(base_param)
+    defaults = vars(base_param)
+    evaluator = BatchEvaluator()
+    # 启动前用基础参数评估一次，使数值内核的 JIT 编译不落在首个请求批次上
+    evaluator.evaluate({name: np.array([float(defaults[name])]) for name in INPUT_FIELDS})
+    batcher = MicroBatcher(evaluator, window_ms=window_ms, max_batch=max_batch)
+
+    async def evaluate(request: web.Request) -> web.Response:
+        try:
+            payload = await request.json()
+            if not isinstance(payload, dict):
+                raise ValueError("请求体必须为 JSON 对象")
+            values = parse_design(payload, defaults)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400, dumps=_json_dumps)
+        result = await batcher.submit(values)
+        try:
+            return web.json_response(result, dumps=_json_dumps)
+        except ValueError:
+            return web.json_response({"error": "评估结果含非有限数值，请检查设计参数"}, status=422, dumps=_json_dumps)
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.json_response(batcher.metrics(), dumps=_json_dumps)
+
+    async def on_startup(app):
+        batcher.start()
+
+    async def on_cleanup(app):
+        await batcher.stop()
+
+    app = web.Application()
+    app["batcher"] = batcher
+    app.router.add_post("/evaluate", evaluate)
+    app.router.add_get("/metrics", metrics)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="幕墙处理链本地评估服务（微批处理）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="微批收集时间窗口（毫秒）")
+    parser.add_argument("--max-batch", type=int, default=1024, help="单个批次最大请求数")
+    args = parser.parse_args(argv)
+    web.run_app(create_app(args.window_ms, args.max_batch), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
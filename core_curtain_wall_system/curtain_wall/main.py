@@ -1,37 +1,30 @@
+import argparse
 from model.parameter import Parameter
-from processor.parameter_input_processor import ParameterInputProcessor
-from processor.unit_generator import UnitGenerator
-from processor.structure_verifier import StructureVerifier
-from processor.error_corrector import ErrorCorrector
-from processor.data_associator import DataAssociator
+from processor.processor_chain import ProcessorChain
+from util.result_cache import ResultCache
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="幕墙单元件处理链")
+    parser.add_argument("--cache", action="store_true", help="复用磁盘缓存（.cw_cache）中的中间数据集")
+    args = parser.parse_args(argv)
 
-def main():
     # 初始化基础参数
     base_param = Parameter()
     init_base_parameter(base_param)
     
-    # 参数输入处理
-    input_processor = ParameterInputProcessor()
-    input_data_set = input_processor.process(base_param)
-    
-    # 单元件生成
-    generator = UnitGenerator()
-    unit_shape = generator.generate(input_data_set)
-    
-    # 结构验证
-    verifier = StructureVerifier()
-    struct_opt_params = verifier.verify(unit_shape)
-    
-    # 误差修正
-    corrector = ErrorCorrector()
-    error_data_set = corrector.correct(struct_opt_params)
-    
-    # 数据关联
-    associator = DataAssociator()
-    record = associator.associate(error_data_set)
+    # 依次执行参数输入处理、单元件生成、结构验证、误差修正与数据关联，
+    # 传入 --cache 时复用磁盘缓存中的中间数据集
+    cache = ResultCache() if args.cache else None
+    chain = ProcessorChain(cache=cache)
+    result = chain.evaluate(base_param)
+    record = result.record
     
     # 输出结果
     print(f"幕墙单元件数据关联记录生成完成: {record.id}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"结果缓存: {'命中' if result.from_cache else '未命中'}, "
+              f"累计命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, 条目 {stats['entries']} 个")
 
 def init_base_parameter(param: Parameter):
     # 初始化基础参数值
@@ -41,4 +34,4 @@ def init_base_parameter(param: Parameter):
     param.facade_curvature = 0.05
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,79 @@
+import numpy as np
+from model.design_rule import DesignRule
+from processor.parameter_input_processor import ParameterInputProcessor
+from service.structure_service import StructureService
+from service.association_service import AssociationService
+from util.math_utils import clamp, normalize
+
+# 输入列，与 Parameter 字段一致
+INPUT_FIELDS = ("height", "width", "material_strength", "facade_curvature")
+
+class BatchEvaluator:
+    """处理链的向量化版本：一次对整批设计点（NumPy 数组）计算，结果与逐个调用 ProcessorChain 一致"""
+    def __init__(self, rule: DesignRule = None):
+        self.rule = ParameterInputProcessor(rule)._get_design_rule()
+        self.structure_service = StructureService()
+        self.association_service = AssociationService()
+
+    def evaluate(self, columns: dict) -> dict:
+        """columns 为 Parameter 字段名到等长数组的映射，返回各模块输出列"""
+        rule = self.rule
+        height = np.asarray(columns["height"], dtype=np.float64)
+        width = np.asarray(columns["width"], dtype=np.float64)
+        material_strength = np.asarray(columns["material_strength"], dtype=np.float64)
+        facade_curvature = np.asarray(columns["facade_curvature"], dtype=np.float64)
+        out = {}
+
+        # 参数输入处理：完整性指标、规则匹配度与参数规范集
+        valid_count = ((rule.min_height <= height) & (height <= rule.max_height)).astype(np.int8)
+        valid_count += (rule.min_width <= width) & (width <= rule.max_width)
+        valid_count += material_strength > 0
+        valid_count += facade_curvature >= 0
+        out["完整性指标"] = valid_count / 4
+
+        height_mid = (rule.min_height + rule.max_height) / 2
+        width_mid = (rule.min_width + rule.max_width) / 2
+        height_ratio = np.abs(height - height_mid) / (rule.max_height - rule.min_height)
+        width_ratio = np.abs(width - width_mid) / (rule.max_width - rule.min_width)
+        out["规则匹配度"] = 1 - (height_ratio + width_ratio) / 2
+
+        spec_height = clamp(height, rule.min_height, rule.max_height)
+        spec_width = clamp(width, rule.min_width, rule.max_width)
+
+        # 单元件生成：动态特征值
+        out["动态特征值"] = normalize(spec_height * spec_width * facade_curvature, 0, 1000000)
+
+        # 结构验证：四角受力点 (N, 4)
+        corner_x = np.array([0.0, 1.0, 0.0, 1.0]) * spec_width[:, None]
+        corner_y = np.array([0.0, 0.0, 1.0, 1.0]) * spec_height[:, None]
+        forces = self.structure_service.calculate_force_array(
+            corner_x, corner_y, spec_height[:, None], spec_width[:, None])
+        max_stress = forces.max(axis=1)
+        min_stress = forces.min(axis=1)
+        std_force = forces.std(axis=1)
+        avg_force = forces.mean(axis=1)
+        out["最大应力"] = max_stress
+        out["应力梯度"] = (max_stress - min_stress) / spec_width
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["应力变化率"] = np.where(max_stress != 0, std_force / max_stress * 100, 0.0)
+            balance = np.where(avg_force != 0, 1 - std_force / avg_force, 0.0)
+        out["受力均衡系数"] = balance
+        stable_threshold = 200.0
+        optimized_stress = clamp(max_stress, 0, stable_threshold)
+        out["优化应力值"] = optimized_stress
+
+        # 误差修正
+        deviation_rate = np.abs(optimized_stress - stable_threshold) / stable_threshold * 100
+        shape_offset = (1 - balance) * 50
+        adaptation_rate = ((1 - clamp(deviation_rate / 10, 0, 1)) + (1 - clamp(shape_offset / 50, 0, 1))) / 2
+        matching_ratio = clamp(adaptation_rate + (balance - 0.5) * 0.2, 0.5, 1.0)
+        out["尺寸偏差率"] = deviation_rate
+        out["形态偏移量"] = shape_offset
+        out["适配速率"] = adaptation_rate
+        out["参数匹配比值"] = matching_ratio
+
+        # 数据关联
+        association_ratio = self.association_service.calculate_association_ratio(matching_ratio)
+        out["关联比例"] = association_ratio
+        out["关联路径编码"] = self.association_service.determine_association_path_codes(association_ratio)
+        return out
@@ -0,0 +1,210 @@
+import glob
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from model.design_rule import DesignRule
+from model.parameter import Parameter
+from processor.batch_evaluator import BatchEvaluator
+from service.parameter_service import ParameterService
+
+# scipy 可选：仅 Sobol 采样需要
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
+SWEEP_METHODS = ("grid", "lhs", "sobol")
+MANIFEST_NAME = "manifest.json"
+
+
+class SweepRange:
+    """单个参数的扫描范围；levels 仅用于网格采样"""
+    def __init__(self, name: str, low: float, high: float, levels: int = 10):
+        if name not in vars(Parameter()):
+            raise ValueError(f"未知参数字段: {name}")
+        if high < low:
+            raise ValueError(f"参数 {name} 的范围上限小于下限")
+        self.name = name
+        self.low = float(low)
+        self.high = float(high)
+        self.levels = int(levels)
+
+    def grid_levels(self) -> np.ndarray:
+        return np.linspace(self.low, self.high, self.levels) if self.levels > 1 else np.array([self.low])
+
+
+class DesignSweeper:
+    """参数化设计空间扫描：按网格/拉丁超立方/Sobol 生成设计点，分批向量化评估并写出列式分片
+
+    规则剪枝在评估之前完成：高度/宽度范围先与 DesignRule 边界求交（网格则剔除越界层级），
+    每批再以 ParameterService.validate_arrays 过滤。输出目录中的 manifest.json 记录已完成批次，
+    中断后以相同配置重新运行会跳过这些批次。
+    """
+    def __init__(self, ranges: list, method: str = "grid", samples: int = 0, batch_size: int = 1000000,
+                 seed: int = 0, base_param: Parameter = None, rule: DesignRule = None):
+        if method not in SWEEP_METHODS:
+            raise ValueError(f"未知采样方法: {method}")
+        if method == "sobol" and qmc is None:
+            raise ImportError("Sobol 采样需要安装 scipy")
+        if method != "grid" and samples <= 0:
+            raise ValueError("拉丁超立方/Sobol 采样需要指定 samples")
+        self.evaluator = BatchEvaluator(rule)
+        self.rule = self.evaluator.rule
+        self.parameter_service = ParameterService()
+        self.method = method
+        self.batch_size = int(batch_size)
+        self.seed = int(seed)
+        self.base_param = base_param or Parameter()
+        self.requested_ranges = ranges
+        self.ranges = self._prune_ranges(ranges)
+        self.space_points = self._count_space(samples)
+        self.total_points = self._count_points(samples)
+
+    def _prune_ranges(self, ranges: list) -> list:
+        """按设计规则收缩高度/宽度范围；完全落在规则之外时该参数无可行点"""
+        bounds = {"height": (self.rule.min_height, self.rule.max_height),
+                  "width": (self.rule.min_width, self.rule.max_width)}
+        pruned = []
+        for item in ranges:
+            low, high = bounds.get(item.name, (-np.inf, np.inf))
+            if self.method == "grid":
+                # 网格保持原有层级，只剔除越界层级
+                levels = item.grid_levels()
+                levels = levels[(levels >= low) & (levels <= high)]
+                pruned.append((item, levels))
+            else:
+                pruned.append((item, (max(item.low, low), min(item.high, high))))
+        return pruned
+
+    def _count_space(self, samples: int) -> int:
+        """剪枝前的设计点数"""
+        if self.method == "grid":
+            return int(np.prod([r.levels for r in self.requested_ranges], dtype=np.int64))
+        return int(samples)
+
+    def _count_points(self, samples: int) -> int:
+        if self.method == "grid":
+            return int(np.prod([len(levels) for _, levels in self.ranges], dtype=np.int64))
+        if any(low > high for _, (low, high) in self.ranges):
+            return 0
+        return int(samples)
+
+    @property
+    def batch_count(self) -> int:
+        return -(-self.total_points // self.batch_size) if self.total_points else 0
+
+    def config(self) -> dict:
+        """扫描配置（用于断点续扫时校验输出目录是否属于同一次扫描）"""
+        return {
+            "method": self.method,
+            "seed": self.seed,
+            "batch_size": self.batch_size,
+            "total_points": self.total_points,
+            "ranges": [[r.name, r.low, r.high, r.levels] for r in self.requested_ranges],
+            "base_param": vars(self.base_param),
+            "rule": vars(self.rule),
+        }
+
+    def _sample_batch(self, batch_index: int) -> dict:
+        """生成第 batch_index 批设计点；每批可独立重算，因此可以断点续扫"""
+        start = batch_index * self.batch_size
+        count = min(self.batch_size, self.total_points - start)
+        if self.method == "grid":
+            shape = [len(levels) for _, levels in self.ranges]
+            indices = np.unravel_index(np.arange(start, start + count, dtype=np.int64), shape)
+            return {item.name: levels[idx] for (item, levels), idx in zip(self.ranges, indices)}
+
+        dims = len(self.ranges)
+        if self.method == "lhs":
+            # 每批为独立种子的拉丁超立方：每维分 count 层、层内随机、各维独立置换
+            rng = np.random.default_rng([self.seed, batch_index])
+            unit = (rng.permuted(np.tile(np.arange(count), (dims, 1)), axis=1).T
+                    + rng.random((count, dims))) / count
+        else:
+            sampler = qmc.Sobol(d=dims, scramble=True, seed=self.seed)
+            sampler.fast_forward(start)
+            unit = sampler.random(count)
+        return {item.name: low + unit[:, i] * (high - low)
+                for i, (item, (low, high)) in enumerate(self.ranges)}
+
+    def _evaluate_batch(self, batch_index: int) -> dict:
+        columns = self._sample_batch(batch_index)
+        count = len(next(iter(columns.values())))
+        for name, value in vars(self.base_param).items():
+            if name not in columns:
+                columns[name] = np.full(count, value, dtype=np.float64)
+        mask = self.parameter_service.validate_arrays(columns["height"], columns["width"], self.rule)
+        if not mask.all():
+            columns = {name: values[mask] for name, values in columns.items()}
+        outputs = self.evaluator.evaluate(columns)
+        return {**columns, **outputs}
+
+    def run(self, output_dir: str, resume: bool = True, on_progress=None) -> dict:
+        """执行扫描，按批写出 part-xxxxx.npz 分片，返回汇总信息"""
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = self._load_manifest(output_dir) if resume else None
+        if manifest is None or manifest["config"] != self.config():
+            for path in glob.glob(os.path.join(output_dir, "part-*.npz")):
+                os.remove(path)
+            manifest = {"config": self.config(), "completed": {}, "rows": 0}
+            self._write_manifest(output_dir, manifest)
+
+        started = time.perf_counter()
+        evaluated = 0
+        for batch_index in range(self.batch_count):
+            if str(batch_index) in manifest["completed"]:
+                continue
+            batch = self._evaluate_batch(batch_index)
+            rows = len(batch["height"])
+            self._write_shard(os.path.join(output_dir, f"part-{batch_index:05d}.npz"), batch)
+            manifest["completed"][str(batch_index)] = rows
+            manifest["rows"] += rows
+            self._write_manifest(output_dir, manifest)
+            evaluated += min(self.batch_size, self.total_points - batch_index * self.batch_size)
+            if on_progress is not None:
+                on_progress(len(manifest["completed"]), self.batch_count, evaluated,
+                            time.perf_counter() - started)
+
+        return {
+            "space_points": self.space_points,
+            "total_points": self.total_points,
+            "rows": manifest["rows"],
+            "pruned": self.space_points - manifest["rows"],
+            "batches": self.batch_count,
+            "evaluated_points": evaluated,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def _load_manifest(self, output_dir: str):
+        path = os.path.join(output_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, output_dir: str, manifest: dict) -> None:
+        """原子写入清单，中断时不会留下写了一半的 manifest.json"""
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+
+    def _write_shard(self, path: str, batch: dict) -> None:
+        """分片按列存储为 npz（每列一个数组），先写临时文件再替换"""
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **batch)
+        os.replace(tmp_path, path)
+
+
+def load_sweep(output_dir: str, columns: list = None) -> dict:
+    """读取扫描输出，按批次顺序拼接各列；columns 指定时只读取这些列"""
+    parts = sorted(glob.glob(os.path.join(output_dir, "part-*.npz")))
+    chunks = {}
+    for path in parts:
+        with np.load(path) as shard:
+            for name in shard.files:
+                if columns is None or name in columns:
+                    chunks.setdefault(name, []).append(shard[name])
+    return {name: np.concatenate(values) for name, values in chunks.items()}
@@ -6,6 +6,9 @@ from util.system_config import 完整性合格阈值
 
 class ParameterInputProcessor:
     """参数输入处理模块：分析参数完整性与规则匹配度，生成处理数据集"""
+    def __init__(self, rule: DesignRule = None):
+        self.rule = rule
+    
     def process(self, param: Parameter) -> ParameterInputDataSet:
         result = ParameterInputDataSet()
         
@@ -27,7 +30,9 @@ class ParameterInputProcessor:
         return result
     
     def _get_design_rule(self) -> DesignRule:
-        """获取设计规则"""
+        """获取设计规则，未指定时使用默认规则"""
+        if self.rule is not None:
+            return self.rule
         rule = DesignRule()
         rule.min_height = 2000.0
         rule.max_height = 4000.0
@@ -0,0 +1,63 @@
+import uuid
+from model.parameter import Parameter
+from model.design_rule import DesignRule
+from model.parameter_input_dataset import ParameterInputDataSet
+from model.unit_shape import UnitShape
+from model.structure_optimization_params import StructureOptimizationParams
+from model.error_correction_dataset import ErrorCorrectionDataSet
+from model.data_association_record import DataAssociationRecord
+from processor.parameter_input_processor import ParameterInputProcessor
+from processor.unit_generator import UnitGenerator
+from processor.structure_verifier import StructureVerifier
+from processor.error_corrector import ErrorCorrector
+from processor.data_associator import DataAssociator
+from util.result_cache import ResultCache, canonical_key, code_version
+
+class ChainResult:
+    """处理链结果：各中间数据集与最终关联记录"""
+    def __init__(self):
+        self.input_data_set: ParameterInputDataSet = None
+        self.unit_shape: UnitShape = None
+        self.struct_opt_params: StructureOptimizationParams = None
+        self.error_data_set: ErrorCorrectionDataSet = None
+        self.record: DataAssociationRecord = None
+        self.from_cache = False
+
+class ProcessorChain:
+    """处理链：参数输入处理 → 单元件生成 → 结构验证 → 误差修正 → 数据关联，可选结果缓存"""
+    def __init__(self, rule: DesignRule = None, cache: ResultCache = None):
+        self.input_processor = ParameterInputProcessor(rule)
+        self.generator = UnitGenerator()
+        self.verifier = StructureVerifier()
+        self.corrector = ErrorCorrector()
+        self.associator = DataAssociator()
+        self.cache = cache
+    
+    def cache_key(self, param: Parameter) -> str:
+        """缓存键：规范化参数 + 设计规则 + 代码版本"""
+        rule = self.input_processor._get_design_rule()
+        return canonical_key(param, rule, {"code_version": code_version()})
+    
+    def evaluate(self, param: Parameter) -> ChainResult:
+        """执行处理链；命中缓存时跳过前四个模块，重新生成形态编号与关联记录（含新的记录编号与时间）"""
+        result = ChainResult()
+        key = self.cache_key(param) if self.cache is not None else None
+        cached = self.cache.get(key) if key is not None else None
+        
+        if cached is not None:
+            (result.input_data_set, result.unit_shape,
+             result.struct_opt_params, result.error_data_set) = cached
+            # 缓存中的形态编号属于首次计算，命中时重新生成，避免不同次评估共用同一编号
+            result.unit_shape.shape_id = str(uuid.uuid4())
+            result.from_cache = True
+        else:
+            result.input_data_set = self.input_processor.process(param)
+            result.unit_shape = self.generator.generate(result.input_data_set)
+            result.struct_opt_params = self.verifier.verify(result.unit_shape)
+            result.error_data_set = self.corrector.correct(result.struct_opt_params)
+            if key is not None:
+                self.cache.put(key, (result.input_data_set, result.unit_shape,
+                                     result.struct_opt_params, result.error_data_set))
+        
+        result.record = self.associator.associate(result.error_data_set)
+        return result
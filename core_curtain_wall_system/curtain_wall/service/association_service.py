@@ -1,5 +1,10 @@
+import numpy as np
+
 class AssociationService:
     """数据关联服务：提供关联比例计算与路径确定功能"""
+    # 关联路径，下标与 determine_association_path_codes 的返回值对应
+    ASSOCIATION_PATHS = ("直接关联路径（高匹配）", "间接关联路径（中匹配）", "待优化关联路径（低匹配）")
+    
     def calculate_association_ratio(self, param_matching_ratio: float) -> float:
         """计算设计参数与施工数据的关联比例"""
         return param_matching_ratio * 0.9 + 0.1  
@@ -11,4 +16,9 @@ class AssociationService:
         elif association_ratio >= 0.5:
             return "间接关联路径（中匹配）"
         else:
-            return "待优化关联路径（低匹配）"
\ No newline at end of file
+            return "待优化关联路径（低匹配）"
+    
+    def determine_association_path_codes(self, association_ratio):
+        """批量确定关联路径，返回 ASSOCIATION_PATHS 下标（int8 数组）"""
+        return np.where(association_ratio >= 0.8, 0,
+                        np.where(association_ratio >= 0.5, 1, 2)).astype(np.int8)
\ No newline at end of file
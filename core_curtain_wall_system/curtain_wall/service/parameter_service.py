@@ -11,4 +11,9 @@ class ParameterService:
     def convert_to_standard_unit(self, param: Parameter):
         """转换参数至标准单位（mm）"""
         param.height *= 1000
-        param.width *= 1000
\ No newline at end of file
+        param.width *= 1000
+    
+    def validate_arrays(self, height, width, rule: DesignRule):
+        """批量校验参数是否符合规则，返回布尔数组"""
+        return ((rule.min_height <= height) & (height <= rule.max_height) &
+                (rule.min_width <= width) & (width <= rule.max_width))
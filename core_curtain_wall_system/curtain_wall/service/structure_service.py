@@ -1,6 +1,13 @@
+import numpy as np
+
 class StructureService:
     """结构分析服务：提供受力计算功能"""
     def calculate_force(self, x: float, y: float, height: float, width: float) -> float:
         """计算指定坐标点的受力值"""
         edge_factor = 1.5 if x in (0, width) or y in (0, height) else 1.0
-        return (height * width) / 1000 * edge_factor
\ No newline at end of file
+        return (height * width) / 1000 * edge_factor
+    
+    def calculate_force_array(self, x, y, height, width):
+        """批量计算受力值（NumPy 数组，逐元素与 calculate_force 一致）"""
+        on_edge = (x == 0) | (x == width) | (y == 0) | (y == height)
+        return (height * width) / 1000 * np.where(on_edge, 1.5, 1.0)
@@ -0,0 +1,45 @@
+import argparse
+from model.parameter import Parameter
+from processor.design_sweeper import DesignSweeper, SweepRange, SWEEP_METHODS
+from main import init_base_parameter
+
+def parse_range(text: str) -> SweepRange:
+    """解析 name=low:high[:levels]"""
+    try:
+        name, bounds = text.split("=", 1)
+        parts = bounds.split(":")
+        levels = int(parts[2]) if len(parts) > 2 else 10
+        return SweepRange(name.strip(), float(parts[0]), float(parts[1]), levels)
+    except (ValueError, IndexError) as e:
+        raise argparse.ArgumentTypeError(f"无效的扫描范围 '{text}': {e}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="幕墙参数化设计空间扫描")
+    parser.add_argument("--range", dest="ranges", type=parse_range, action="append", required=True,
+                        help="扫描范围 name=low:high[:levels]，可重复；未指定的参数取 init_base_parameter 的值")
+    parser.add_argument("--method", choices=SWEEP_METHODS, default="grid", help="采样方法")
+    parser.add_argument("--samples", type=int, default=0, help="拉丁超立方/Sobol 采样点数")
+    parser.add_argument("--batch-size", type=int, default=1000000, help="每批评估的设计点数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", default="sweep_output", help="输出目录")
+    parser.add_argument("--no-resume", action="store_true", help="忽略已有输出，重新扫描")
+    return parser.parse_args(argv)
+
+def report_progress(done: int, total: int, points: int, seconds: float):
+    rate = points / seconds * 60 if seconds > 0 else 0
+    print(f"扫描进度: {done}/{total} 批, 本次评估 {points} 点, {rate / 1e6:.2f} 百万点/分钟")
+
+def main(argv=None):
+    args = parse_args(argv)
+    base_param = Parameter()
+    init_base_parameter(base_param)
+
+    sweeper = DesignSweeper(args.ranges, method=args.method, samples=args.samples,
+                            batch_size=args.batch_size, seed=args.seed, base_param=base_param)
+    summary = sweeper.run(args.output, resume=not args.no_resume, on_progress=report_progress)
+
+    print(f"设计空间 {summary['space_points']} 点, 规则剪枝 {summary['pruned']} 点, "
+          f"输出 {summary['rows']} 行至 {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,57 @@
 import math
+import numpy as np
+from util import numeric_kernels
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
-    """限制值在[min, max]范围内"""
+    """限制值在[min, max]范围内（支持 NumPy 数组）"""
+    if isinstance(value, np.ndarray):
+        return numeric_kernels.clamp_array(value, min_val, max_val)
     return max(min_val, min(max_val, value))
 
 def max_val(array: list) -> float:
-    """计算列表最大值"""
+    """计算列表最大值（支持 NumPy 数组）"""
+    if isinstance(array, np.ndarray):
+        return float(array.max()) if array.size else 0
     return max(array) if array else 0
 
 def min_val(array: list) -> float:
-    """计算列表最小值"""
+    """计算列表最小值（支持 NumPy 数组）"""
+    if isinstance(array, np.ndarray):
+        return float(array.min()) if array.size else 0
     return min(array) if array else 0
 
+def mean_variance(array: list) -> tuple:
+    """单遍（Welford）计算均值与总体方差"""
+    if isinstance(array, np.ndarray):
+        return numeric_kernels.mean_variance(array)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for x in array:
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+    if count == 0:
+        return 0.0, 0.0
+    return mean, m2 / count
+
 def standard_deviation(array: list) -> float:
-    """计算列表标准差"""
-    if not array or len(array) == 1:
+    """计算列表标准差（支持 NumPy 数组）"""
+    if len(array) <= 1:
         return 0.0
-    avg = sum(array) / len(array)
-    variance = sum((x - avg) **2 for x in array) / len(array)
-    return math.sqrt(variance)
+    return math.sqrt(mean_variance(array)[1])
 
 def normalize(value: float, min_val: float, max_val: float) -> float:
-    """归一化值至[0,1]"""
+    """归一化值至[0,1]（支持 NumPy 数组）"""
+    if isinstance(value, np.ndarray):
+        return numeric_kernels.normalize_array(value, min_val, max_val)
     if max_val == min_val:
         return 0.0
-    return (value - min_val) / (max_val - min_val)
\ No newline at end of file
+    return (value - min_val) / (max_val - min_val)
+
+def clamp_normalize(value: float, min_val: float, max_val: float) -> float:
+    """限制在[min, max]范围内后归一化至[0,1]（支持 NumPy 数组）"""
+    if isinstance(value, np.ndarray):
+        return numeric_kernels.clamp_normalize(value, min_val, max_val)
+    return normalize(clamp(value, min_val, max_val), min_val, max_val)
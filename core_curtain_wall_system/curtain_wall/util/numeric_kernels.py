@@ -0,0 +1,126 @@
+import numpy as np
+
+# numba 可选：存在时使用 JIT 编译内核，否则回退到 NumPy 实现
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Welford 递推存在串行依赖，大数组时 NumPy 的向量化双遍方差更快
+JIT_WELFORD_MAX_SIZE = 65536
+
+
+def _numpy_mean_variance(values: np.ndarray) -> tuple:
+    """NumPy 实现：均值与总体方差"""
+    if values.size == 0:
+        return 0.0, 0.0
+    mean = float(values.mean())
+    return mean, float(values.var())
+
+
+def _numpy_clamp(values: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """NumPy 实现：限制数组元素在[min, max]范围内；与标量版 max(min, min(max, x)) 相同，min > max 时结果为 min"""
+    return np.maximum(np.minimum(values, max_val), min_val)
+
+
+def _numpy_normalize(values: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """NumPy 实现：数组归一化"""
+    if max_val == min_val:
+        return np.zeros(values.shape, dtype=np.float64)
+    return (values - min_val) / (max_val - min_val)
+
+
+def _numpy_clamp_normalize(values: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """NumPy 实现：先限制范围再归一化至[0,1]；min >= max 时限制结果恒为 min，归一化为 0"""
+    if max_val <= min_val:
+        return np.zeros(values.shape, dtype=np.float64)
+    result = np.subtract(values, min_val, dtype=np.float64)
+    result /= (max_val - min_val)
+    return np.clip(result, 0.0, 1.0, out=result)
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _jit_mean_variance(values):
+        """Welford 单遍均值与总体方差"""
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        for x in values:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        if count == 0:
+            return 0.0, 0.0
+        return mean, m2 / count
+
+    @njit(cache=True)
+    def _jit_clamp(values, min_val, max_val):
+        out = np.empty(values.size, dtype=np.float64)
+        for i in range(values.size):
+            x = values[i]
+            x = max_val if x > max_val else x
+            out[i] = min_val if x < min_val else x
+        return out
+
+    @njit(cache=True)
+    def _jit_normalize(values, min_val, max_val):
+        out = np.zeros(values.size, dtype=np.float64)
+        if max_val == min_val:
+            return out
+        scale = 1.0 / (max_val - min_val)
+        for i in range(values.size):
+            out[i] = (values[i] - min_val) * scale
+        return out
+
+    @njit(cache=True)
+    def _jit_clamp_normalize(values, min_val, max_val):
+        out = np.zeros(values.size, dtype=np.float64)
+        if max_val <= min_val:
+            return out
+        scale = 1.0 / (max_val - min_val)
+        for i in range(values.size):
+            x = values[i]
+            x = max_val if x > max_val else x
+            x = min_val if x < min_val else x
+            out[i] = (x - min_val) * scale
+        return out
+
+
+def _contiguous(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def mean_variance(values, use_jit: bool = True) -> tuple:
+    """单遍计算均值与总体方差"""
+    array = _contiguous(values)
+    if HAS_NUMBA and use_jit and array.size <= JIT_WELFORD_MAX_SIZE:
+        mean, variance = _jit_mean_variance(array.ravel())
+        return float(mean), float(variance)
+    return _numpy_mean_variance(array)
+
+
+def clamp_array(values, min_val: float, max_val: float, use_jit: bool = True) -> np.ndarray:
+    """限制数组元素在[min, max]范围内"""
+    array = _contiguous(values)
+    if HAS_NUMBA and use_jit:
+        return _jit_clamp(array.ravel(), float(min_val), float(max_val)).reshape(array.shape)
+    return _numpy_clamp(array, min_val, max_val)
+
+
+def normalize_array(values, min_val: float, max_val: float, use_jit: bool = True) -> np.ndarray:
+    """数组归一化"""
+    array = _contiguous(values)
+    if HAS_NUMBA and use_jit:
+        return _jit_normalize(array.ravel(), float(min_val), float(max_val)).reshape(array.shape)
+    return _numpy_normalize(array, min_val, max_val)
+
+
+def clamp_normalize(values, min_val: float, max_val: float, use_jit: bool = True) -> np.ndarray:
+    """融合内核：限制在[min, max]后归一化至[0,1]，只遍历一次数据"""
+    array = _contiguous(values)
+    if HAS_NUMBA and use_jit:
+        return _jit_clamp_normalize(array.ravel(), float(min_val), float(max_val)).reshape(array.shape)
+    return _numpy_clamp_normalize(array, min_val, max_val)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import numbers
+import os
+import pickle
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，淘汰时不加跨进程锁
+    fcntl = None
+
+# 参与代码版本计算的源码目录（相对 curtain_wall 包目录）
+_CODE_DIRS = ("model", "processor", "service", "util")
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_code_version = None
+
+
+def code_version() -> str:
+    """根据处理链源码内容计算代码版本，源码变化后旧缓存自动失效"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for sub_dir in _CODE_DIRS:
+            directory = os.path.join(_PACKAGE_DIR, sub_dir)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    digest.update(f"{sub_dir}/{name}".encode("utf-8"))
+                    with open(os.path.join(directory, name), "rb") as f:
+                        digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _canonical(value):
+    """规范化为可 JSON 序列化的值：实数（含 NumPy 标量，不含 bool）统一为 float，使 1 与 1.0 得到相同的键"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if hasattr(value, "tolist"):  # NumPy 数组
+        return _canonical(value.tolist())
+    if hasattr(value, "__dict__"):
+        return _canonical(vars(value))
+    return value
+
+
+def canonical_key(*parts) -> str:
+    """将参数对象/字典规范化为 JSON 后计算内容哈希"""
+    payload = [_canonical(part) for part in parts]
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """磁盘内容寻址结果缓存：原子写入、按容量 LRU 淘汰，可供多个进程同时使用"""
+    def __init__(self, root: str = ".cw_cache", max_bytes: int = 256 * 1024 * 1024, evict_interval: int = 64):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._objects_dir = os.path.join(root, "objects")
+        os.makedirs(self._objects_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._objects_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key: str):
+        """读取缓存，未命中返回 None；命中时刷新访问时间供 LRU 使用"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # 文件不存在、正被其他进程淘汰或已损坏，均视为未命中
+            self.misses += 1
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value) -> None:
+        """写入缓存：先写临时文件再原子替换，读者不会看到写了一半的文件"""
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.stores += 1
+        if self.stores % self.evict_interval == 1 or self.evict_interval <= 1:
+            self.evict()
+
+    def evict(self) -> int:
+        """按最近访问时间淘汰最旧条目，直至总容量不超过上限；返回淘汰条目数"""
+        lock_path = os.path.join(self.root, "evict.lock")
+        with open(lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entries, total = self._scan()
+                removed = 0
+                entries.sort(key=lambda entry: entry[0])
+                for _, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+                self.evictions += removed
+                return removed
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _scan(self):
+        entries = []
+        total = 0
+        for sub_dir in os.scandir(self._objects_dir):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                if not entry.name.endswith(".pkl"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+    def stats(self) -> dict:
+        """返回命中/未命中统计与磁盘占用"""
+        entries, total = self._scan()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": total,
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        }
@@ -1,15 +1,20 @@
 import pandas as pd
 import numpy as np
-from utils import print_log, simulate_process
+from utils import print_log, simulate_process, save_chart
+from profiler import profiled
+from chart_cache import chart_cache
+import charting
 import matplotlib.pyplot as plt
 
 class DataAssociationModule:
-    def __init__(self, correction_data, construction_data):
+    def __init__(self, correction_data, construction_data, render_charts=True):
         self.correction_data = correction_data
         self.construction_data = construction_data
+        self.render_charts = render_charts
         self.association_data = None
         self.association_record = None
         
+    @profiled('DataAssociationModule.analyze_association', rows=lambda self: len(self.correction_data))
     def analyze_association(self):
         """分析设计参数与施工数据的关联关系，根据误差修正数据和施工数据，分析设计参数与施工数据的关联关系"""
         print_log("开始分析设计参数与施工数据的关联关系")
@@ -32,6 +37,7 @@ class DataAssociationModule:
         print_log("设计参数与施工数据的关联关系分析完成")
         return merged_df
     
+    @profiled('DataAssociationModule.generate_association_record', rows=lambda self: len(self.correction_data))
     def generate_association_record(self):
         """生成幕墙单元件数据关联记录表"""
         print_log("开始生成数据关联记录表")
@@ -51,43 +57,57 @@ class DataAssociationModule:
         # 按关联度排序
         association_record = association_record.sort_values('设计-施工关联度', ascending=False)
         
-        self.association_record = association_record
-        
-        print_log("数据关联记录表生成完成")
-        
-        # 生成关联度与成本效率关系图
-        plt.figure(figsize=(10, 6))
-        plt.scatter(association_record['设计-施工关联度'], association_record['成本效率(元/㎡)'], 
-                   c=association_record['规则匹配度'], cmap='spring', s=50, alpha=0.7)
-        plt.colorbar(label='规则匹配度')
-        plt.title('设计-施工关联度与成本效率关系', fontsize=14)
-        plt.xlabel('设计-施工关联度', fontsize=12)
-        plt.ylabel('成本效率(元/㎡)', fontsize=12)
-        plt.grid(linestyle='--', alpha=0.7)
-        plt.savefig('charts/关联度与成本效率关系.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 生成施工时间分布箱线图
-        plt.figure(figsize=(10, 6))
         # 按关联度分组
         association_record['关联度分组'] = pd.cut(association_record['设计-施工关联度'], 
                                               bins=[0, 0.3, 0.6, 1.0], 
                                               labels=['低关联度', '中关联度', '高关联度'])
         
-        # 绘制箱线图
-        association_record.boxplot(column='单位面积施工时间', by='关联度分组', grid=False, 
-                                  patch_artist=True, boxprops=dict(facecolor='lightblue'))
+        self.association_record = association_record
         
-        plt.title('不同关联度分组的单位面积施工时间分布', fontsize=14)
-        plt.suptitle('')  
-        plt.xlabel('关联度分组', fontsize=12)
-        plt.ylabel('单位面积施工时间(小时/㎡)', fontsize=12)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.savefig('charts/不同关联度施工时间分布.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        print_log("数据关联记录表生成完成")
+        
+        if self.render_charts:
+            # 生成关联度与成本效率关系图
+            def draw_efficiency_chart():
+                plt.figure(figsize=(10, 6))
+                charting.scatter(association_record['设计-施工关联度'], association_record['成本效率(元/㎡)'], 
+                                 c=association_record['规则匹配度'], cmap='spring', colorbar_label='规则匹配度')
+                plt.title('设计-施工关联度与成本效率关系', fontsize=14)
+                plt.xlabel('设计-施工关联度', fontsize=12)
+                plt.ylabel('成本效率(元/㎡)', fontsize=12)
+                plt.grid(linestyle='--', alpha=0.7)
+                save_chart('charts/关联度与成本效率关系.png', len(association_record))
+
+            chart_cache.render('charts/关联度与成本效率关系.png',
+                               inputs={name: association_record[name] for name in ['设计-施工关联度', '成本效率(元/㎡)', '规则匹配度']},
+                               style={'cmap': 'spring'},
+                               draw=draw_efficiency_chart)
+            
+            # 生成施工时间分布箱线图
+            def draw_duration_chart():
+                plt.figure(figsize=(10, 6))
+
+                # 绘制箱线图
+                # 聚合渲染时不逐点绘制离群值
+                association_record.boxplot(column='单位面积施工时间', by='关联度分组', grid=False, 
+                                          patch_artist=True, boxprops=dict(facecolor='lightblue'),
+                                          showfliers=not charting.use_aggregation(len(association_record)))
+
+                plt.title('不同关联度分组的单位面积施工时间分布', fontsize=14)
+                plt.suptitle('')  
+                plt.xlabel('关联度分组', fontsize=12)
+                plt.ylabel('单位面积施工时间(小时/㎡)', fontsize=12)
+                plt.grid(axis='y', linestyle='--', alpha=0.7)
+                save_chart('charts/不同关联度施工时间分布.png', len(association_record))
+
+            chart_cache.render('charts/不同关联度施工时间分布.png',
+                               inputs={name: association_record[name] for name in ['单位面积施工时间', '关联度分组']},
+                               style={'facecolor': 'lightblue'},
+                               draw=draw_duration_chart)
         
         return association_record
     
+    @profiled('DataAssociationModule.run', rows=lambda self: len(self.correction_data))
     def run(self):
         """运行数据关联模块"""
         print_log("开始执行数据关联模块")
@@ -0,0 +1,88 @@
+"""
+设计去重评估：同一立面中大量单元件参数完全相同（或在加工公差内相同），
+按输入参数列哈希去重后，单元件生成与结构验证的确定性计算只对每种设计执行一次，再按索引广播回所有样本；
+逐样本的随机量（应力变化率）仍按样本抽取，且与不去重时抽到的值一致
+"""
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+from unit_generation import UnitGenerationModule
+from structure_verification import StructureVerificationModule
+
+# 参与去重的输入参数列（参数输入处理之后）
+DEDUP_COLUMNS = ['宽度(m)', '高度(m)', '厚度(m)', '曲率', '倾斜角度(度)', '材料强度(MPa)', '密度(kg/m³)', '规则匹配度']
+
+# 加工公差（米）只作用于尺寸列，其余列的量化步长需按列名单独给出
+DIMENSION_COLUMNS = ['宽度(m)', '高度(m)', '厚度(m)']
+
+
+def design_keys(frame, columns=None, tolerance=None):
+    """计算每行设计的哈希键；tolerance 为加工公差（标量或 {列名: 公差}），先按公差量化再哈希"""
+    columns = columns or DEDUP_COLUMNS
+    values = frame[columns]
+    if tolerance:
+        steps = pd.Series({name: tolerance.get(name, 0) if isinstance(tolerance, dict) else tolerance
+                           for name in columns})
+        quantized = values.copy()
+        for name in columns:
+            if steps[name] > 0:
+                quantized[name] = np.round(values[name] / steps[name]).astype(np.int64)
+        values = quantized
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def parse_tolerances(specs):
+    """解析公差参数：纯数值为尺寸列的加工公差，"列名=公差" 为单列量化步长，返回 {列名: 公差}"""
+    tolerance = {}
+    for spec in specs:
+        name, sep, value = spec.rpartition('=')
+        step = float(value)
+        if step < 0:
+            raise ValueError(f"公差不能为负数: {spec}")
+        if not sep:
+            tolerance.update(dict.fromkeys(DIMENSION_COLUMNS, step))
+        elif name in DEDUP_COLUMNS:
+            tolerance[name] = step
+        else:
+            raise ValueError(f"未知的去重参数列: {name}（可选 {', '.join(DEDUP_COLUMNS)}）")
+    return tolerance
+
+
+def unique_designs(frame, columns=None, tolerance=None):
+    """返回 (代表行索引位置, 每行对应的唯一设计序号)"""
+    keys = design_keys(frame, columns, tolerance)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return first, inverse
+
+
+def evaluate_deduplicated(processed_params, tolerance=None):
+    """对参数输入处理结果去重后执行单元件生成与结构验证，返回与逐行计算同结构的结构验证优化参数集"""
+    n = len(processed_params)
+    with profiler.measure('dedup.evaluate_deduplicated', n):
+        first, inverse = unique_designs(processed_params, tolerance=tolerance)
+        print_log(f"设计去重: {n} 个样本对应 {len(first)} 种设计，去重比 {n / max(len(first), 1):.1f}")
+
+        representatives = processed_params.iloc[first].reset_index(drop=True)
+        unit_module = UnitGenerationModule(representatives, render_charts=False)
+        unit_module.extract_geometric_features()
+        unit_results = unit_module.generate_unit_shape()
+
+        # 结构验证中的随机抽样只针对代表行，随后恢复随机状态按样本数重新抽取，
+        # 使全局随机流与不去重时一致
+        random_state = np.random.get_state()
+        structure_module = StructureVerificationModule(unit_results, render_charts=False)
+        unique_optimized = structure_module.generate_optimized_parameters()
+        np.random.set_state(random_state)
+
+        # 广播确定性结果；样本自身的输入列保持原值
+        derived = [name for name in unique_optimized.columns if name not in processed_params.columns]
+        broadcast = unique_optimized[derived].iloc[inverse]
+        broadcast.index = processed_params.index
+        optimized_params = pd.concat([processed_params, broadcast], axis=1)
+
+        # 逐样本随机量：StructureVerificationModule.run() 先后两次提取受力（第 40 步与生成优化参数时），
+        # 各抽取一次应力变化率并保留第二次的结果，这里同样抽取两次以保持随机流一致
+        np.random.normal(0.05, 0.02, n)
+        optimized_params['应力变化率'] = np.random.normal(0.05, 0.02, n)
+    return optimized_params
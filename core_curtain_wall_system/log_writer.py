@@ -0,0 +1,172 @@
+"""
+日志子系统：日志以结构化记录放入队列，由后台线程批量格式化并写出，调用方不再同步等待终端 I/O；
+进度条按模块限制刷新频率，输出不是终端时默认不渲染进度条
+"""
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+
+class LogRecord:
+    """结构化日志记录"""
+    __slots__ = ('created', 'level', 'module', 'message', 'kind')
+
+    def __init__(self, created, level, module, message, kind='log'):
+        self.created = created
+        self.level = level
+        self.module = module
+        self.message = message
+        self.kind = kind
+
+    def as_dict(self):
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.created)),
+            'level': self.level,
+            'module': self.module,
+            'message': self.message,
+        }
+
+
+class LogWriter:
+    """基于队列的后台日志写出器"""
+    def __init__(self, stream=None, json_path=None, progress_hz=10.0, progress_enabled=None):
+        self.stream = stream
+        self.json_path = json_path
+        self.progress_hz = progress_hz
+        self.progress_enabled = progress_enabled
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._json_file = None
+        self._last_second = None
+        self._last_stamp = ''
+        self._progress_last = {}
+
+    def configure(self, stream=None, json_path=None, progress_hz=None, progress_enabled=None):
+        """调整输出目标与进度条刷新频率，未传入的设置保持不变"""
+        self.flush()
+        if stream is not None:
+            self.stream = stream
+        if json_path is not None:
+            if self._json_file is not None:
+                self._json_file.close()
+                self._json_file = None
+            self.json_path = json_path or None
+        if progress_hz is not None:
+            self.progress_hz = progress_hz
+        if progress_enabled is not None:
+            self.progress_enabled = progress_enabled
+
+    def log(self, message, module=None, level='INFO'):
+        """提交一条日志"""
+        self._ensure_started()
+        self._queue.put(LogRecord(time.time(), level, module, message))
+
+    def progress(self, progress, total, module_name):
+        """提交进度条刷新，超出刷新频率的中间进度直接丢弃"""
+        if not self._progress_on():
+            return
+        now = time.monotonic()
+        finished = progress >= total
+        last = self._progress_last.get(module_name)
+        if not finished and last is not None and self.progress_hz > 0 and now - last < 1.0 / self.progress_hz:
+            return
+        self._progress_last[module_name] = now
+        if finished:
+            self._progress_last.pop(module_name, None)
+
+        percent = 100 * (progress / float(total))
+        bar = '█' * int(percent) + '-' * (100 - int(percent))
+        text = f"\r{module_name} 进度: |{bar}| {percent:.2f}%"
+        if finished:
+            text += "\n"
+        self._ensure_started()
+        self._queue.put(LogRecord(time.time(), 'INFO', module_name, text, kind='progress'))
+
+    def flush(self, timeout=5.0):
+        """等待队列中已提交的记录全部写出"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _progress_on(self):
+        if self.progress_enabled is not None:
+            return self.progress_enabled
+        stream = self.stream or sys.stdout
+        return hasattr(stream, 'isatty') and stream.isatty()
+
+    def _ensure_started(self):
+        # fork 出的子进程不会继承后台线程，需要重新启动
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            self._json_file = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _timestamp(self, created):
+        second = int(created)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        return self._last_stamp
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        stream = self.stream or sys.stdout
+        parts = []
+        json_lines = []
+        waiters = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                continue
+            if item.kind == 'progress':
+                parts.append(item.message)
+                continue
+            parts.append(f"[{self._timestamp(item.created)}] {item.message}\n")
+            if self.json_path:
+                json_lines.append(json.dumps(item.as_dict(), ensure_ascii=False) + "\n")
+        try:
+            if parts:
+                stream.write(''.join(parts))
+                stream.flush()
+            if json_lines:
+                if self._json_file is None:
+                    self._json_file = open(self.json_path, 'a', encoding='utf-8')
+                self._json_file.write(''.join(json_lines))
+                self._json_file.flush()
+        finally:
+            for waiter in waiters:
+                waiter.set()
+
+
+# 全局日志写出器
+writer = LogWriter()
+atexit.register(writer.flush)
+
+
+def configure_logging(stream=None, json_path=None, progress_hz=None, progress_enabled=None):
+    """配置全局日志写出器；json_path 为结构化 JSON Lines 日志路径，progress_hz 为进度条每秒最大刷新次数"""
+    writer.configure(stream=stream, json_path=json_path, progress_hz=progress_hz,
+                     progress_enabled=progress_enabled)
@@ -1,53 +1,197 @@
+import argparse
+import os
 import time
 from utils import print_log
+from profiler import profiler
+from log_writer import configure_logging
+import charting
+from chart_cache import chart_cache
 from data_generator import generate_basic_parameters, generate_association_rules, generate_construction_data
 from parameter_input import ParameterInputModule
 from unit_generation import UnitGenerationModule
 from structure_verification import StructureVerificationModule
 from error_correction import ErrorCorrectionModule
 from data_association import DataAssociationModule
+from dedup import evaluate_deduplicated, parse_tolerances
+from panel_mesh import build_panel_meshes, save_panel_meshes
+from clash_detection import detect_clashes
+from panel_nesting import nest_units, apply_material_cost
+from installation_scheduler import simulate_installation, log_schedule_summary
+from tolerance_stackup import analyze_stackup, monte_carlo_stackup, log_stackup_summary
+from metrics_cube import MetricsCube, cube_frame, log_cube_summary
+from checkpoint import save_checkpoint
+from workload_generator import load_workload, pipeline_frames
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="幕墙单元件快速生成验证系统")
+    parser.add_argument('--profile-report', metavar='PATH',
+                        help="启用阶段剖析并将 JSON 运行报告写入该路径（同名 .csv 为逐次调用明细）")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="剖析时统计 tracemalloc 内存峰值（开销较大）")
+    parser.add_argument('--cprofile-stage', metavar='STAGE',
+                        help="对指定阶段采集 cProfile 数据，例如 StructureVerificationModule.extract_force_and_stress")
+    parser.add_argument('--log-json', metavar='PATH',
+                        help="同时将结构化日志以 JSON Lines 格式追加写入该路径")
+    parser.add_argument('--progress-hz', type=float, default=10.0,
+                        help="进度条每秒最大刷新次数（默认 10）")
+    parser.add_argument('--no-progress', action='store_true',
+                        help="关闭进度条输出（输出不是终端时默认关闭）")
+    parser.add_argument('--chart-aggregate-threshold', type=int, default=charting.AGGREGATION_THRESHOLD,
+                        help="样本数超过该值时散点图改为分箱密度图（默认 %(default)s，小于 0 表示始终绘制散点）")
+    parser.add_argument('--no-chart-cache', action='store_true',
+                        help="忽略图表缓存清单，强制重新渲染全部图表")
+    parser.add_argument('--dedup', action='store_true',
+                        help="对相同设计去重后执行单元件生成与结构验证（不生成这两个模块的图表）")
+    parser.add_argument('--dedup-tolerance', nargs='+', default=None, metavar='TOL',
+                        help="去重前按公差量化参数列，公差内的设计视为相同（需配合 --dedup）："
+                             "纯数值为宽度/高度/厚度的加工公差（米），'列名=公差' 为单列量化步长")
+    parser.add_argument('--export-mesh', metavar='PATH',
+                        help="生成单元件面板三角网格并写出为压缩 npz（相同类型共用一份网格）")
+    parser.add_argument('--clash-report', metavar='PATH',
+                        help="误差修正后检测相邻单元件碰撞与接缝超限，逐样本结果写入该 CSV 路径")
+    parser.add_argument('--stackup-report', metavar='PATH',
+                        help="误差修正后按安装行列计算公差累积（伸缩缝处清零），逐样本结果写入该 CSV 路径")
+    parser.add_argument('--stackup-draws', type=int, default=0, metavar='N',
+                        help="公差累积的蒙特卡洛抽样次数，报告中增加各位置超限概率（需配合 --stackup-report）")
+    parser.add_argument('--nesting', action='store_true',
+                        help="按修正后尺寸在标准板材上排料，并以分摊的板材成本替换施工数据中的材料成本")
+    parser.add_argument('--nesting-improve', type=int, default=0, metavar='N',
+                        help="排料改进轮数：额外尝试 N 种随机扰动及若干排序规则，取板材成本最低者（较慢）")
+    parser.add_argument('--install-crews', type=int, default=0, metavar='N',
+                        help="以 N 个安装班组进行安装排程仿真，输出总工期与资源利用率（0 表示不仿真）")
+    parser.add_argument('--wind-dynamic', action='store_true',
+                        help="结构验证采用动态风荷载时程分析（风速谱合成 + 单自由度 FFT 响应），以峰值应力计算安全系数")
+    parser.add_argument('--wind-speed', type=float, default=30.0, metavar='V',
+                        help="动态风荷载分析的 10 m 高度平均风速（m/s，默认 %(default)s）")
+    parser.add_argument('--metrics-cube', metavar='PATH',
+                        help="将预聚合指标立方体（各分组的计数/求和/平方和/最值）写入该 JSON 路径")
+    parser.add_argument('--checkpoint-dir', metavar='DIR',
+                        help="将各阶段输出写为列式检查点（供 run_diff.py 对比两次运行）")
+    parser.add_argument('--workload', metavar='DIR',
+                        help="以 workload_generator.py 生成的合成工作负载作为输入数据（替代默认的 50 个随机样本）")
+    args = parser.parse_args(argv)
+    if args.stackup_draws < 0:
+        parser.error("--stackup-draws 不能为负数")
+    if args.dedup_tolerance:
+        try:
+            args.dedup_tolerance = parse_tolerances(args.dedup_tolerance)
+        except ValueError as e:
+            parser.error(f"--dedup-tolerance: {e}")
+    if args.wind_dynamic and args.dedup:
+        # 风振响应取决于单元件标高，相同设计不能共用同一结果
+        parser.error("--wind-dynamic 不能与 --dedup 同时使用")
+    return args
+
+def main(argv=None):
     """主程序入口，启动幕墙单元件快速生成验证系统"""
+    args = parse_args(argv)
+    configure_logging(json_path=args.log_json, progress_hz=args.progress_hz,
+                      progress_enabled=False if args.no_progress else None)
+    charting.set_aggregation_threshold(
+        args.chart_aggregate_threshold if args.chart_aggregate_threshold >= 0 else None)
+    chart_cache.enabled = not args.no_chart_cache
+    if args.profile_report:
+        profiler.enable(trace_memory=args.profile_memory, cprofile_stage=args.cprofile_stage)
     start_time = time.time()
     print_log("===== 幕墙单元件快速生成验证系统启动 =====")
 
     print_log("接收数据...")
-    basic_params = generate_basic_parameters(50)  
+    if args.workload:
+        basic_params, construction_data = pipeline_frames(load_workload(args.workload))
+    else:
+        basic_params = generate_basic_parameters(50)  
+        construction_data = generate_construction_data(50)  
     association_rules = generate_association_rules()  
-    construction_data = generate_construction_data(50)  
     print_log("数据接收完成")
     
     # 执行参数输入处理模块
     param_module = ParameterInputModule(basic_params, association_rules)
     processed_params = param_module.run()
     
-    # 执行单元件生成模块
-    unit_module = UnitGenerationModule(processed_params)
-    unit_results = unit_module.run()
+    if args.dedup:
+        # 去重后执行单元件生成与结构验证的确定性计算
+        optimized_params = evaluate_deduplicated(processed_params, tolerance=args.dedup_tolerance)
+    else:
+        # 执行单元件生成模块
+        unit_module = UnitGenerationModule(processed_params)
+        unit_results = unit_module.run()
+        
+        # 执行结构验证模块
+        structure_module = StructureVerificationModule(
+            unit_results, wind_mode='dynamic' if args.wind_dynamic else 'static',
+            wind_options={'reference_speed': args.wind_speed})
+        optimized_params = structure_module.run()
     
-    # 执行结构验证模块
-    structure_module = StructureVerificationModule(unit_results)
-    optimized_params = structure_module.run()
+    if args.export_mesh:
+        mesh_path, mesh_size = save_panel_meshes(args.export_mesh, build_panel_meshes(optimized_params))
+        print_log(f"面板网格已写入: {mesh_path} ({mesh_size / 1024:.1f} KB)")
     
     # 执行误差修正模块
     error_module = ErrorCorrectionModule(optimized_params)
     correction_data = error_module.run()
     
+    if args.clash_report:
+        clash_report, _ = detect_clashes(correction_data)
+        clash_report.to_csv(args.clash_report, index=False, encoding='utf-8-sig')
+        print_log(f"碰撞检测报告已写入: {args.clash_report}")
+    
+    if args.stackup_report:
+        stackup_report = analyze_stackup(correction_data)
+        stackup_summary = None
+        if args.stackup_draws > 0:
+            positions, stackup_summary = monte_carlo_stackup(correction_data, draws=args.stackup_draws)
+            stackup_report = stackup_report.merge(positions.drop(columns=['安装行', '安装列']), on='样本编号')
+        log_stackup_summary(stackup_report, stackup_summary)
+        stackup_report.to_csv(args.stackup_report, index=False, encoding='utf-8-sig')
+        print_log(f"公差累积报告已写入: {args.stackup_report}")
+    
+    if args.nesting:
+        pieces, _, _ = nest_units(correction_data, improve=args.nesting_improve)
+        construction_data = apply_material_cost(construction_data, pieces)
+    
     # 执行数据关联模块
     association_module = DataAssociationModule(correction_data, construction_data)
     association_record = association_module.run()
+    metrics_cube = MetricsCube.from_frame(cube_frame(association_record, optimized_params))
     
-    # 输出最终结果摘要
+    if args.checkpoint_dir:
+        stage_outputs = {'parameter_input': processed_params, 'structure_verification': optimized_params,
+                         'error_correction': correction_data, 'data_association': association_record}
+        checkpoint_size = sum(save_checkpoint(args.checkpoint_dir, stage, frame) for stage, frame in stage_outputs.items())
+        print_log(f"阶段检查点已写入: {args.checkpoint_dir} ({checkpoint_size / 1024:.1f} KB)")
+    
+    if args.install_crews > 0:
+        install_units = construction_data[['样本编号', '施工时间(小时)']].merge(
+            correction_data[['样本编号', '重量(kg)']], on='样本编号')
+        _, install_resources, makespan = simulate_installation(install_units, crews=args.install_crews)
+        log_schedule_summary(install_resources, makespan)
+    
+    # 输出最终结果摘要（均值读取自指标立方体）
     print_log("\n===== 系统运行结果摘要 =====")
     print_log(f"总样本数: {len(association_record)}")
-    print_log(f"平均规则匹配度: {association_record['规则匹配度'].mean():.2f}")
-    print_log(f"平均适配性评分: {association_record['适配性评分'].mean():.2f}")
-    print_log(f"平均设计-施工关联度: {association_record['设计-施工关联度'].mean():.2f}")
-    print_log(f"平均成本效率: {association_record['成本效率(元/㎡)'].mean():.2f} 元/㎡")
+    print_log(f"平均规则匹配度: {metrics_cube.mean('规则匹配度'):.2f}")
+    print_log(f"平均适配性评分: {metrics_cube.mean('适配性评分'):.2f}")
+    print_log(f"平均设计-施工关联度: {metrics_cube.mean('设计-施工关联度'):.2f}")
+    print_log(f"平均成本效率: {metrics_cube.mean('成本效率(元/㎡)'):.2f} 元/㎡")
+    if args.metrics_cube:
+        log_cube_summary(metrics_cube)
+        cube_size = metrics_cube.save(args.metrics_cube)
+        print_log(f"指标立方体已写入: {args.metrics_cube} ({cube_size / 1024:.1f} KB)")
+    cache_stats = chart_cache.stats()
+    print_log(f"图表缓存: 命中 {cache_stats['命中']} 张, 重新渲染 {cache_stats['未命中']} 张")
     
     end_time = time.time()
     print_log(f"\n===== 系统运行完成，总耗时: {end_time - start_time:.2f} 秒 =====")
+    
+    if args.profile_report:
+        csv_path = os.path.splitext(args.profile_report)[0] + '.csv'
+        profiler.write_report(args.profile_report, csv_path)
+        for item in profiler.summary():
+            print_log(f"{item['阶段']}: {item['调用次数']} 次, 墙钟 {item['墙钟时间(秒)']:.3f} 秒, "
+                      f"CPU {item['CPU时间(秒)']:.3f} 秒, {item['吞吐量(行/秒)']:.0f} 行/秒")
+        print_log(f"剖析报告已写入: {args.profile_report}")
+        profiler.disable()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
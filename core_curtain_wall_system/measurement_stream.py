@@ -0,0 +1,332 @@
+"""
+现场实测数据流式接入：以 asyncio 持续读取测量人员/扫描仪产生的实测偏差（追加写入的本地文件或本地套接字，
+每行一条 JSON 记录），按批解析写入以样本编号为键的环形缓冲区（每个单元件保留最近若干次测量），
+仅对本批涉及的单元件用误差修正模块的公式重新计算修正后参数与适配性评分；附带本地回放生成器用于测试
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+from error_correction import DEVIATION_COLUMNS, compute_deviation_indices, compute_corrections
+
+# 每个单元件保留的最近测量次数，实测值取其均值以平滑单次测量噪声
+RING_DEPTH = 4
+
+# 批处理：累计满 BATCH_SIZE 条或距批内首条记录超过 MAX_BATCH_DELAY 秒即处理
+BATCH_SIZE = 2000
+MAX_BATCH_DELAY = 0.05
+
+# 文件尾随读取的轮询间隔（秒）
+POLL_INTERVAL = 0.02
+
+# 修正结果列（随实测更新）
+CORRECTED_COLUMNS = ['尺寸偏差指数', '形态偏差指数', '总体偏差指数', '宽度修正系数', '高度修正系数', '厚度修正系数',
+                     '修正后宽度(m)', '修正后高度(m)', '修正后厚度(m)', '修正后曲率', '修正后角度(度)', '适配性评分']
+
+
+class MeasurementRingBuffer:
+    """以样本编号为键的环形缓冲区：数组 (单元件数, RING_DEPTH, 偏差列数)，未测量的槽位为 NaN"""
+    def __init__(self, sample_ids, depth=RING_DEPTH, fields=None):
+        self.fields = list(fields or DEVIATION_COLUMNS)
+        self.depth = depth
+        self.sample_ids = np.asarray(sample_ids)
+        self._order = np.argsort(self.sample_ids, kind='stable')
+        self._sorted_ids = self.sample_ids[self._order]
+        self.values = np.full((len(self.sample_ids), depth, len(self.fields)), np.nan)
+        self.next_slot = np.zeros(len(self.sample_ids), dtype=np.int64)
+        self.measurements = np.zeros(len(self.sample_ids), dtype=np.int64)
+
+    def rows(self, sample_ids):
+        """样本编号 → 行号，未知编号返回 -1"""
+        position = np.searchsorted(self._sorted_ids, sample_ids)
+        position = np.minimum(position, len(self._sorted_ids) - 1)
+        known = self._sorted_ids[position] == sample_ids
+        return np.where(known, self._order[position], -1)
+
+    def insert(self, rows, values):
+        """按到达顺序批量写入 (记录数,) 行号与 (记录数, 偏差列数) 取值，返回本批涉及的行号"""
+        order = np.argsort(rows, kind='stable')
+        rows, values = rows[order], values[order]
+        # 批内同一单元件的第 k 条记录写入 next_slot + k；超过环形深度的较早记录会被覆盖，直接丢弃
+        unique_rows, first, counts = np.unique(rows, return_index=True, return_counts=True)
+        rank = np.arange(len(rows)) - np.repeat(first, counts)
+        keep = rank >= np.repeat(counts, counts) - self.depth
+        slot = (self.next_slot[rows] + rank) % self.depth
+        self.values[rows[keep], slot[keep]] = values[keep]
+        self.next_slot[unique_rows] = (self.next_slot[unique_rows] + counts) % self.depth
+        self.measurements[unique_rows] += counts
+        return unique_rows
+
+    def estimate(self, rows):
+        """各行最近测量的均值（逐列忽略 NaN，某列从未测量时为 NaN）"""
+        window = self.values[rows]
+        counts = (~np.isnan(window)).sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            return np.where(counts > 0, np.nansum(window, axis=1) / np.maximum(counts, 1), np.nan)
+
+
+class IncrementalCorrection:
+    """持有误差修正数据集，按实测偏差只重新计算受影响单元件的修正结果"""
+    def __init__(self, correction_data, depth=RING_DEPTH):
+        self.correction_data = correction_data.reset_index(drop=True).copy()
+        self.buffer = MeasurementRingBuffer(self.correction_data['样本编号'].to_numpy(), depth)
+        self.updated_units = 0
+        self.unknown_records = 0
+
+    def apply(self, sample_ids, values):
+        """写入一批实测记录并重新计算受影响单元件，返回受影响的行号"""
+        rows = self.buffer.rows(np.asarray(sample_ids))
+        known = rows >= 0
+        self.unknown_records += int((~known).sum())
+        if not known.any():
+            return np.zeros(0, dtype=np.int64)
+        with profiler.measure('measurement_stream.apply', int(known.sum())):
+            affected = self.buffer.insert(rows[known], np.asarray(values, dtype=np.float64)[known])
+            measured = self.buffer.estimate(affected)
+            subset = self.correction_data.loc[affected].copy()
+            # 未测量的偏差列保留原值
+            current = subset[DEVIATION_COLUMNS].to_numpy(dtype=np.float64)
+            subset[DEVIATION_COLUMNS] = np.where(np.isnan(measured), current, measured)
+            compute_corrections(compute_deviation_indices(subset))
+            self.correction_data.loc[affected, DEVIATION_COLUMNS + CORRECTED_COLUMNS] = \
+                subset[DEVIATION_COLUMNS + CORRECTED_COLUMNS]
+        self.updated_units += len(affected)
+        return affected
+
+
+def _as_float(value):
+    """缺失字段（None）记为 NaN；布尔值、非数值或非有限取值（含字符串 "inf"、"nan"）抛出 ValueError / TypeError"""
+    if value is None:
+        return np.nan
+    if isinstance(value, bool):
+        raise TypeError(f"布尔值不是测量值: {value!r}")
+    number = float(value)
+    if not np.isfinite(number):
+        raise ValueError(f"非有限数值: {value!r}")
+    return number
+
+
+def _as_sample_id(value):
+    """样本编号须为整数取值（允许 3.0 形式），2.9 等非整数视为无效"""
+    number = _as_float(value)
+    if np.isnan(number) or number != int(number):
+        raise ValueError(f"样本编号不是整数: {value!r}")
+    return int(number)
+
+
+def parse_records(lines):
+    """解析一批 JSON 行，返回 (样本编号数组, 偏差取值数组, 采集时间戳数组)；无法解析或含非数值字段的行跳过"""
+    sample_ids, values, stamps = [], [], []
+    for line in lines:
+        try:
+            record = json.loads(line)
+            sample_id = _as_sample_id(record['样本编号'])
+            row = [_as_float(record.get(name)) for name in DEVIATION_COLUMNS]
+            stamp = _as_float(record.get('时间戳'))
+        except (ValueError, KeyError, TypeError):
+            continue
+        sample_ids.append(sample_id)
+        values.append(row)
+        stamps.append(stamp)
+    return (np.array(sample_ids, dtype=np.int64), np.array(values, dtype=np.float64).reshape(-1, len(DEVIATION_COLUMNS)),
+            np.array(stamps, dtype=np.float64))
+
+
+async def tail_file(path, queue, from_start=False, poll=POLL_INTERVAL):
+    """尾随读取追加写入的测量文件，每次读到的完整行作为一组放入队列；文件尚未创建时等待"""
+    while not os.path.exists(path):
+        await asyncio.sleep(poll)
+    with open(path, encoding='utf-8') as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        pending = ''
+        while True:
+            chunk = f.read()
+            if not chunk:
+                await asyncio.sleep(poll)
+                continue
+            pending += chunk
+            *lines, pending = pending.split('\n')
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                await queue.put(lines)
+
+
+async def serve_socket(host, port, queue):
+    """本地 TCP 套接字接入：每个连接读取到的完整行作为一组放入队列，返回 asyncio 服务器对象"""
+    async def handle(reader, writer):
+        pending = b''
+        try:
+            while chunk := await reader.read(1 << 16):
+                *lines, pending = (pending + chunk).split(b'\n')
+                lines = [line.decode('utf-8') for line in lines if line.strip()]
+                if lines:
+                    await queue.put(lines)
+        finally:
+            writer.close()
+    return await asyncio.start_server(handle, host, port)
+
+
+class IngestionPipeline:
+    """从队列（元素为若干行组成的列表）按批取出记录、解析并增量修正，记录端到端延迟（采集时间戳 → 修正完成）"""
+    def __init__(self, correction, batch_size=BATCH_SIZE, max_delay=MAX_BATCH_DELAY, on_batch=None):
+        self.correction = correction
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.on_batch = on_batch
+        self.records = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.latencies = []
+
+    async def run(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            lines = list(await queue.get())
+            deadline = loop.time() + self.max_delay
+            while len(lines) < self.batch_size:
+                if not queue.empty():
+                    lines.extend(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    lines.extend(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # 单个批次出错只记录日志并丢弃该批，不终止接入任务
+            try:
+                sample_ids, values, stamps = parse_records(lines)
+                affected = self.correction.apply(sample_ids, values)
+            except Exception as exc:
+                self.failed_batches += 1
+                print_log(f"实测批次处理失败，已丢弃 {len(lines)} 行: {exc!r}")
+                continue
+            finished = time.time()
+            self.latencies.extend((finished - stamps[~np.isnan(stamps)]).tolist())
+            self.records += len(sample_ids)
+            self.rejected += len(lines) - len(sample_ids)
+            self.batches += 1
+            if self.on_batch:
+                self.on_batch(affected)
+
+    def stats(self):
+        latency = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            '记录数': self.records,
+            '无效记录数': self.rejected,
+            '批次数': self.batches,
+            '失败批次数': self.failed_batches,
+            '更新单元件次数': self.correction.updated_units,
+            '未知样本记录数': self.correction.unknown_records,
+            '延迟P50(秒)': float(np.percentile(latency, 50)),
+            '延迟P99(秒)': float(np.percentile(latency, 99)),
+            '延迟最大(秒)': float(latency.max()),
+        }
+
+
+def replay_records(correction_data, count, noise=0.1, seed=None):
+    """回放记录生成器：在单元件现有偏差附近加测量噪声，随机挑选样本，部分记录只含尺寸偏差"""
+    rng = np.random.default_rng(seed)
+    sample_ids = correction_data['样本编号'].to_numpy()
+    base = correction_data[DEVIATION_COLUMNS].to_numpy(dtype=np.float64)
+    scale = np.array([0.5, 0.5, 0.8, 0.03, 0.5]) * noise
+    for _ in range(count):
+        row = rng.integers(len(sample_ids))
+        measured = base[row] + rng.normal(0, scale)
+        fields = DEVIATION_COLUMNS if rng.random() < 0.7 else DEVIATION_COLUMNS[:3]
+        record = {'样本编号': int(sample_ids[row])}
+        record.update({name: round(float(measured[k]), 5) for k, name in enumerate(DEVIATION_COLUMNS) if name in fields})
+        yield record
+
+
+async def replay(correction_data, rate, duration, path=None, address=None, seed=None):
+    """按给定速率（条/秒）回放实测记录，写入追加文件或发送到本地套接字；每条记录带采集时间戳"""
+    total = int(rate * duration)
+    records = replay_records(correction_data, total, seed=seed)
+    writer = None
+    handle = open(path, 'a', encoding='utf-8') if path else None
+    if address:
+        _, writer = await asyncio.open_connection(*address)
+    tick = 0.01
+    started = time.time()
+    sent = 0
+    try:
+        while sent < total:
+            # 按时间片批量发送，使平均速率符合设定值
+            due = min(int((time.time() - started) * rate) + 1, total)
+            lines = []
+            for record in (next(records) for _ in range(due - sent)):
+                record['时间戳'] = time.time()
+                lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+            sent = due
+            payload = ''.join(lines)
+            if handle:
+                handle.write(payload)
+                handle.flush()
+            if writer:
+                writer.write(payload.encode('utf-8'))
+                await writer.drain()
+            await asyncio.sleep(tick)
+    finally:
+        if handle:
+            handle.close()
+        if writer:
+            writer.close()
+    return sent
+
+
+async def _demo(args):
+    rng = np.random.default_rng(0)
+    n = args.units
+    correction_data = pd.DataFrame({
+        '样本编号': np.arange(1, n + 1),
+        '宽度(m)': rng.uniform(0.5, 2.0, n), '高度(m)': rng.uniform(1.0, 3.5, n), '优化后厚度(m)': rng.uniform(0.1, 0.3, n),
+        '曲率': rng.uniform(-0.5, 0.5, n), '倾斜角度(度)': rng.uniform(0, 15, n),
+        **{name: rng.normal(0, std, n) for name, std in zip(DEVIATION_COLUMNS, [0.5, 0.5, 0.8, 0.03, 0.5])},
+    })
+    compute_corrections(compute_deviation_indices(correction_data))
+
+    queue = asyncio.Queue()
+    pipeline = IngestionPipeline(IncrementalCorrection(correction_data))
+    consumer = asyncio.create_task(pipeline.run(queue))
+    if args.file:
+        if os.path.exists(args.file):
+            os.remove(args.file)
+        producer = asyncio.create_task(tail_file(args.file, queue, from_start=True))
+        address = None
+    else:
+        server = await serve_socket('127.0.0.1', args.port, queue)
+        producer = None
+        address = ('127.0.0.1', args.port)
+
+    print_log(f"回放实测记录: {args.rate} 条/秒, 持续 {args.duration} 秒, {n} 个单元件")
+    await replay(correction_data, args.rate, args.duration, path=args.file, address=address, seed=1)
+    await asyncio.sleep(0.5)
+    consumer.cancel()
+    if producer:
+        producer.cancel()
+    else:
+        server.close()
+    stats = pipeline.stats()
+    print_log(f"已处理 {stats['记录数']} 条记录 (无效 {stats['无效记录数']} 条), {stats['批次数']} 批, "
+              f"更新单元件 {stats['更新单元件次数']} 次, "
+              f"端到端延迟 P50 {stats['延迟P50(秒)'] * 1000:.1f} ms / P99 {stats['延迟P99(秒)'] * 1000:.1f} ms / "
+              f"最大 {stats['延迟最大(秒)'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="现场实测数据流式接入（本地回放演示）")
+    parser.add_argument('--file', metavar='PATH', help="通过尾随读取该追加文件接入（默认使用本地 TCP 套接字）")
+    parser.add_argument('--port', type=int, default=8765, help="本地套接字端口（默认 %(default)s）")
+    parser.add_argument('--rate', type=int, default=5000, help="回放速率，条/秒（默认 %(default)s）")
+    parser.add_argument('--duration', type=float, default=5.0, help="回放时长，秒（默认 %(default)s）")
+    parser.add_argument('--units', type=int, default=20000, help="单元件数（默认 %(default)s）")
+    asyncio.run(_demo(parser.parse_args()))
@@ -0,0 +1,189 @@
+"""
+指标预聚合立方体：按若干分组维度的全组合，为每个指标保存计数、求和、平方和、最小值与最大值，
+一次向量化遍历即可构建，也可按数据块增量累加后合并；分组汇总与看板下钻只需读取立方体（几 KB），
+无需重新扫描逐样本记录
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+
+# 分组维度：列名 + 取值列表，或对数值列分箱（区间右闭）；未匹配任何取值的样本归入"缺失"
+CUBE_DIMENSIONS = {
+    '关联度分组': {'列': '关联度分组', '取值': ['低关联度', '中关联度', '高关联度']},
+    '需要优化': {'列': '需要优化', '取值': [False, True]},
+    '材料等级': {'列': '材料强度(MPa)', '分箱': [0, 267, 333, 1000], '取值': ['低强度', '中强度', '高强度']},
+}
+
+# 预聚合的指标列
+CUBE_METRICS = ['规则匹配度', '适配性评分', '设计-施工关联度', '成本效率(元/㎡)', '总成本(元)',
+                '施工时间(小时)', '单位面积施工时间']
+
+MISSING_LEVEL = '缺失'
+
+
+def _level_codes(frame, spec):
+    """将维度列映射为取值序号，未匹配的样本记为最后一个（缺失）序号"""
+    levels = spec['取值']
+    column = frame[spec['列']]
+    if '分箱' in spec:
+        values = column.to_numpy(dtype=np.float64)
+        edges = np.asarray(spec['分箱'], dtype=np.float64)
+        codes = np.searchsorted(edges, values, side='left') - 1
+        # 区间右闭：恰好等于最小边界的样本归入第一个区间
+        codes[values == edges[0]] = 0
+        codes[np.isnan(values) | (codes < 0) | (codes >= len(levels))] = len(levels)
+        return codes
+    codes = pd.Categorical(column, categories=levels).codes.astype(np.int64)
+    codes[codes < 0] = len(levels)
+    return codes
+
+
+class MetricsCube:
+    """各维度取值全组合上的指标统计量；数组形状为 (各维度取值数 + 1, ..., 指标数)"""
+    def __init__(self, dimensions=None, metrics=None):
+        self.dimensions = CUBE_DIMENSIONS if dimensions is None else dimensions
+        self.metrics = list(CUBE_METRICS if metrics is None else metrics)
+        self.levels = {name: [str(level) for level in spec['取值']] + [MISSING_LEVEL]
+                       for name, spec in self.dimensions.items()}
+        shape = tuple(len(levels) for levels in self.levels.values()) + (len(self.metrics),)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def add(self, frame):
+        """累加一个数据块（可多次调用）"""
+        cells = int(np.prod(self.count.shape[:-1]))
+        with profiler.measure('metrics_cube.add', len(frame)):
+            flat = np.zeros(len(frame), dtype=np.int64)
+            for name, spec in self.dimensions.items():
+                flat = flat * len(self.levels[name]) + _level_codes(frame, spec)
+
+            count = self.count.reshape(cells, -1)
+            total, total_sq = self.sum.reshape(cells, -1), self.sumsq.reshape(cells, -1)
+            low, high = self.min.reshape(cells, -1), self.max.reshape(cells, -1)
+            for k, metric in enumerate(self.metrics):
+                values = frame[metric].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                index, values = flat[valid], values[valid]
+                count[:, k] += np.bincount(index, minlength=cells)
+                total[:, k] += np.bincount(index, weights=values, minlength=cells)
+                total_sq[:, k] += np.bincount(index, weights=values * values, minlength=cells)
+                np.minimum.at(low[:, k], index, values)
+                np.maximum.at(high[:, k], index, values)
+        return self
+
+    def merge(self, other):
+        """合并另一个维度与指标相同的立方体（如其他进程或数据块的结果）"""
+        if other.levels != self.levels or other.metrics != self.metrics:
+            raise ValueError("立方体维度或指标不一致，无法合并")
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    @classmethod
+    def from_frame(cls, frame, dimensions=None, metrics=None, chunk_size=None):
+        cube = cls(dimensions, metrics)
+        chunk_size = chunk_size or max(len(frame), 1)
+        for start in range(0, len(frame), chunk_size):
+            cube.add(frame.iloc[start:start + chunk_size])
+        return cube
+
+    def rollup(self, by=()):
+        """按给定维度上卷（其余维度汇总），返回按 by 顺序排列的 (count, sum, sumsq, min, max) 数组"""
+        names = list(self.levels)
+        axes = tuple(k for k, name in enumerate(names) if name not in by)
+        kept = [name for name in names if name in by]
+        order = [kept.index(name) for name in by] + [len(by)]
+        reduce = lambda array, ufunc: np.transpose(ufunc.reduce(array, axis=axes), order)
+        return (reduce(self.count, np.add), reduce(self.sum, np.add), reduce(self.sumsq, np.add),
+                reduce(self.min, np.minimum), reduce(self.max, np.maximum))
+
+    def summary(self, by=(), drop_empty=True):
+        """分组汇总表：每个分组每个指标的样本数、均值、标准差、最小值与最大值"""
+        by = [by] if isinstance(by, str) else list(by)
+        count, total, total_sq, low, high = (array.reshape(-1, len(self.metrics)) for array in self.rollup(by))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            std = np.sqrt(np.maximum(total_sq - count * mean ** 2, 0.0) / (count - 1))
+        std[count < 2] = np.nan
+        empty = count == 0
+        low, high = np.where(empty, np.nan, low), np.where(empty, np.nan, high)
+
+        groups = list(pd.MultiIndex.from_product([self.levels[name] for name in by])) if by else [()]
+        rows = []
+        for g, group in enumerate(groups):
+            for k, metric in enumerate(self.metrics):
+                if drop_empty and empty[g, k]:
+                    continue
+                rows.append({**dict(zip(by, group)), '指标': metric, '样本数': int(count[g, k]), '均值': mean[g, k],
+                             '标准差': std[g, k], '最小值': low[g, k], '最大值': high[g, k]})
+        return pd.DataFrame(rows)
+
+    def mean(self, metric, by=()):
+        """指标均值；by 为空时返回总体均值，否则返回按分组索引的 Series"""
+        by = [by] if isinstance(by, str) else list(by)
+        k = self.metrics.index(metric)
+        count, total, _, _, _ = self.rollup(by)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = total[..., k] / count[..., k]
+        if not by:
+            return float(values)
+        index = pd.MultiIndex.from_product([self.levels[name] for name in by], names=by)
+        return pd.Series(values.reshape(-1), index=index if len(by) > 1 else index.get_level_values(0), name=metric)
+
+    def to_dict(self):
+        finite = lambda array: np.where(np.isfinite(array), array, None).tolist()
+        return {
+            '维度': self.levels,
+            '维度定义': self.dimensions,
+            '指标': self.metrics,
+            '计数': self.count.tolist(),
+            '求和': self.sum.tolist(),
+            '平方和': self.sumsq.tolist(),
+            '最小值': finite(self.min),
+            '最大值': finite(self.max),
+        }
+
+    def save(self, path):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        return os.path.getsize(path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        cube = cls(data['维度定义'], data['指标'])
+        cube.count = np.array(data['计数'], dtype=np.int64)
+        cube.sum = np.array(data['求和'], dtype=np.float64)
+        cube.sumsq = np.array(data['平方和'], dtype=np.float64)
+        cube.min = np.array(data['最小值'], dtype=np.float64)
+        cube.max = np.array(data['最大值'], dtype=np.float64)
+        # JSON 中的 None 读回为 NaN，恢复为空单元格的初始值
+        cube.min[np.isnan(cube.min)] = np.inf
+        cube.max[np.isnan(cube.max)] = -np.inf
+        return cube
+
+
+def cube_frame(association_record, optimized_params):
+    """将结构验证阶段的维度列（需要优化、材料强度）并入关联记录，作为立方体的输入"""
+    dimension_columns = [spec['列'] for spec in CUBE_DIMENSIONS.values() if spec['列'] not in association_record]
+    return association_record.merge(optimized_params[['样本编号'] + dimension_columns], on='样本编号', how='left')
+
+
+def log_cube_summary(cube, metric='成本效率(元/㎡)'):
+    """打印指标在各维度上的分组均值"""
+    for name in cube.levels:
+        means = cube.mean(metric, by=name).dropna()
+        print_log(f"{metric} 按{name}: " + ", ".join(f"{level} {value:.2f}" for level, value in means.items()))
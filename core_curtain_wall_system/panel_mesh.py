@@ -0,0 +1,118 @@
+"""
+单元件面板网格：由宽度、高度、厚度、曲率与倾斜角度生成带厚度的柱面弯曲面板三角网格，
+所有单元件的顶点一次性按数组广播计算；相同单元件类型只生成一份网格，样本以实例引用该网格，
+结果以索引化的顶点/面数组写入压缩 npz，供加工团队使用
+"""
+import json
+import os
+import numpy as np
+from utils import print_log
+from profiler import profiler
+from dedup import unique_designs
+
+# 每块面板沿宽度方向的分段数（所有面板拓扑相同，共用一份面索引）
+MESH_SEGMENTS = 8
+
+# 网格参数列
+MESH_COLUMNS = ['宽度(m)', '高度(m)', '厚度(m)', '曲率', '倾斜角度(度)']
+
+# 判定为同一单元件类型的量化公差：尺寸 1 mm、曲率 0.001、角度 0.01 度
+MESH_TOLERANCE = {'宽度(m)': 0.001, '高度(m)': 0.001, '厚度(m)': 0.001, '曲率': 0.001, '倾斜角度(度)': 0.01}
+
+
+def _vertex_index(surface, row, column, segments):
+    """顶点编号：surface 0 外表面、1 内表面；row 0 底边、1 顶边；column 为宽度方向分段点"""
+    return surface * 2 * (segments + 1) + row * (segments + 1) + column
+
+
+def panel_faces(segments=MESH_SEGMENTS):
+    """面板三角面索引 (8·segments+4, 3)，法向朝外"""
+    i = np.arange(segments)
+    v = lambda s, r, c: _vertex_index(s, r, c, segments)
+    quads = [
+        # 外表面、内表面
+        np.stack([v(0, 0, i), v(0, 0, i + 1), v(0, 1, i + 1), v(0, 1, i)], axis=1),
+        np.stack([v(1, 0, i + 1), v(1, 0, i), v(1, 1, i), v(1, 1, i + 1)], axis=1),
+        # 底边、顶边
+        np.stack([v(1, 0, i), v(1, 0, i + 1), v(0, 0, i + 1), v(0, 0, i)], axis=1),
+        np.stack([v(0, 1, i), v(0, 1, i + 1), v(1, 1, i + 1), v(1, 1, i)], axis=1),
+        # 左右侧边
+        np.array([[v(1, 0, 0), v(0, 0, 0), v(0, 1, 0), v(1, 1, 0)]]),
+        np.array([[v(0, 0, segments), v(1, 0, segments), v(1, 1, segments), v(0, 1, segments)]]),
+    ]
+    quads = np.concatenate(quads)
+    return np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]]).astype(np.int32)
+
+
+def panel_vertices(width, height, thickness, curvature, inclination, segments=MESH_SEGMENTS):
+    """批量生成面板顶点 (M, 4·(segments+1), 3)
+
+    面板中面为绕竖直轴弯曲的柱面（曲率 κ，沿宽度方向弧长为宽度），厚度沿中面法向对称展开，
+    最后绕宽度方向轴倾斜 inclination 度；面板底边中点位于局部坐标原点
+    """
+    width, height, thickness, curvature, inclination = (
+        np.asarray(value, dtype=np.float64)[:, None] for value in (width, height, thickness, curvature, inclination))
+    u = (np.linspace(-0.5, 0.5, segments + 1)[None, :]) * width
+    theta = curvature * u
+    # sin(θ)/κ 与 (1-cos θ)/κ 用 sinc 表示，κ→0 时自然退化为平板
+    x = u * np.sinc(theta / np.pi)
+    z = 0.5 * curvature * u ** 2 * np.sinc(theta / (2 * np.pi)) ** 2
+    normal_x, normal_z = -np.sin(theta), np.cos(theta)
+
+    half = thickness / 2
+    vertices = np.empty((len(width), 2, 2, segments + 1, 3))
+    for surface, sign in enumerate((1.0, -1.0)):
+        for row in range(2):
+            vertices[:, surface, row, :, 0] = x + sign * half * normal_x
+            vertices[:, surface, row, :, 1] = row * height
+            vertices[:, surface, row, :, 2] = z + sign * half * normal_z
+
+    angle = np.radians(inclination)[:, :, None, None]
+    y, z = vertices[..., 1].copy(), vertices[..., 2].copy()
+    vertices[..., 1] = y * np.cos(angle) - z * np.sin(angle)
+    vertices[..., 2] = y * np.sin(angle) + z * np.cos(angle)
+    return vertices.reshape(len(width), -1, 3)
+
+
+def build_panel_meshes(frame, tolerance=None, segments=MESH_SEGMENTS):
+    """为数据表中的所有单元件生成网格；相同类型只生成一次，返回网格集合字典"""
+    tolerance = MESH_TOLERANCE if tolerance is None else tolerance
+    with profiler.measure('panel_mesh.build_panel_meshes', len(frame)):
+        first, inverse = unique_designs(frame, MESH_COLUMNS, tolerance)
+        types = frame.iloc[first]
+        vertices = panel_vertices(*(types[name].to_numpy() for name in MESH_COLUMNS), segments=segments)
+    print_log(f"面板网格生成: {len(frame)} 个单元件, {len(first)} 种类型, "
+              f"每种 {vertices.shape[1]} 个顶点 / {8 * segments + 4} 个三角面")
+    return {
+        'vertices': vertices.astype(np.float32),
+        'faces': panel_faces(segments),
+        'type_params': types[MESH_COLUMNS].to_numpy(dtype=np.float32),
+        'instance_type': inverse.astype(np.int32),
+        'instance_id': frame['样本编号'].to_numpy(dtype=np.int64) if '样本编号' in frame else np.arange(len(frame)),
+    }
+
+
+def save_panel_meshes(path, meshes):
+    """写出压缩 npz：vertices (类型数, 顶点数, 3) float32、faces 共用面索引、instance_type 为每个样本引用的类型；
+    返回 (实际文件名, 字节数)，np.savez_compressed 会给无扩展名的路径补上 .npz"""
+    if not path.endswith('.npz'):
+        path += '.npz'
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    metadata = {'columns': MESH_COLUMNS, 'units': 'm', 'up_axis': 'y'}
+    np.savez_compressed(path, metadata=np.array(json.dumps(metadata, ensure_ascii=False)), **meshes)
+    return path, os.path.getsize(path)
+
+
+def load_panel_meshes(path):
+    """读取 save_panel_meshes 写出的网格集合"""
+    with np.load(path) as data:
+        meshes = {name: data[name] for name in data.files if name != 'metadata'}
+        meshes['metadata'] = json.loads(str(data['metadata']))
+    return meshes
+
+
+def instance_mesh(meshes, index):
+    """返回第 index 个样本的 (顶点, 面) 数组"""
+    return meshes['vertices'][meshes['instance_type'][index]], meshes['faces']
@@ -0,0 +1,217 @@
+"""
+板材排料优化：以误差修正后的单元件尺寸在标准板材上做断头台（guillotine）切割排样，
+空闲矩形按宽度分桶、桶内按高度有序，放置时按最小可用宽度优先查找；
+输出板材用量、利用率，以及按板材成本分摊得到的逐单元件材料成本，可替换施工数据中的材料成本(元)
+"""
+import time
+from bisect import bisect_left, insort
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+
+# 标准板材规格（可配置）：宽度、高度（米）与单价（元/㎡）
+STOCK_SHEETS = [
+    {'规格': '2500x4000', '宽度(m)': 2.5, '高度(m)': 4.0, '单价(元/㎡)': 300.0},
+    {'规格': '2000x3000', '宽度(m)': 2.0, '高度(m)': 3.0, '单价(元/㎡)': 320.0},
+]
+
+# 锯缝宽度（米）
+KERF = 0.005
+
+# 空闲矩形宽度分桶步长（米）
+BUCKET_STEP = 0.05
+
+
+class _FreeRectIndex:
+    """空闲矩形索引：按宽度分桶，桶内按 (高度, 序号) 有序，便于二分查找可容纳的矩形"""
+    def __init__(self, step=BUCKET_STEP):
+        self.step = step
+        self.buckets = {}
+        self.nonempty = []
+        self.rects = {}
+        self._next_id = 0
+
+    def add(self, sheet, x, y, w, h):
+        rect_id = self._next_id
+        self._next_id += 1
+        self.rects[rect_id] = (sheet, x, y, w, h)
+        bucket = int(w / self.step)
+        entries = self.buckets.get(bucket)
+        if entries is None:
+            entries = self.buckets[bucket] = []
+            insort(self.nonempty, bucket)
+        insort(entries, (h, rect_id))
+
+    def remove(self, rect_id):
+        sheet, x, y, w, h = self.rects.pop(rect_id)
+        bucket = int(w / self.step)
+        entries = self.buckets[bucket]
+        del entries[bisect_left(entries, (h, rect_id))]
+        if not entries:
+            del self.buckets[bucket]
+            del self.nonempty[bisect_left(self.nonempty, bucket)]
+
+    def find(self, w, h):
+        """返回能容纳 w×h 的空闲矩形中宽度最小桶里高度最小者，找不到返回 None"""
+        start = bisect_left(self.nonempty, int(w / self.step))
+        for bucket in self.nonempty[start:]:
+            entries = self.buckets[bucket]
+            k = bisect_left(entries, (h, -1))
+            # 最小桶内矩形宽度可能小于 w，需要逐个确认
+            while k < len(entries):
+                rect_id = entries[k][1]
+                if self.rects[rect_id][3] >= w:
+                    return rect_id
+                k += 1
+        return None
+
+
+class GuillotinePacker:
+    """断头台排样：放置后按较短剩余边方向切分空闲矩形（SLAS），允许 90° 旋转"""
+    def __init__(self, stock_sheets=None, kerf=KERF, allow_rotation=True):
+        self.stock_sheets = stock_sheets or STOCK_SHEETS
+        self.kerf = kerf
+        self.allow_rotation = allow_rotation
+
+    def pack(self, widths, heights, order):
+        """按给定顺序排样，返回 (逐件放置数组, 逐张板材规格序号)"""
+        n = len(widths)
+        index = _FreeRectIndex()
+        sheet_stock = []
+        placement = np.zeros((n, 4))  # 板材编号, x, y, 是否旋转
+        min_side = float(min(np.min(widths), np.min(heights))) + self.kerf if n else 0.0
+
+        for piece in order:
+            w = widths[piece] + self.kerf
+            h = heights[piece] + self.kerf
+            rect_id, rotated = self._best_fit(index, w, h)
+            if rect_id is None:
+                stock = self._choose_stock(w, h)
+                sheet = len(sheet_stock)
+                sheet_stock.append(stock)
+                spec = self.stock_sheets[stock]
+                index.add(sheet, 0.0, 0.0, spec['宽度(m)'] + self.kerf, spec['高度(m)'] + self.kerf)
+                rect_id, rotated = self._best_fit(index, w, h)
+                if rect_id is None:
+                    raise ValueError(f"单元件尺寸 {widths[piece]:.3f}×{heights[piece]:.3f} m 超出全部板材规格")
+            if rotated:
+                w, h = h, w
+            sheet, x, y, rw, rh = index.rects[rect_id]
+            index.remove(rect_id)
+            placement[piece] = (sheet, x, y, rotated)
+
+            # 按较短剩余边切分
+            if rw - w < rh - h:
+                right, top = (x + w, y, rw - w, h), (x, y + h, rw, rh - h)
+            else:
+                right, top = (x + w, y, rw - w, rh), (x, y + h, w, rh - h)
+            for rx, ry, fw, fh in (right, top):
+                if fw >= min_side and fh >= min_side:
+                    index.add(sheet, rx, ry, fw, fh)
+        return placement, np.array(sheet_stock, dtype=np.int64)
+
+    def _best_fit(self, index, w, h):
+        rect_id = index.find(w, h)
+        if not self.allow_rotation or w == h:
+            return rect_id, False
+        rotated_id = index.find(h, w)
+        if rect_id is None or rotated_id is None:
+            return (rect_id, False) if rect_id is not None else (rotated_id, rotated_id is not None)
+        area = lambda rid: index.rects[rid][3] * index.rects[rid][4]
+        return (rotated_id, True) if area(rotated_id) < area(rect_id) else (rect_id, False)
+
+    def _choose_stock(self, w, h):
+        """新开板材：选能容纳该件的单张价格最低的规格"""
+        best, best_cost = None, np.inf
+        for k, spec in enumerate(self.stock_sheets):
+            sw, sh = spec['宽度(m)'] + self.kerf, spec['高度(m)'] + self.kerf
+            fits = (w <= sw and h <= sh) or (self.allow_rotation and h <= sw and w <= sh)
+            cost = spec['宽度(m)'] * spec['高度(m)'] * spec['单价(元/㎡)']
+            if fits and cost < best_cost:
+                best, best_cost = k, cost
+        if best is None:
+            raise ValueError(f"单元件尺寸 {w - self.kerf:.3f}×{h - self.kerf:.3f} m 超出全部板材规格")
+        return best
+
+
+def _piece_orders(widths, heights, improve, seed):
+    """候选排样顺序：默认按面积降序；改进模式再尝试按长边、高度、周长降序及若干随机扰动"""
+    area = widths * heights
+    orders = [np.argsort(-area, kind='stable')]
+    if improve:
+        orders += [np.argsort(-np.maximum(widths, heights), kind='stable'),
+                   np.argsort(-heights, kind='stable'),
+                   np.argsort(-(widths + heights), kind='stable')]
+        rng = np.random.default_rng(seed)
+        for _ in range(improve):
+            # 在面积降序的基础上做局部随机扰动
+            noise = area * (1 + rng.normal(0, 0.15, len(area)))
+            orders.append(np.argsort(-noise, kind='stable'))
+    return orders
+
+
+def nest_units(frame, stock_sheets=None, kerf=KERF, improve=0, seed=0, time_limit=None):
+    """对误差修正后的单元件排料，返回 (逐件结果, 板材明细, 汇总)
+
+    improve 为改进轮数（0 表示只做一次面积降序排样），time_limit 为改进阶段的时间上限（秒）
+    """
+    stock_sheets = stock_sheets or STOCK_SHEETS
+    packer = GuillotinePacker(stock_sheets, kerf)
+    widths = frame['修正后宽度(m)'].to_numpy(dtype=np.float64)
+    heights = frame['修正后高度(m)'].to_numpy(dtype=np.float64)
+    sheet_area = np.array([s['宽度(m)'] * s['高度(m)'] for s in stock_sheets])
+    sheet_price = np.array([s['单价(元/㎡)'] for s in stock_sheets]) * sheet_area
+
+    best = None
+    started = time.perf_counter()
+    with profiler.measure('panel_nesting.nest_units', len(frame)):
+        for attempt, order in enumerate(_piece_orders(widths, heights, improve, seed)):
+            if attempt > 0 and time_limit is not None and time.perf_counter() - started > time_limit:
+                break
+            placement, sheet_stock = packer.pack(widths, heights, order)
+            cost = sheet_price[sheet_stock].sum()
+            if best is None or cost < best[2]:
+                best = (placement, sheet_stock, cost, attempt)
+    placement, sheet_stock, total_cost, attempt = best
+
+    piece_area = widths * heights
+    sheet_of = placement[:, 0].astype(np.int64)
+    used_area = np.bincount(sheet_of, weights=piece_area, minlength=len(sheet_stock))
+    # 板材成本按面积分摊到其上的单元件（含废料）
+    unit_cost = sheet_price[sheet_stock][sheet_of] * piece_area / used_area[sheet_of]
+
+    pieces = pd.DataFrame({
+        '样本编号': frame['样本编号'].to_numpy(),
+        '板材编号': sheet_of,
+        '板材规格': [stock_sheets[k]['规格'] for k in sheet_stock[sheet_of]],
+        '排样X(m)': placement[:, 1],
+        '排样Y(m)': placement[:, 2],
+        '旋转': placement[:, 3].astype(bool),
+        '材料成本(元)': unit_cost,
+    })
+    sheets = pd.DataFrame({
+        '板材编号': np.arange(len(sheet_stock)),
+        '板材规格': [stock_sheets[k]['规格'] for k in sheet_stock],
+        '已用面积(m²)': used_area,
+        '利用率': used_area / sheet_area[sheet_stock],
+    })
+    summary = {
+        '单元件数': len(frame),
+        '板材数': int(len(sheet_stock)),
+        '各规格板材数': sheets['板材规格'].value_counts().to_dict(),
+        '总利用率': float(piece_area.sum() / sheet_area[sheet_stock].sum()) if len(sheet_stock) else 0.0,
+        '板材总成本(元)': float(total_cost),
+        '最优排样轮次': attempt,
+    }
+    print_log(f"板材排料: {summary['单元件数']} 件, 板材 {summary['板材数']} 张, "
+              f"总利用率 {summary['总利用率']:.1%}, 板材总成本 {summary['板材总成本(元)']:.0f} 元")
+    return pieces, sheets, summary
+
+
+def apply_material_cost(construction_data, pieces):
+    """用排料得到的逐件材料成本替换施工数据中的材料成本(元)，返回新的施工数据表"""
+    cost = pieces.set_index('样本编号')['材料成本(元)']
+    updated = construction_data.copy()
+    updated['材料成本(元)'] = updated['样本编号'].map(cost).fillna(updated['材料成本(元)'])
+    return updated
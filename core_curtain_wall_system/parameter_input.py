@@ -1,15 +1,19 @@
 import pandas as pd
 import numpy as np
-from utils import print_log, simulate_process
+from utils import print_log, simulate_process, save_chart
+from profiler import profiled
+from chart_cache import chart_cache
 import matplotlib.pyplot as plt
 
 class ParameterInputModule:
-    def __init__(self, basic_params, association_rules):
+    def __init__(self, basic_params, association_rules, render_charts=True):
         self.basic_params = basic_params
         self.association_rules = association_rules
+        self.render_charts = render_charts
         self.processed_params = None
         self.matching_degree = None
         
+    @profiled('ParameterInputModule.analyze_matching_degree', rows=lambda self: len(self.basic_params))
     def analyze_matching_degree(self):
         """分析参数输入完整性与设计规则匹配程度，用于单元件生成模块"""
         print_log("开始分析参数输入完整性与设计规则匹配程度")
@@ -45,18 +49,25 @@ class ParameterInputModule:
         
         print_log("参数输入完整性与设计规则匹配程度分析完成")
         
-        # 生成匹配度分布图表
-        plt.figure(figsize=(10, 6))
-        plt.hist(match_scores, bins=10, color='skyblue', edgecolor='black')
-        plt.title('参数输入与设计规则匹配度分布', fontsize=14)
-        plt.xlabel('匹配度', fontsize=12)
-        plt.ylabel('样本数量', fontsize=12)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.savefig('charts/参数匹配度分布.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        if self.render_charts:
+            # 生成匹配度分布图表
+            def draw_matching_chart():
+                plt.figure(figsize=(10, 6))
+                plt.hist(match_scores, bins=10, color='skyblue', edgecolor='black')
+                plt.title('参数输入与设计规则匹配度分布', fontsize=14)
+                plt.xlabel('匹配度', fontsize=12)
+                plt.ylabel('样本数量', fontsize=12)
+                plt.grid(axis='y', linestyle='--', alpha=0.7)
+                save_chart('charts/参数匹配度分布.png', num_samples)
+
+            chart_cache.render('charts/参数匹配度分布.png',
+                               inputs={'规则匹配度': match_scores},
+                               style={'bins': 10, 'color': 'skyblue'},
+                               draw=draw_matching_chart)
         
         return match_scores
     
+    @profiled('ParameterInputModule.generate_processed_dataset', rows=lambda self: len(self.basic_params))
     def generate_processed_dataset(self):
         """生成参数输入处理数据集"""
         print_log("开始生成参数输入处理数据集")
@@ -79,29 +90,36 @@ class ParameterInputModule:
         
         print_log("参数输入处理数据集生成完成")
         
-        # 生成参数相关性分析图表
-        corr_features = ['宽度(m)', '高度(m)', '厚度(m)', '材料强度(MPa)', '重量(kg)']
-        corr_matrix = processed_df[corr_features].corr()
-        
-        plt.figure(figsize=(10, 8))
-        plt.imshow(corr_matrix, cmap='coolwarm', interpolation='nearest')
-        plt.colorbar(label='相关系数')
-        plt.xticks(range(len(corr_features)), corr_features, rotation=45)
-        plt.yticks(range(len(corr_features)), corr_features)
-        
-        # 添加相关系数文本
-        for i in range(len(corr_features)):
-            for j in range(len(corr_features)):
-                plt.text(j, i, f"{corr_matrix.iloc[i, j]:.2f}", 
-                         ha='center', va='center', color='white', fontsize=10)
-        
-        plt.title('参数相关性分析', fontsize=14)
-        plt.tight_layout()
-        plt.savefig('charts/参数相关性分析.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        if self.render_charts:
+            # 生成参数相关性分析图表
+            def draw_correlation_chart():
+                corr_features = ['宽度(m)', '高度(m)', '厚度(m)', '材料强度(MPa)', '重量(kg)']
+                corr_matrix = processed_df[corr_features].corr()
+
+                plt.figure(figsize=(10, 8))
+                plt.imshow(corr_matrix, cmap='coolwarm', interpolation='nearest')
+                plt.colorbar(label='相关系数')
+                plt.xticks(range(len(corr_features)), corr_features, rotation=45)
+                plt.yticks(range(len(corr_features)), corr_features)
+
+                # 添加相关系数文本
+                for i in range(len(corr_features)):
+                    for j in range(len(corr_features)):
+                        plt.text(j, i, f"{corr_matrix.iloc[i, j]:.2f}", 
+                                 ha='center', va='center', color='white', fontsize=10)
+
+                plt.title('参数相关性分析', fontsize=14)
+                plt.tight_layout()
+                save_chart('charts/参数相关性分析.png', len(processed_df))
+
+            chart_cache.render('charts/参数相关性分析.png',
+                               inputs={name: processed_df[name] for name in ['宽度(m)', '高度(m)', '厚度(m)', '材料强度(MPa)', '重量(kg)']},
+                               style={'cmap': 'coolwarm'},
+                               draw=draw_correlation_chart)
         
         return processed_df
     
+    @profiled('ParameterInputModule.run', rows=lambda self: len(self.basic_params))
     def run(self):
         """运行参数输入处理模块"""
         print_log("开始执行参数输入处理模块")
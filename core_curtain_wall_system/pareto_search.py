@@ -0,0 +1,355 @@
+"""
+多目标 Pareto 搜索：以 NSGA-II 式进化算法在设计参数空间中搜索成本效率(元/㎡)、优化后安全系数与适配性评分的 Pareto 前沿。
+整代种群按数组切块交给进程池，由五个模块计算目标值；同一代的父代与子代在同一组随机场景下评估（公共随机数），
+施工成本在每个场景内对所有个体相同，保证个体之间的比较只反映设计参数的差异
+"""
+import argparse
+import os
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+from log_writer import writer
+from data_generator import generate_association_rules
+from parameter_input import ParameterInputModule
+from unit_generation import UnitGenerationModule
+from structure_verification import StructureVerificationModule
+from error_correction import ErrorCorrectionModule
+from data_association import DataAssociationModule
+
+# 设计变量及取值范围（与 data_generator 的生成范围一致）
+DESIGN_BOUNDS = {
+    '宽度(m)': (0.5, 2.0),
+    '高度(m)': (1.0, 3.5),
+    '厚度(m)': (0.1, 0.3),
+    '曲率': (-0.5, 0.5),
+    '倾斜角度(度)': (0.0, 15.0),
+    '材料强度(MPa)': (200.0, 400.0),
+    '密度(kg/m³)': (2500.0, 3000.0),
+}
+
+# 优化目标：(列名, 方向)，1 表示越小越好，-1 表示越大越好
+OBJECTIVES = [
+    ('成本效率(元/㎡)', 1),
+    ('优化后安全系数', -1),
+    ('适配性评分', -1),
+]
+
+
+@contextmanager
+def _quiet_logs():
+    """评估期间屏蔽模块内部日志，避免每代每个数据块输出十余行"""
+    writer.flush()
+    stream = writer.stream
+    with open(os.devnull, 'w') as devnull:
+        writer.stream = devnull
+        try:
+            yield
+        finally:
+            writer.flush()
+            writer.stream = stream
+
+
+def evaluate_designs(designs, association_rules, seed, scenarios=1):
+    """用五个模块评估一组设计（数组，列顺序同 DESIGN_BOUNDS），返回按 OBJECTIVES 排列的目标值均值 (n, 3)
+
+    每个场景 r 以 (seed, r) 播种：模块内部的随机偏差按行位置取相同的随机流，施工成本在场景内对所有个体取同一组值
+    """
+    n = len(designs)
+    totals = np.zeros((n, len(OBJECTIVES)))
+    with _quiet_logs():
+        for r in range(scenarios):
+            rng = np.random.default_rng([seed, r])
+            np.random.seed(rng.integers(2 ** 32))
+            basic_params = pd.DataFrame(designs, columns=list(DESIGN_BOUNDS))
+            basic_params.insert(0, '样本编号', np.arange(1, n + 1))
+            construction_data = pd.DataFrame({
+                '样本编号': np.arange(1, n + 1),
+                '施工时间(小时)': np.full(n, rng.uniform(2, 8)),
+                '人工成本(元)': np.full(n, rng.uniform(500, 1500)),
+                '材料成本(元)': np.full(n, rng.uniform(1000, 3000)),
+            })
+
+            param_module = ParameterInputModule(basic_params, association_rules, render_charts=False)
+            param_module.analyze_matching_degree()
+            unit_module = UnitGenerationModule(param_module.generate_processed_dataset(), render_charts=False)
+            unit_module.extract_geometric_features()
+            structure_module = StructureVerificationModule(unit_module.generate_unit_shape(), render_charts=False)
+            error_module = ErrorCorrectionModule(structure_module.generate_optimized_parameters(), render_charts=False)
+            association_module = DataAssociationModule(error_module.generate_correction_data(), construction_data,
+                                                       render_charts=False)
+            record = association_module.generate_association_record().sort_index()
+            merged = association_module.association_data
+
+            totals[:, 0] += record['成本效率(元/㎡)'].to_numpy()
+            totals[:, 1] += merged['优化后安全系数'].to_numpy()
+            totals[:, 2] += merged['适配性评分'].to_numpy()
+    return totals / scenarios
+
+
+def _evaluate_chunk(args):
+    """进程池任务：评估一个数据块"""
+    designs, association_rules, seed, scenarios = args
+    return evaluate_designs(designs, association_rules, seed, scenarios)
+
+
+def _minimization_matrix(values):
+    """将目标值转换为统一“越小越好”的矩阵"""
+    return values * np.array([direction for _, direction in OBJECTIVES], dtype=float)
+
+
+def non_dominated_sort(objectives):
+    """非支配排序（全部目标越小越好），返回每个个体的前沿序号（0 为 Pareto 前沿）
+
+    在所有个体上取值相同的目标不影响支配关系，先行剔除；剩余两个目标时为 O(N log N)，
+    三个目标时每个前沿维护二维阶梯，按第一目标顺序扫描并二分查找所属前沿
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n = len(objectives)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    varying = np.ptp(objectives, axis=0) > 0
+    objectives = objectives[:, varying]
+    m = objectives.shape[1]
+    if m == 0:
+        return np.zeros(n, dtype=np.int64)
+    if m == 1:
+        return np.unique(objectives[:, 0], return_inverse=True)[1].astype(np.int64)
+    if m > 3:
+        return _naive_sort(objectives)
+
+    order = np.lexsort(objectives.T[::-1])
+    ranks = np.empty(n, dtype=np.int64)
+    if m == 2:
+        # 按 f1 升序处理时，同一前沿内 f2 严格递减；各前沿末尾的 f2 随前沿序号递增
+        tails = []
+        prev = None
+        for i in order:
+            point = (objectives[i, 0], objectives[i, 1])
+            if point == prev:
+                ranks[i] = front
+                continue
+            front = bisect_right(tails, point[1])
+            if front == len(tails):
+                tails.append(point[1])
+            else:
+                tails[front] = point[1]
+            ranks[i] = front
+            prev = point
+        return ranks
+
+    # 三个目标：fronts[k] 为前沿 k 在 (f2, f3) 上的阶梯 (xs 升序, ys 降序)
+    fronts = []
+    prev = None
+    for i in order:
+        point = (objectives[i, 0], objectives[i, 1], objectives[i, 2])
+        if point == prev:
+            ranks[i] = front
+            continue
+        x, y = point[1], point[2]
+        low, high = 0, len(fronts)
+        while low < high:
+            mid = (low + high) // 2
+            xs, ys = fronts[mid]
+            idx = bisect_right(xs, x) - 1
+            if idx >= 0 and ys[idx] <= y:
+                low = mid + 1
+            else:
+                high = mid
+        front = low
+        if front == len(fronts):
+            fronts.append(([], []))
+        xs, ys = fronts[front]
+        start = bisect_left(xs, x)
+        stop = start
+        while stop < len(xs) and ys[stop] >= y:
+            stop += 1
+        xs[start:stop] = [x]
+        ys[start:stop] = [y]
+        ranks[i] = front
+        prev = point
+    return ranks
+
+
+def _naive_sort(objectives):
+    """任意目标数的逐层剥离排序（O(M·N²)，仅作为超过三个目标时的后备）"""
+    n = len(objectives)
+    ranks = np.full(n, -1, dtype=np.int64)
+    remaining = np.arange(n)
+    front = 0
+    while len(remaining):
+        sub = objectives[remaining]
+        dominated = np.zeros(len(remaining), dtype=bool)
+        for j in range(len(remaining)):
+            dominated |= np.all(sub[j] <= sub, axis=1) & np.any(sub[j] < sub, axis=1)
+        ranks[remaining[~dominated]] = front
+        remaining = remaining[dominated]
+        front += 1
+    return ranks
+
+
+def crowding_distance(objectives, ranks):
+    """按前沿计算拥挤距离，前沿边界个体为无穷大"""
+    objectives = np.asarray(objectives, dtype=float)
+    n, m = objectives.shape
+    distance = np.zeros(n)
+    for k in range(m):
+        values = objectives[:, k]
+        order = np.lexsort((values, ranks))
+        sorted_ranks = ranks[order]
+        sorted_values = values[order]
+        first = np.r_[True, sorted_ranks[1:] != sorted_ranks[:-1]]
+        last = np.r_[sorted_ranks[1:] != sorted_ranks[:-1], True]
+        # 每个前沿在该目标上的取值范围
+        front_min = np.minimum.reduceat(sorted_values, np.flatnonzero(first))
+        front_max = np.maximum.reduceat(sorted_values, np.flatnonzero(first))
+        span = (front_max - front_min)[np.cumsum(first) - 1]
+        gap = np.zeros(n)
+        inner = ~(first | last)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap[inner] = np.where(span[inner] > 0,
+                                  (sorted_values[2:] - sorted_values[:-2])[inner[1:-1]] / span[inner], 0.0)
+        gap[first | last] = np.inf
+        distance[order] += gap
+    return distance
+
+
+class ParetoSearch:
+    """NSGA-II 式多目标搜索：SBX 交叉 + 多项式变异，按 (前沿序号, 拥挤距离) 进行环境选择"""
+    def __init__(self, population_size=1000, generations=20, workers=None, chunk_size=20000,
+                 scenarios=2, seed=0, association_rules=None, bounds=None,
+                 crossover_eta=15.0, mutation_eta=20.0, crossover_rate=0.9):
+        self.population_size = population_size
+        self.generations = generations
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.scenarios = scenarios
+        self.seed = seed
+        self.association_rules = association_rules or generate_association_rules()
+        self.bounds = bounds or DESIGN_BOUNDS
+        self.crossover_eta = crossover_eta
+        self.mutation_eta = mutation_eta
+        self.crossover_rate = crossover_rate
+        self.lower = np.array([low for low, _ in self.bounds.values()])
+        self.upper = np.array([high for _, high in self.bounds.values()])
+        self.rng = np.random.default_rng(seed)
+        self.history = []
+        self._executor = None
+
+    def evaluate(self, population, generation):
+        """整代种群分块并行评估，同一代使用同一种子"""
+        seed = int(np.random.SeedSequence([self.seed, generation]).generate_state(1)[0])
+        chunks = [population[i:i + self.chunk_size] for i in range(0, len(population), self.chunk_size)]
+        tasks = [(chunk, self.association_rules, seed, self.scenarios) for chunk in chunks]
+        with profiler.measure('ParetoSearch.evaluate', len(population)):
+            if self._executor is None:
+                results = [_evaluate_chunk(task) for task in tasks]
+            else:
+                results = list(self._executor.map(_evaluate_chunk, tasks))
+        return np.vstack(results)
+
+    def _random_population(self, size):
+        return self.lower + self.rng.random((size, len(self.lower))) * (self.upper - self.lower)
+
+    def _tournament(self, ranks, distance, size):
+        """二元锦标赛：前沿序号小者胜，相同时拥挤距离大者胜"""
+        a = self.rng.integers(len(ranks), size=size)
+        b = self.rng.integers(len(ranks), size=size)
+        a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (distance[a] >= distance[b]))
+        return np.where(a_wins, a, b)
+
+    def _variation(self, parents):
+        """模拟二进制交叉（SBX）与多项式变异，结果截断到取值范围内"""
+        half = len(parents) // 2
+        p1, p2 = parents[:half], parents[half:2 * half]
+        span = self.upper - self.lower
+
+        u = self.rng.random(p1.shape)
+        beta = np.where(u <= 0.5, (2 * u) ** (1 / (self.crossover_eta + 1)),
+                        (1 / (2 * (1 - u))) ** (1 / (self.crossover_eta + 1)))
+        crossover = (self.rng.random((half, 1)) < self.crossover_rate) & (self.rng.random(p1.shape) < 0.5)
+        beta = np.where(crossover, beta, 1.0)
+        c1 = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+        c2 = 0.5 * ((1 - beta) * p1 + (1 + beta) * p2)
+        children = np.vstack([c1, c2, parents[2 * half:]])
+
+        u = self.rng.random(children.shape)
+        delta = np.where(u < 0.5, (2 * u) ** (1 / (self.mutation_eta + 1)) - 1,
+                         1 - (2 * (1 - u)) ** (1 / (self.mutation_eta + 1)))
+        mutate = self.rng.random(children.shape) < 1.0 / children.shape[1]
+        children = children + np.where(mutate, delta * span, 0.0)
+        return np.clip(children, self.lower, self.upper)
+
+    def run(self):
+        """执行搜索，返回最终种群的 Pareto 前沿（设计参数与目标值）"""
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            population = self._random_population(self.population_size)
+            for generation in range(self.generations + 1):
+                start = time.perf_counter()
+                if generation == 0:
+                    candidates = population
+                else:
+                    parents = population[self._tournament(ranks, distance, self.population_size)]
+                    candidates = np.vstack([population, self._variation(parents)])
+                # 父代与子代在同一组随机场景下重新评估，避免沿用上一代的噪声
+                values = self.evaluate(candidates, generation)
+                eval_seconds = time.perf_counter() - start
+
+                sort_start = time.perf_counter()
+                minimized = _minimization_matrix(values)
+                with profiler.measure('ParetoSearch.non_dominated_sort', len(candidates)):
+                    candidate_ranks = non_dominated_sort(minimized)
+                candidate_distance = crowding_distance(minimized, candidate_ranks)
+                survivors = np.lexsort((-candidate_distance, candidate_ranks))[:self.population_size]
+                sort_seconds = time.perf_counter() - sort_start
+
+                population = candidates[survivors]
+                values = values[survivors]
+                ranks = candidate_ranks[survivors]
+                distance = candidate_distance[survivors]
+                front_size = int((ranks == 0).sum())
+                self.history.append({'代数': generation, '前沿个体数': front_size,
+                                     '评估耗时(秒)': eval_seconds, '排序耗时(秒)': sort_seconds})
+                print_log(f"第 {generation} 代: 前沿个体 {front_size} 个, 评估 {eval_seconds:.2f} 秒, "
+                          f"排序选择 {sort_seconds:.3f} 秒")
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        front = pd.DataFrame(population[ranks == 0], columns=list(self.bounds))
+        for k, (name, _) in enumerate(OBJECTIVES):
+            front[name] = values[ranks == 0, k]
+        return front.sort_values(OBJECTIVES[0][0]).reset_index(drop=True)
+
+
+def pareto_front(frame, objectives=None):
+    """返回数据表中非支配（Pareto 前沿）的行，objectives 为 (列名, 方向) 列表"""
+    objectives = objectives or OBJECTIVES
+    values = frame[[name for name, _ in objectives]].to_numpy(dtype=float)
+    values = values * np.array([direction for _, direction in objectives], dtype=float)
+    return frame[non_dominated_sort(values) == 0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="幕墙设计参数多目标 Pareto 搜索")
+    parser.add_argument('--population', type=int, default=2000, help="种群规模")
+    parser.add_argument('--generations', type=int, default=20, help="进化代数")
+    parser.add_argument('--workers', type=int, default=None, help="评估进程数（默认 CPU 核数）")
+    parser.add_argument('--scenarios', type=int, default=2, help="每个个体评估的随机场景数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--output', default='pareto_front.csv', help="Pareto 前沿输出路径")
+    args = parser.parse_args()
+
+    print_log("===== 多目标 Pareto 搜索 =====")
+    search = ParetoSearch(population_size=args.population, generations=args.generations,
+                          workers=args.workers, scenarios=args.scenarios, seed=args.seed)
+    front = search.run()
+    front.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print_log(f"Pareto 前沿共 {len(front)} 个设计, 已写入 {args.output}")
@@ -0,0 +1,241 @@
+"""
+流水线并行调度器：五个模块通过有界队列串联，不同模块同时处理不同数据块，
+队列写满时上游阻塞（背压），并统计各阶段的队列深度与空闲时间以定位瓶颈模块
+"""
+import queue
+import threading
+import time
+import pandas as pd
+from utils import print_log
+from data_generator import generate_basic_parameters, generate_association_rules, generate_construction_data
+from parameter_input import ParameterInputModule
+from unit_generation import UnitGenerationModule
+from structure_verification import StructureVerificationModule
+from error_correction import ErrorCorrectionModule
+from data_association import DataAssociationModule
+
+# 队列结束标记
+_END = object()
+
+
+class StageMetrics:
+    """单个流水线阶段的运行指标"""
+    def __init__(self, name):
+        self.name = name
+        self.chunks = 0
+        self.rows = 0
+        self.busy_time = 0.0  # 处理数据块耗时
+        self.idle_time = 0.0  # 等待上游数据块耗时
+        self.blocked_time = 0.0  # 下游队列已满时的阻塞耗时
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.max_depth = 0
+
+    def record_depth(self, depth):
+        """记录取数时输入队列的深度"""
+        self.depth_total += depth
+        self.depth_samples += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self):
+        wall = self.busy_time + self.idle_time + self.blocked_time
+        return {
+            '阶段': self.name,
+            '数据块数': self.chunks,
+            '处理行数': self.rows,
+            '处理耗时(秒)': round(self.busy_time, 4),
+            '空闲耗时(秒)': round(self.idle_time, 4),
+            '阻塞耗时(秒)': round(self.blocked_time, 4),
+            '平均队列深度': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+            '最大队列深度': self.max_depth,
+            '利用率': round(self.busy_time / wall, 4) if wall > 0 else 0.0,
+        }
+
+
+class PipelineStage:
+    """流水线阶段：名称与处理函数，处理函数接收并返回一个数据块"""
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+
+class PipelineScheduler:
+    """以有界队列连接各阶段的流水线调度器，每个阶段一个工作线程"""
+    def __init__(self, stages, queue_size=2):
+        if queue_size < 1:
+            raise ValueError("queue_size 必须大于 0")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stage_metrics = [StageMetrics(stage.name) for stage in stages]
+        self.errors = []
+        self.elapsed = 0.0
+
+    def run(self, chunks):
+        """按顺序输入数据块，返回与输入顺序一致的处理结果列表"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        results = {}
+
+        def feed():
+            for index, chunk in enumerate(chunks):
+                queues[0].put((index, chunk))
+            queues[0].put(_END)
+
+        def work(stage, metrics, q_in, q_out):
+            failed = False
+            while True:
+                depth = q_in.qsize()
+                wait_start = time.perf_counter()
+                item = q_in.get()
+                metrics.idle_time += time.perf_counter() - wait_start
+                if item is _END:
+                    q_out.put(_END)
+                    break
+                metrics.record_depth(depth)
+                if failed:
+                    # 出错后继续排空上游队列，避免上游线程永久阻塞
+                    continue
+                index, chunk = item
+                busy_start = time.perf_counter()
+                try:
+                    output = stage.func(chunk)
+                except Exception as exc:
+                    self.errors.append((stage.name, index, exc))
+                    failed = True
+                    continue
+                finally:
+                    # 出错的分块同样计入忙碌时间，瓶颈与利用率统计不遗漏失败前的耗时
+                    metrics.busy_time += time.perf_counter() - busy_start
+                metrics.chunks += 1
+                metrics.rows += _chunk_rows(output)
+                put_start = time.perf_counter()
+                q_out.put((index, output))
+                metrics.blocked_time += time.perf_counter() - put_start
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            threads.append(threading.Thread(
+                target=work, args=(stage, self.stage_metrics[i], queues[i], queues[i + 1]),
+                name=f"pipeline-{stage.name}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            item = queues[-1].get()
+            if item is _END:
+                break
+            index, output = item
+            results[index] = output
+
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+        if self.errors:
+            stage_name, index, exc = self.errors[0]
+            raise RuntimeError(f"流水线阶段 {stage_name} 处理第 {index} 个数据块失败") from exc
+        return [results[index] for index in sorted(results)]
+
+    def metrics(self):
+        """返回各阶段的运行指标"""
+        return [metrics.as_dict() for metrics in self.stage_metrics]
+
+    def bottleneck(self):
+        """返回处理耗时最长的阶段名称"""
+        if not self.stage_metrics:
+            return None
+        return max(self.stage_metrics, key=lambda m: m.busy_time).name
+
+    def log_metrics(self):
+        """打印各阶段运行指标"""
+        print_log(f"流水线总耗时: {self.elapsed:.2f} 秒, 队列容量: {self.queue_size}")
+        for item in self.metrics():
+            print_log(f"{item['阶段']}: 数据块 {item['数据块数']}, 处理 {item['处理耗时(秒)']:.3f} 秒, "
+                      f"空闲 {item['空闲耗时(秒)']:.3f} 秒, 阻塞 {item['阻塞耗时(秒)']:.3f} 秒, "
+                      f"平均队列深度 {item['平均队列深度']:.2f}, 利用率 {item['利用率']:.0%}")
+        print_log(f"瓶颈模块: {self.bottleneck()}")
+
+
+def _chunk_rows(chunk):
+    """统计数据块行数"""
+    frame = chunk[0] if isinstance(chunk, tuple) else chunk
+    return len(frame) if hasattr(frame, '__len__') else 0
+
+
+def split_chunks(basic_params, construction_data, chunk_size):
+    """按样本编号将基础参数与施工数据切分为对齐的数据块"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size 必须大于 0")
+    chunk_ids = pd.Series(
+        [i // chunk_size for i in range(len(basic_params))],
+        index=basic_params['样本编号'].values
+    )
+    construction_labels = construction_data['样本编号'].map(chunk_ids)
+    construction_groups = {
+        int(label): group for label, group in construction_data.groupby(construction_labels)
+    }
+    for label, start in enumerate(range(0, len(basic_params), chunk_size)):
+        params_chunk = basic_params.iloc[start:start + chunk_size].copy()
+        construction_chunk = construction_groups.get(label, construction_data.iloc[0:0])
+        yield params_chunk, construction_chunk
+
+
+def build_module_stages(association_rules):
+    """构建五个模块的流水线阶段（不生成图表、不模拟耗时）"""
+    def parameter_stage(chunk):
+        params_chunk, construction_chunk = chunk
+        module = ParameterInputModule(params_chunk, association_rules, render_charts=False)
+        module.analyze_matching_degree()
+        return module.generate_processed_dataset(), construction_chunk
+
+    def unit_stage(chunk):
+        processed, construction_chunk = chunk
+        module = UnitGenerationModule(processed, render_charts=False)
+        module.extract_geometric_features()
+        return module.generate_unit_shape(), construction_chunk
+
+    def structure_stage(chunk):
+        unit_results, construction_chunk = chunk
+        module = StructureVerificationModule(unit_results, render_charts=False)
+        return module.generate_optimized_parameters(), construction_chunk
+
+    def error_stage(chunk):
+        optimized, construction_chunk = chunk
+        module = ErrorCorrectionModule(optimized, render_charts=False)
+        return module.generate_correction_data(), construction_chunk
+
+    def association_stage(chunk):
+        correction, construction_chunk = chunk
+        module = DataAssociationModule(correction, construction_chunk, render_charts=False)
+        return module.generate_association_record()
+
+    return [
+        PipelineStage("参数输入处理模块", parameter_stage),
+        PipelineStage("单元件生成模块", unit_stage),
+        PipelineStage("结构验证模块", structure_stage),
+        PipelineStage("误差修正模块", error_stage),
+        PipelineStage("数据关联模块", association_stage),
+    ]
+
+
+def run_pipelined(basic_params, association_rules, construction_data, chunk_size=10000, queue_size=2):
+    """分块流水线运行五个模块，返回合并后的关联记录表与调度器（含阶段指标）"""
+    scheduler = PipelineScheduler(build_module_stages(association_rules), queue_size=queue_size)
+    records = scheduler.run(split_chunks(basic_params, construction_data, chunk_size))
+    association_record = pd.concat(records, ignore_index=True) if records else pd.DataFrame()
+    if len(association_record):
+        association_record = association_record.sort_values('设计-施工关联度', ascending=False)
+    return association_record, scheduler
+
+
+if __name__ == "__main__":
+    num_samples = 200000
+    print_log("===== 流水线并行调度运行 =====")
+    association_record, scheduler = run_pipelined(
+        generate_basic_parameters(num_samples),
+        generate_association_rules(),
+        generate_construction_data(num_samples),
+        chunk_size=20000,
+    )
+    print_log(f"总样本数: {len(association_record)}")
+    scheduler.log_metrics()
@@ -0,0 +1,175 @@
+"""
+运行剖析工具：记录各模块方法与图表保存的墙钟时间、CPU 时间、处理行数、吞吐量与内存峰值，
+输出 JSON/CSV 运行报告，并可对单个阶段采集 cProfile 数据
+"""
+import cProfile
+import csv
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+REPORT_FIELDS = ['阶段', '墙钟时间(秒)', 'CPU时间(秒)', '处理行数', '吞吐量(行/秒)', '内存峰值(字节)']
+
+
+class StageProfiler:
+    """阶段剖析器，未启用时被装饰方法只多一次属性判断"""
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.cprofile_stage = None
+        self.cprofile_dir = 'profiles'
+        self.records = []
+        self._cprofile = None
+        self._local = threading.local()
+
+    def enable(self, trace_memory=False, cprofile_stage=None, cprofile_dir='profiles'):
+        """启用剖析；trace_memory 开启 tracemalloc 内存峰值统计（开销较大，仅在需要时开启）"""
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_dir = cprofile_dir
+        self._cprofile = cProfile.Profile() if cprofile_stage else None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        """停用剖析"""
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def reset(self):
+        """清空已记录的数据"""
+        self.records = []
+        if self.cprofile_stage:
+            self._cprofile = cProfile.Profile()
+
+    @contextmanager
+    def measure(self, stage, rows=0):
+        """测量一次调用；rows 为处理行数"""
+        if not self.enabled:
+            yield
+            return
+
+        memory_stack = None
+        if self.trace_memory:
+            # 嵌套调用时先把当前峰值计入外层，再重置峰值
+            memory_stack = self._memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if memory_stack:
+                memory_stack[-1][1] = max(memory_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            memory_stack.append([current, current])
+
+        capture = self._cprofile if stage == self.cprofile_stage else None
+        if capture:
+            capture.enable()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            if capture:
+                capture.disable()
+
+            peak_bytes = None
+            if memory_stack is not None:
+                baseline, running_peak = memory_stack.pop()
+                absolute_peak = max(tracemalloc.get_traced_memory()[1], running_peak)
+                peak_bytes = absolute_peak - baseline
+                if memory_stack:
+                    memory_stack[-1][1] = max(memory_stack[-1][1], absolute_peak)
+
+            self.records.append({
+                '阶段': stage,
+                '墙钟时间(秒)': wall,
+                'CPU时间(秒)': cpu,
+                '处理行数': rows,
+                '吞吐量(行/秒)': rows / wall if wall > 0 else 0.0,
+                '内存峰值(字节)': peak_bytes,
+            })
+
+    def _memory_stack(self):
+        if not hasattr(self._local, 'memory_stack'):
+            self._local.memory_stack = []
+        return self._local.memory_stack
+
+    def summary(self):
+        """按阶段汇总调用次数、总耗时与最大内存峰值"""
+        stages = {}
+        for record in self.records:
+            item = stages.setdefault(record['阶段'], {
+                '阶段': record['阶段'], '调用次数': 0, '墙钟时间(秒)': 0.0,
+                'CPU时间(秒)': 0.0, '处理行数': 0, '内存峰值(字节)': None,
+            })
+            item['调用次数'] += 1
+            item['墙钟时间(秒)'] += record['墙钟时间(秒)']
+            item['CPU时间(秒)'] += record['CPU时间(秒)']
+            item['处理行数'] += record['处理行数']
+            if record['内存峰值(字节)'] is not None:
+                item['内存峰值(字节)'] = max(item['内存峰值(字节)'] or 0, record['内存峰值(字节)'])
+        for item in stages.values():
+            wall = item['墙钟时间(秒)']
+            item['吞吐量(行/秒)'] = item['处理行数'] / wall if wall > 0 else 0.0
+        return sorted(stages.values(), key=lambda item: item['墙钟时间(秒)'], reverse=True)
+
+    def write_report(self, json_path, csv_path=None):
+        """写出 JSON 运行报告（及可选的逐次调用 CSV），采集了 cProfile 时一并写出 .prof 文件"""
+        report = {
+            'generatedAt': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+            'traceMemory': self.trace_memory,
+            'cprofileStage': self.cprofile_stage,
+            'stages': self.summary(),
+            'calls': self.records,
+        }
+        if self._cprofile is not None:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            prof_path = os.path.join(self.cprofile_dir, f"{_safe_name(self.cprofile_stage)}.prof")
+            self._cprofile.dump_stats(prof_path)
+            report['cprofileFile'] = prof_path
+
+        _ensure_parent(json_path)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        if csv_path:
+            _ensure_parent(csv_path)
+            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        return report
+
+
+def _safe_name(name):
+    return ''.join(ch if ch.isalnum() or ch in '._-' else '_' for ch in name)
+
+
+def _ensure_parent(path):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+# 全局剖析器
+profiler = StageProfiler()
+
+
+def profiled(stage, rows=None):
+    """方法剖析装饰器；rows 为根据 self 计算处理行数的函数"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not profiler.enabled:
+                return func(self, *args, **kwargs)
+            with profiler.measure(stage, rows(self) if rows else 0):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,280 @@
+"""
+两次运行结果对比：读取两次运行的列式检查点，按样本编号对齐后先比较逐行哈希，跳过完全相同的行，
+只对哈希不同的行逐列按容差比较；统计需要优化、关联度分组发生翻转的样本及转移情况，
+并对发生变化的数值列计算分布偏移（均值/标准差变化、分箱 KS 统计量与 PSI）
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+from checkpoint import Checkpoint, KEY_COLUMN, column_words, save_checkpoint
+
+# 数值列的变化判定：|a - b| > 绝对容差 + 相对容差 × |b|（与 numpy.isclose 相同），两侧均为 NaN 视为相同
+DEFAULT_ATOL = 1e-9
+DEFAULT_RTOL = 1e-6
+
+# 需要统计翻转的分类列
+FLIP_COLUMNS = ['需要优化', '关联度分组']
+
+# 分布偏移：KS 统计量按细分箱的累计分布计算，PSI 将细分箱合并为粗分箱计算
+SHIFT_BINS = 1000
+PSI_BINS = 20
+PSI_EPSILON = 1e-4
+
+# 报告中列出的样本编号数上限
+LIST_LIMIT = 20
+
+MISSING_LABEL = '缺失'
+
+
+def _strictly_increasing(keys):
+    return len(keys) < 2 or bool(np.all(keys[1:] > keys[:-1]))
+
+
+def align_keys(keys_a, keys_b):
+    """按样本编号（须唯一）对齐，返回 (A 中位置, B 中位置, 删除的编号, 新增的编号)
+
+    两侧编号相同时直接按位置对齐；均为升序时用二分查找合并（流水线输出的常见情形），否则退回排序求交集
+    """
+    keys_a, keys_b = np.asarray(keys_a), np.asarray(keys_b)
+    if len(keys_a) == len(keys_b) and np.array_equal(keys_a, keys_b):
+        index = np.arange(len(keys_a))
+        return index, index, keys_a[:0], keys_b[:0]
+    if not (_strictly_increasing(keys_a) and _strictly_increasing(keys_b)):
+        common, index_a, index_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+        return (index_a, index_b, np.setdiff1d(keys_a, common, assume_unique=True),
+                np.setdiff1d(keys_b, common, assume_unique=True))
+    position = np.minimum(np.searchsorted(keys_b, keys_a), max(len(keys_b) - 1, 0))
+    found = keys_b[position] == keys_a if len(keys_b) else np.zeros(len(keys_a), dtype=bool)
+    index_a, index_b = np.flatnonzero(found), position[found]
+    matched_b = np.zeros(len(keys_b), dtype=bool)
+    matched_b[index_b] = True
+    return index_a, index_b, keys_a[~found], keys_b[~matched_b]
+
+
+def _is_numeric(values, categories):
+    return categories is None and values.dtype.kind in 'fiu'
+
+
+def column_change(a, b, categories_a=None, categories_b=None, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """逐行变化掩码与差值统计；数值列按容差比较，布尔/分类列按取值比较"""
+    if _is_numeric(a, categories_a) and _is_numeric(b, categories_b):
+        a, b = a.astype(np.float64), b.astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            diff = np.abs(a - b)
+            changed = (diff > atol + rtol * np.abs(b)) | (np.isnan(a) != np.isnan(b))
+        diff = diff[changed & ~np.isnan(diff)]
+        return changed, {'最大绝对差': float(diff.max()) if len(diff) else 0.0,
+                         '平均绝对差': float(diff.mean()) if len(diff) else 0.0}
+    changed = column_words(a, categories_a) != column_words(b, categories_b)
+    return changed, {}
+
+
+def _labels(values, categories):
+    """布尔/分类列的取值标签数组（用于翻转统计）"""
+    values = np.asarray(values)
+    if categories is None:
+        return values.astype(str)
+    table = np.array(list(categories) + [MISSING_LABEL], dtype=object)
+    return table[values]
+
+
+def flip_summary(keys, a, b, categories_a=None, categories_b=None, limit=LIST_LIMIT):
+    """翻转统计：a、b 为已对齐的同一批行，返回翻转行数、各转移方向的计数与部分样本编号"""
+    label_a, label_b = _labels(a, categories_a), _labels(b, categories_b)
+    flipped = label_a != label_b
+    transitions = pd.Series(label_a[flipped]).str.cat(pd.Series(label_b[flipped]), sep='→').value_counts()
+    return {
+        '翻转行数': int(flipped.sum()),
+        '转移': {name: int(count) for name, count in transitions.items()},
+        '样本编号': np.asarray(keys)[flipped][:limit].tolist(),
+    }
+
+
+def _finite(values):
+    """返回 (有限值数组, 最小值, 最大值)；没有 NaN/inf 时不做筛选复制"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return values, np.nan, np.nan
+    low, high = values.min(), values.max()
+    if not (np.isfinite(low) and np.isfinite(high)):
+        values = values[np.isfinite(values)]
+        low, high = (values.min(), values.max()) if len(values) else (np.nan, np.nan)
+    return values, low, high
+
+
+def _histogram(values, low, scale, bins):
+    # 固定宽度分箱：直接按比例换算箱号后计数，比 np.histogram 的通用实现快得多
+    position = values - low
+    position *= scale
+    index = position.astype(np.intp)
+    np.minimum(index, bins - 1, out=index)
+    return np.bincount(index, minlength=bins) / len(values)
+
+
+def distribution_shift(a, b, bins=SHIFT_BINS, psi_bins=PSI_BINS):
+    """两次运行某数值列的分布偏移：均值/标准差、分箱 KS 统计量（误差不超过一个细分箱）与 PSI"""
+    (a, low_a, high_a), (b, low_b, high_b) = _finite(a), _finite(b)
+    moments = [(float(v.mean()), float(v.std())) if len(v) else (np.nan, np.nan) for v in (a, b)]
+    (mean_a, std_a), (mean_b, std_b) = moments
+    shift = {'均值A': mean_a, '均值B': mean_b, '均值变化': mean_b - mean_a,
+             '标准差A': std_a, '标准差B': std_b, 'KS统计量': 0.0, 'PSI': 0.0}
+    if not len(a) or not len(b):
+        return shift
+    low, high = min(low_a, low_b), max(high_a, high_b)
+    if high <= low:
+        return shift
+    scale = bins / (high - low)
+    hist_a, hist_b = _histogram(a, low, scale, bins), _histogram(b, low, scale, bins)
+    shift['KS统计量'] = float(np.abs(np.cumsum(hist_a) - np.cumsum(hist_b)).max())
+    p = np.maximum(hist_a.reshape(psi_bins, -1).sum(axis=1), PSI_EPSILON)
+    q = np.maximum(hist_b.reshape(psi_bins, -1).sum(axis=1), PSI_EPSILON)
+    shift['PSI'] = float(((q - p) * np.log(q / p)).sum())
+    return shift
+
+
+def diff_stage(run_a, run_b, stage, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL, limit=LIST_LIMIT):
+    """对比两次运行的一个阶段输出，返回报告字典"""
+    columns_a, columns_b = run_a.columns(stage), run_b.columns(stage)
+    if KEY_COLUMN not in columns_a or KEY_COLUMN not in columns_b:
+        raise ValueError(f"阶段 {stage} 缺少 {KEY_COLUMN} 列，无法对齐")
+    common = [name for name in columns_a if name in columns_b and name != KEY_COLUMN]
+    rows = run_a.rows(stage) + run_b.rows(stage)
+
+    with profiler.measure('run_diff.diff_stage', rows):
+        keys_a = np.asarray(run_a.column(stage, KEY_COLUMN)[0])
+        keys_b = np.asarray(run_b.column(stage, KEY_COLUMN)[0])
+        index_a, index_b, removed, added = align_keys(keys_a, keys_b)
+
+        # 行哈希相同的行跳过逐列比较；两侧列集合与写入时一致时直接读取已保存的哈希
+        hash_a = np.asarray(run_a.row_hash(stage, common))
+        hash_b = np.asarray(run_b.row_hash(stage, common))
+        candidates = np.flatnonzero(hash_a[index_a] != hash_b[index_b])
+        rows_a, rows_b = index_a[candidates], index_b[candidates]
+        changed_keys = keys_a[rows_a]
+
+        any_changed = np.zeros(len(candidates), dtype=bool)
+        column_report, flips, shifts = [], {}, []
+        for name in common:
+            values_a, categories_a = run_a.column(stage, name)
+            values_b, categories_b = run_b.column(stage, name)
+            part_a, part_b = np.asarray(values_a[rows_a]), np.asarray(values_b[rows_b])
+            changed, stats = column_change(part_a, part_b, categories_a, categories_b, atol, rtol)
+            any_changed |= changed
+            count = int(changed.sum())
+            if count:
+                column_report.append({'列': name, '变化行数': count, **stats,
+                                      '样本编号': changed_keys[changed][:limit].tolist()})
+            if name in FLIP_COLUMNS:
+                flips[name] = flip_summary(changed_keys, part_a, part_b, categories_a, categories_b, limit)
+            # 逐行无变化且样本集合相同时分布必然相同，跳过全列扫描
+            numeric = _is_numeric(values_a, categories_a) and _is_numeric(values_b, categories_b)
+            if numeric and (count or len(removed) or len(added)):
+                shifts.append({'列': name, **distribution_shift(values_a, values_b)})
+
+    return {
+        '阶段': stage,
+        '行数A': run_a.rows(stage),
+        '行数B': run_b.rows(stage),
+        '共同样本数': len(index_a),
+        '删除样本数': len(removed),
+        '新增样本数': len(added),
+        '删除样本编号': removed[:limit].tolist(),
+        '新增样本编号': added[:limit].tolist(),
+        '仅A列': [name for name in columns_a if name not in columns_b],
+        '仅B列': [name for name in columns_b if name not in columns_a],
+        '哈希不同行数': len(candidates),
+        '变化行数': int(any_changed.sum()),
+        '列变化': column_report,
+        '翻转': flips,
+        '分布偏移': shifts,
+    }
+
+
+def diff_runs(dir_a, dir_b, stages=None, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL, limit=LIST_LIMIT):
+    """对比两次运行的检查点目录；stages 为空时对比两侧共有的全部阶段"""
+    run_a, run_b = Checkpoint(dir_a), Checkpoint(dir_b)
+    stages = stages or [stage for stage in run_a.stages if stage in run_b.stages]
+    return {'运行A': dir_a, '运行B': dir_b, '绝对容差': atol, '相对容差': rtol,
+            '阶段': [diff_stage(run_a, run_b, stage, atol, rtol, limit) for stage in stages]}
+
+
+def log_diff_summary(report):
+    """打印对比结果"""
+    for stage in report['阶段']:
+        print_log(f"[{stage['阶段']}] 共同样本 {stage['共同样本数']}, 删除 {stage['删除样本数']}, 新增 {stage['新增样本数']}, "
+                  f"哈希不同 {stage['哈希不同行数']} 行, 超出容差 {stage['变化行数']} 行")
+        for column in stage['列变化']:
+            print_log(f"  {column['列']}: {column['变化行数']} 行变化"
+                      + (f", 最大绝对差 {column['最大绝对差']:.4g}" if '最大绝对差' in column else ""))
+        for name, flip in stage['翻转'].items():
+            if flip['翻转行数']:
+                print_log(f"  {name} 翻转 {flip['翻转行数']} 行: "
+                          + ", ".join(f"{k} {v}" for k, v in flip['转移'].items()))
+        for shift in stage['分布偏移']:
+            if shift['KS统计量'] > 0.01 or shift['PSI'] > 0.01:
+                print_log(f"  {shift['列']} 分布偏移: 均值 {shift['均值A']:.4g} → {shift['均值B']:.4g}, "
+                          f"KS {shift['KS统计量']:.3f}, PSI {shift['PSI']:.3f}")
+
+
+def _demo_runs(directory, rows, seed=0):
+    """生成两次演示运行：B 在 A 的基础上扰动少量行（含容差内扰动、翻转、删除与新增样本）"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({KEY_COLUMN: np.arange(1, rows + 1)})
+    for k in range(12):
+        frame[f'指标{k}'] = rng.normal(100, 15, rows)
+    frame['安全系数'] = rng.uniform(0.5, 4.0, rows)
+    frame['需要优化'] = frame['安全系数'] < 1.5
+    frame['关联度分组'] = pd.cut(rng.uniform(0, 1, rows), bins=[0, 0.3, 0.7, 1], labels=['低关联度', '中关联度', '高关联度'])
+    run_a, run_b = os.path.join(directory, 'run_a'), os.path.join(directory, 'run_b')
+    save_checkpoint(run_a, 'demo', frame)
+
+    perturbed = rng.choice(rows, rows // 100, replace=False)
+    frame.loc[perturbed[: len(perturbed) // 2], '指标0'] += 1e-12  # 容差内
+    frame.loc[perturbed[len(perturbed) // 2:], '指标1'] *= 1.05
+    frame.loc[perturbed, '安全系数'] *= 1.1
+    frame['需要优化'] = frame['安全系数'] < 1.5
+    frame = frame.drop(index=perturbed[:10])
+    extra = frame.tail(5).assign(**{KEY_COLUMN: np.arange(rows + 1, rows + 6)})
+    save_checkpoint(run_b, 'demo', pd.concat([frame, extra], ignore_index=True))
+    return run_a, run_b
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="对比两次运行的阶段输出检查点（main.py --checkpoint-dir 写出）")
+    parser.add_argument('run_a', nargs='?', help="基准运行的检查点目录")
+    parser.add_argument('run_b', nargs='?', help="对比运行的检查点目录")
+    parser.add_argument('--stage', action='append', help="只对比指定阶段（可重复）")
+    parser.add_argument('--atol', type=float, default=DEFAULT_ATOL, help="数值列绝对容差（默认 %(default)s）")
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL, help="数值列相对容差（默认 %(default)s）")
+    parser.add_argument('--limit', type=int, default=LIST_LIMIT, help="报告中每项列出的样本编号数上限（默认 %(default)s）")
+    parser.add_argument('--output', metavar='PATH', help="将完整对比报告写入该 JSON 路径")
+    parser.add_argument('--demo', type=int, default=1000000, metavar='ROWS',
+                        help="未给出检查点目录时，生成该行数的演示运行并对比（默认 %(default)s）")
+    args = parser.parse_args()
+
+    demo_dir = None
+    if args.run_a and args.run_b:
+        dir_a, dir_b = args.run_a, args.run_b
+    else:
+        demo_dir = tempfile.mkdtemp(prefix='run_diff_')
+        print_log(f"===== 生成演示运行: {args.demo} 行 =====")
+        dir_a, dir_b = _demo_runs(demo_dir, args.demo)
+    try:
+        started = time.perf_counter()
+        diff_report = diff_runs(dir_a, dir_b, args.stage, args.atol, args.rtol, args.limit)
+        print_log(f"对比耗时 {time.perf_counter() - started:.2f} 秒")
+        log_diff_summary(diff_report)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(diff_report, f, ensure_ascii=False, indent=2)
+            print_log(f"对比报告已写入: {args.output}")
+    finally:
+        if demo_dir:
+            shutil.rmtree(demo_dir, ignore_errors=True)
@@ -1,15 +1,25 @@
 import pandas as pd
 import numpy as np
-from utils import print_log, simulate_process
+from utils import print_log, simulate_process, save_chart
+from profiler import profiled
+from chart_cache import chart_cache
+import charting
+from wind_dynamics import dynamic_wind_response
 import matplotlib.pyplot as plt
 
 class StructureVerificationModule:
-    def __init__(self, unit_generation_results):
+    def __init__(self, unit_generation_results, render_charts=True, wind_mode='static', wind_options=None):
         self.unit_generation_results = unit_generation_results
+        self.render_charts = render_charts
+        # 风荷载模式：static 为静力风载荷系数，dynamic 为风速时程 + 单自由度响应（参数见 wind_options）
+        self.wind_mode = wind_mode
+        self.wind_options = wind_options or {}
+        self.wind_response = None
         self.force_points = None
         self.stress_distribution = None
         self.optimized_params = None
         
+    @profiled('StructureVerificationModule.extract_force_and_stress', rows=lambda self: len(self.unit_generation_results))
     def extract_force_and_stress(self):
         """提取幕墙单元件结构受力点和应力分布变化量"""
         print_log("开始提取结构受力点和应力分布变化量")
@@ -19,13 +29,21 @@ class StructureVerificationModule:
         
         # 计算受力点参数
         results_df['自重载荷(N)'] = results_df['重量(kg)'] * 9.81
-        results_df['风载荷系数'] = 1.2 + np.abs(results_df['曲率']) + results_df['倾斜角度(度)'] / 30
-        results_df['总载荷(N)'] = results_df['自重载荷(N)'] * results_df['风载荷系数']
+        if self.wind_mode == 'dynamic':
+            # 动态风振响应只计算一次，峰值应力写入最大应力(MPa)，均方根应力另列
+            if self.wind_response is None:
+                self.wind_response = dynamic_wind_response(results_df, **self.wind_options)
+            for name in self.wind_response.columns:
+                results_df[name] = self.wind_response[name]
+        else:
+            results_df['风载荷系数'] = 1.2 + np.abs(results_df['曲率']) + results_df['倾斜角度(度)'] / 30
+            results_df['总载荷(N)'] = results_df['自重载荷(N)'] * results_df['风载荷系数']
         
         # 计算应力分布
         results_df['受力点数量'] = 4 + (results_df['形态复杂度'] // 2).astype(int)
-        results_df['平均应力(MPa)'] = results_df['总载荷(N)'] / (results_df['面积(m²)'] * 1000000) * 1.5
-        results_df['最大应力(MPa)'] = results_df['平均应力(MPa)'] * (1.2 + results_df['形态复杂度'] * 0.1)
+        if self.wind_mode != 'dynamic':
+            results_df['平均应力(MPa)'] = results_df['总载荷(N)'] / (results_df['面积(m²)'] * 1000000) * 1.5
+            results_df['最大应力(MPa)'] = results_df['平均应力(MPa)'] * (1.2 + results_df['形态复杂度'] * 0.1)
         
         # 计算应力分布变化量
         results_df['应力变化率'] = np.random.normal(0.05, 0.02, len(results_df))
@@ -36,6 +54,7 @@ class StructureVerificationModule:
         print_log("结构受力点和应力分布变化量提取完成")
         return results_df
     
+    @profiled('StructureVerificationModule.generate_optimized_parameters', rows=lambda self: len(self.unit_generation_results))
     def generate_optimized_parameters(self):
         """结构验证模块，生成结构验证优化参数集"""
         print_log("开始生成结构验证优化参数集")
@@ -71,26 +90,33 @@ class StructureVerificationModule:
         
         print_log("结构验证优化参数集生成完成")
         
-        # 生成应力与安全系数关系图
-        plt.figure(figsize=(10, 6))
-        safe_samples = verification_df[~verification_df['需要优化']]
-        unsafe_samples = verification_df[verification_df['需要优化']]
-        
-        plt.scatter(safe_samples['最大应力(MPa)'], safe_samples['安全系数'], 
-                   c='green', label='安全样本', alpha=0.7)
-        plt.scatter(unsafe_samples['最大应力(MPa)'], unsafe_samples['安全系数'], 
-                   c='red', label='需优化样本', alpha=0.7)
-        plt.axhline(y=1.5, color='black', linestyle='--', label='安全阈值')
-        plt.title('最大应力与安全系数关系', fontsize=14)
-        plt.xlabel('最大应力(MPa)', fontsize=12)
-        plt.ylabel('安全系数', fontsize=12)
-        plt.legend()
-        plt.grid(linestyle='--', alpha=0.7)
-        plt.savefig('charts/应力与安全系数关系.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        if self.render_charts:
+            # 生成应力与安全系数关系图
+            def draw_safety_chart():
+                plt.figure(figsize=(10, 6))
+                safe_samples = verification_df[~verification_df['需要优化']]
+                unsafe_samples = verification_df[verification_df['需要优化']]
+
+                charting.grouped_scatter([
+                    (safe_samples['最大应力(MPa)'], safe_samples['安全系数'], 'green', '安全样本'),
+                    (unsafe_samples['最大应力(MPa)'], unsafe_samples['安全系数'], 'red', '需优化样本'),
+                ])
+                plt.axhline(y=1.5, color='black', linestyle='--', label='安全阈值')
+                plt.title('最大应力与安全系数关系', fontsize=14)
+                plt.xlabel('最大应力(MPa)', fontsize=12)
+                plt.ylabel('安全系数', fontsize=12)
+                plt.legend()
+                plt.grid(linestyle='--', alpha=0.7)
+                save_chart('charts/应力与安全系数关系.png', len(verification_df))
+
+            chart_cache.render('charts/应力与安全系数关系.png',
+                               inputs={name: verification_df[name] for name in ['最大应力(MPa)', '安全系数', '需要优化']},
+                               style={'threshold': 1.5},
+                               draw=draw_safety_chart)
         
         return verification_df
     
+    @profiled('StructureVerificationModule.run', rows=lambda self: len(self.unit_generation_results))
     def run(self):
         """运行结构验证模块"""
         print_log("开始执行结构验证模块")
@@ -0,0 +1,183 @@
+"""
+立面公差累积分析：单元件按安装行列排布，每个单元件的宽度/高度偏差沿行（横向）和沿列（竖向）逐件累积，
+用分段累计和计算各位置的累计位置偏移，在伸缩缝处清零；累计偏移相对本单元件尺寸的比例超过最大偏差率时
+视为锚固件无法对位。支持蒙特卡洛模式，多次抽样以数组批量计算，输出各位置的超限概率
+"""
+import time
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+
+# 最大允许偏差率（%），与 curtain_wall/util/system_config.py 中的 最大偏差率 一致
+MAX_DRIFT_RATE = 5.0
+
+# 伸缩缝间距：每隔多少列 / 多少行设置一道伸缩缝
+JOINT_EVERY_COLUMNS = 12
+JOINT_EVERY_ROWS = 4
+
+# 蒙特卡洛抽样的偏差率标准差（%），与误差修正模块的尺寸偏差分布一致
+WIDTH_DEVIATION_STD = 0.5
+HEIGHT_DEVIATION_STD = 0.5
+
+# 每批抽样数（限制 (抽样数, 行, 列) 数组的内存）
+DRAW_BATCH = 32
+
+
+def segment_starts(length, joints):
+    """分段起点掩码：joints 为间距（整数）或伸缩缝之后第一个位置的序号列表，位置 0 总是分段起点"""
+    starts = np.zeros(length, dtype=bool)
+    if isinstance(joints, (int, np.integer)):
+        starts[::max(int(joints), 1)] = True
+    else:
+        starts[[j for j in joints if 0 <= j < length]] = True
+    if length:
+        starts[0] = True
+    return starts
+
+
+def segmented_cumsum(values, starts, axis=-1):
+    """沿 axis 的分段累计和：starts 为该轴上的分段起点掩码，每段从起点重新累计"""
+    total = np.cumsum(values, axis=axis)
+    start_index = np.maximum.accumulate(np.where(starts, np.arange(len(starts)), 0))
+    # 段起点之前的累计值 = 起点处累计值 - 起点处取值
+    return total - np.take(total - values, start_index, axis=axis)
+
+
+def facade_grid(n, columns=None):
+    """按样本顺序逐行排布，返回 (行数, 列数, 每个样本的行号, 列号)"""
+    columns = columns or max(int(np.ceil(np.sqrt(n))), 1)
+    rows = -(-n // columns)
+    index = np.arange(n)
+    return rows, columns, index // columns, index % columns
+
+
+def stackup_drift(width, height, width_rate, height_rate, columns=None,
+                  joint_columns=JOINT_EVERY_COLUMNS, joint_rows=JOINT_EVERY_ROWS):
+    """累计位置偏移（米）
+
+    width/height 为 (N,) 设计尺寸，width_rate/height_rate 为 (..., N) 偏差率（%），前导维可为抽样维；
+    返回与偏差率同形状的 (横向累计偏移, 竖向累计偏移)
+    """
+    n = len(width)
+    rows, columns, row, column = facade_grid(n, columns)
+    lead = np.shape(width_rate)[:-1]
+
+    def to_grid(deviation):
+        # 不满一行的空位补 0，不影响累计
+        grid = np.zeros(lead + (rows * columns,))
+        grid[..., :n] = deviation
+        return grid.reshape(lead + (rows, columns))
+
+    width_error = to_grid(np.asarray(width) * np.asarray(width_rate) / 100)
+    height_error = to_grid(np.asarray(height) * np.asarray(height_rate) / 100)
+    horizontal = segmented_cumsum(width_error, segment_starts(columns, joint_columns), axis=-1)
+    vertical = segmented_cumsum(height_error, segment_starts(rows, joint_rows), axis=-2)
+    return horizontal[..., row, column], vertical[..., row, column]
+
+
+def drift_rate(width, height, horizontal, vertical):
+    """累计偏差率（%）：横向、竖向累计偏移分别相对本单元件宽度、高度的比例取较大者"""
+    return np.maximum(np.abs(horizontal) / width, np.abs(vertical) / height) * 100
+
+
+def analyze_stackup(frame, columns=None, joint_columns=JOINT_EVERY_COLUMNS, joint_rows=JOINT_EVERY_ROWS,
+                    max_rate=MAX_DRIFT_RATE):
+    """以误差修正模块的实际偏差率计算累计偏移，返回逐样本报告"""
+    width = frame['宽度(m)'].to_numpy(dtype=np.float64)
+    height = frame['高度(m)'].to_numpy(dtype=np.float64)
+    with profiler.measure('tolerance_stackup.analyze_stackup', len(frame)):
+        horizontal, vertical = stackup_drift(width, height, frame['宽度偏差率(%)'].to_numpy(dtype=np.float64),
+                                             frame['高度偏差率(%)'].to_numpy(dtype=np.float64),
+                                             columns, joint_columns, joint_rows)
+        rate = drift_rate(width, height, horizontal, vertical)
+    _, _, row, column = facade_grid(len(frame), columns)
+    report = pd.DataFrame({
+        '样本编号': frame['样本编号'].to_numpy(),
+        '安装行': row,
+        '安装列': column,
+        '横向累计偏移(mm)': horizontal * 1000,
+        '竖向累计偏移(mm)': vertical * 1000,
+        '累计偏差率(%)': rate,
+    })
+    report['累计偏差超限'] = report['累计偏差率(%)'] > max_rate
+    return report
+
+
+def monte_carlo_stackup(frame, draws=1000, columns=None, joint_columns=JOINT_EVERY_COLUMNS, joint_rows=JOINT_EVERY_ROWS,
+                        max_rate=MAX_DRIFT_RATE, width_std=WIDTH_DEVIATION_STD, height_std=HEIGHT_DEVIATION_STD,
+                        batch=DRAW_BATCH, seed=None):
+    """蒙特卡洛公差累积：每次抽样独立生成全部单元件的偏差率，返回 (逐位置统计, 汇总)
+
+    逐位置统计含超限概率与累计偏差率的均值、标准差（按批累加，内存与抽样次数无关）；汇总含至少一处超限的抽样比例
+    """
+    if draws <= 0:
+        raise ValueError(f"抽样次数必须为正整数: {draws}")
+    n = len(frame)
+    width = frame['宽度(m)'].to_numpy(dtype=np.float64)
+    height = frame['高度(m)'].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    exceed_count = np.zeros(n, dtype=np.int64)
+    rate_sum = np.zeros(n)
+    rate_sumsq = np.zeros(n)
+    any_exceed = 0
+    with profiler.measure('tolerance_stackup.monte_carlo_stackup', n * draws):
+        for start in range(0, draws, batch):
+            size = min(batch, draws - start)
+            horizontal, vertical = stackup_drift(width, height, rng.normal(0, width_std, (size, n)),
+                                                 rng.normal(0, height_std, (size, n)),
+                                                 columns, joint_columns, joint_rows)
+            rate = drift_rate(width, height, horizontal, vertical)
+            exceeded = rate > max_rate
+            exceed_count += exceeded.sum(axis=0)
+            any_exceed += int(exceeded.any(axis=1).sum())
+            rate_sum += rate.sum(axis=0)
+            rate_sumsq += (rate * rate).sum(axis=0)
+
+    _, _, row, column = facade_grid(n, columns)
+    positions = pd.DataFrame({
+        '样本编号': frame['样本编号'].to_numpy(),
+        '安装行': row,
+        '安装列': column,
+        '平均累计偏差率(%)': rate_sum / draws,
+        '累计偏差率标准差(%)': np.sqrt(np.maximum(rate_sumsq / draws - (rate_sum / draws) ** 2, 0.0)),
+        '超限概率': exceed_count / draws,
+    })
+    summary = {
+        '抽样次数': draws,
+        '单元件数': n,
+        '存在超限的抽样比例': any_exceed / draws,
+        '最高超限概率': float(positions['超限概率'].max()) if n else 0.0,
+        '超限概率大于5%的位置数': int((positions['超限概率'] > 0.05).sum()),
+    }
+    return positions, summary
+
+
+def log_stackup_summary(report, summary=None):
+    """打印公差累积结果"""
+    max_rate = report['累计偏差率(%)'].max() if len(report) else 0.0
+    print_log(f"公差累积: {len(report)} 个单元件, 累计偏差率最大 {max_rate:.2f}%, "
+              f"超限 {int(report['累计偏差超限'].sum())} 处")
+    if summary:
+        print_log(f"蒙特卡洛公差累积: {summary['抽样次数']} 次抽样, 存在超限的抽样比例 {summary['存在超限的抽样比例']:.1%}, "
+                  f"超限概率大于 5% 的位置 {summary['超限概率大于5%的位置数']} 个")
+
+
+if __name__ == "__main__":
+    num_units = 100000
+    rng = np.random.default_rng(0)
+    demo_units = pd.DataFrame({
+        '样本编号': np.arange(1, num_units + 1),
+        '宽度(m)': rng.uniform(0.5, 2.0, num_units),
+        '高度(m)': rng.uniform(1.0, 3.5, num_units),
+        '宽度偏差率(%)': rng.normal(0, 0.5, num_units),
+        '高度偏差率(%)': rng.normal(0, 0.5, num_units),
+    })
+    print_log("===== 立面公差累积分析 =====")
+    started = time.perf_counter()
+    demo_report = analyze_stackup(demo_units)
+    print_log(f"单次计算耗时 {time.perf_counter() - started:.3f} 秒")
+    started = time.perf_counter()
+    _, demo_summary = monte_carlo_stackup(demo_units, draws=64, seed=0)
+    print_log(f"蒙特卡洛 64 次抽样耗时 {time.perf_counter() - started:.3f} 秒")
+    log_stackup_summary(demo_report, demo_summary)
@@ -1,15 +1,20 @@
 import pandas as pd
 import numpy as np
-from utils import print_log, simulate_process
+from utils import print_log, simulate_process, save_chart
+from profiler import profiled
+from chart_cache import chart_cache
+import charting
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 class UnitGenerationModule:
-    def __init__(self, processed_params):
+    def __init__(self, processed_params, render_charts=True):
         self.processed_params = processed_params
+        self.render_charts = render_charts
         self.geometric_features = None
         self.shape_generation_results = None 
     
+    @profiled('UnitGenerationModule.extract_geometric_features', rows=lambda self: len(self.processed_params))
     def extract_geometric_features(self):
         """单元件生成模块，提取单元件几何构成要素和形态生成逻辑"""
         print_log("开始提取单元件几何构成要素和形态生成逻辑")
@@ -31,6 +36,7 @@ class UnitGenerationModule:
         print_log("单元件几何构成要素和形态生成逻辑提取完成")
         return features_df
     
+    @profiled('UnitGenerationModule.generate_unit_shape', rows=lambda self: len(self.processed_params))
     def generate_unit_shape(self):  
         """生成单元件形态生成结果"""
         print_log("开始生成单元件形态")
@@ -54,35 +60,47 @@ class UnitGenerationModule:
         
         print_log("单元件形态生成完成")
         
-        # 生成形态特征散点图
-        plt.figure(figsize=(10, 6))
-        plt.scatter(shape_df['宽高比'], shape_df['形态复杂度'], 
-                   c=shape_df['规则匹配度'], cmap='viridis', s=50, alpha=0.7)
-        plt.colorbar(label='规则匹配度')
-        plt.title('单元件宽高比与形态复杂度关系', fontsize=14)
-        plt.xlabel('宽高比', fontsize=12)
-        plt.ylabel('形态复杂度', fontsize=12)
-        plt.grid(linestyle='--', alpha=0.7)
-        plt.savefig('charts/单元件形态特征散点图.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 生成3D形态展示图
-        fig = plt.figure(figsize=(12, 8))
-        ax = fig.add_subplot(111, projection='3d')
-        
-        scatter = ax.scatter(shape_df['宽度(m)'], shape_df['高度(m)'], shape_df['厚度(m)'],
-                           c=shape_df['实际表面积(m²)'], cmap='plasma', s=50, alpha=0.7)
-        
-        ax.set_xlabel('宽度(m)', fontsize=10)
-        ax.set_ylabel('高度(m)', fontsize=10)
-        ax.set_zlabel('厚度(m)', fontsize=10)
-        plt.colorbar(scatter, ax=ax, label='实际表面积(m²)')
-        plt.title('单元件三维尺寸与表面积关系', fontsize=14)
-        plt.savefig('charts/单元件三维尺寸分布图.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        if self.render_charts:
+            # 生成形态特征散点图
+            def draw_feature_chart():
+                plt.figure(figsize=(10, 6))
+                charting.scatter(shape_df['宽高比'], shape_df['形态复杂度'], 
+                                 c=shape_df['规则匹配度'], cmap='viridis', colorbar_label='规则匹配度')
+                plt.title('单元件宽高比与形态复杂度关系', fontsize=14)
+                plt.xlabel('宽高比', fontsize=12)
+                plt.ylabel('形态复杂度', fontsize=12)
+                plt.grid(linestyle='--', alpha=0.7)
+                save_chart('charts/单元件形态特征散点图.png', len(shape_df))
+
+            chart_cache.render('charts/单元件形态特征散点图.png',
+                               inputs={name: shape_df[name] for name in ['宽高比', '形态复杂度', '规则匹配度']},
+                               style={'cmap': 'viridis'},
+                               draw=draw_feature_chart)
+        
+        if self.render_charts:
+            # 生成3D形态展示图
+            def draw_size_chart():
+                fig = plt.figure(figsize=(12, 8))
+                ax = fig.add_subplot(111, projection='3d')
+
+                scatter = charting.scatter_3d(ax, shape_df['宽度(m)'], shape_df['高度(m)'], shape_df['厚度(m)'],
+                                              c=shape_df['实际表面积(m²)'], cmap='plasma')
+
+                ax.set_xlabel('宽度(m)', fontsize=10)
+                ax.set_ylabel('高度(m)', fontsize=10)
+                ax.set_zlabel('厚度(m)', fontsize=10)
+                plt.colorbar(scatter, ax=ax, label='实际表面积(m²)')
+                plt.title('单元件三维尺寸与表面积关系', fontsize=14)
+                save_chart('charts/单元件三维尺寸分布图.png', len(shape_df))
+
+            chart_cache.render('charts/单元件三维尺寸分布图.png',
+                               inputs={name: shape_df[name] for name in ['宽度(m)', '高度(m)', '厚度(m)', '实际表面积(m²)']},
+                               style={'cmap': 'plasma'},
+                               draw=draw_size_chart)
         
         return shape_df
     
+    @profiled('UnitGenerationModule.run', rows=lambda self: len(self.processed_params))
     def run(self):
         """运行单元件生成模块"""
         print_log("开始执行单元件生成模块")
@@ -4,6 +4,8 @@ import os
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from profiler import profiler
+from log_writer import writer
 
 """
 这是一个工具类，用于打印日志、显示进度条等通用功能
@@ -18,18 +20,20 @@ if not os.path.exists('charts'):
     os.makedirs('charts')
 
 def progress_bar(progress, total, module_name):
-    """显示进度条"""
-    percent = 100 * (progress / float(total))
-    bar = '█' * int(percent) + '-' * (100 - int(percent))
-    sys.stdout.write(f"\r{module_name} 进度: |{bar}| {percent:.2f}%")
-    sys.stdout.flush()
-    if progress == total:
-        print()
+    """显示进度条（按刷新频率节流，非终端输出时不渲染）"""
+    writer.progress(progress, total, module_name)
 
-def print_log(message):
-    """打印日志信息"""
-    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-    print(f"[{timestamp}] {message}")
+def print_log(message, module=None):
+    """打印日志信息，由后台线程异步写出"""
+    if module is None and writer.json_path:
+        module = sys._getframe(1).f_globals.get('__name__')
+    writer.log(message, module)
+
+def save_chart(path, rows=0):
+    """保存当前图表并关闭，启用剖析时记录保存耗时"""
+    with profiler.measure(f"图表保存:{os.path.basename(path)}", rows):
+        plt.savefig(path, dpi=300, bbox_inches='tight')
+        plt.close()
 
 def simulate_process(duration, steps, module_name, callback=None):
     """一个耗时过程"""
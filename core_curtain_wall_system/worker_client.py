@@ -0,0 +1,61 @@
+"""
+常驻工作进程的轻量客户端：只依赖标准库，启动开销远小于直接运行 main.py。
+除 --worker-* 选项外的全部参数原样转交给 main()，例如 python worker_client.py --dedup --metrics-cube cube.json；
+作业在各自的输出目录中运行，参数中的相对路径相对于该目录。退出码与作业退出码一致
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET = '/tmp/curtain_wall_worker.sock'
+
+
+def submit(request, socket_path=DEFAULT_SOCKET):
+    """发送一个请求并等待一行 JSON 响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        response = conn.makefile('rb').readline()
+    if not response:
+        raise ConnectionError("工作进程未返回结果")
+    return json.loads(response)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="向常驻工作进程提交一次流水线运行（其余参数转交给 main.py）",
+                                     allow_abbrev=False)
+    parser.add_argument('--worker-socket', default=DEFAULT_SOCKET, help="工作进程的 Unix 套接字路径（默认 %(default)s）")
+    parser.add_argument('--worker-output-dir', help="作业输出目录（默认由工作进程在作业根目录下新建）")
+    parser.add_argument('--worker-seed', type=int, help="随机种子（默认每个作业使用新种子）")
+    parser.add_argument('--worker-timeout', type=float, help="作业超时秒数")
+    parser.add_argument('--worker-ping', action='store_true', help="只查询工作进程状态")
+    args, pipeline_args = parser.parse_known_args(argv)
+
+    if args.worker_ping:
+        request = {'command': 'ping'}
+    else:
+        request = {'args': pipeline_args}
+        if args.worker_output_dir:
+            request['output_dir'] = os.path.abspath(args.worker_output_dir)
+        if args.worker_seed is not None:
+            request['seed'] = args.worker_seed
+        if args.worker_timeout is not None:
+            request['timeout'] = args.worker_timeout
+    try:
+        response = submit(request, args.worker_socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"无法连接工作进程 {args.worker_socket}，请先运行 python worker_daemon.py", file=sys.stderr)
+        return 2
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    if args.worker_ping:
+        return 0
+    if response.get('status') == 'ok':
+        return 0
+    # 超时或被信号终止时 exit_code 为负数，统一返回 1
+    return response['exit_code'] if response.get('exit_code', 0) > 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+常驻工作进程：启动时一次性导入 pandas/NumPy/matplotlib 与全部流水线模块并完成中文字体预热，
+在本地 Unix 套接字上接收作业描述（每行一个 JSON），每个作业 fork 出子进程执行与 main() 相同的流水线。
+子进程在独立的输出目录中运行、使用新的随机数状态，结束后直接退出，图表与模块全局状态不会带入下一个作业。
+
+协议：请求 {"args": [main.py 参数...], "output_dir": 可选, "seed": 可选, "timeout": 可选秒数} 或 {"command": "ping"}；
+响应为一行 JSON，含 status（ok / failed / timeout）、exit_code、output_dir、seed、seconds 与 log
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+import traceback
+import numpy as np
+import matplotlib.pyplot as plt
+import main as pipeline
+import log_writer
+
+DEFAULT_SOCKET = '/tmp/curtain_wall_worker.sock'
+DEFAULT_JOBS_ROOT = 'jobs'
+JOB_LOG_NAME = 'run.log'
+
+
+def _log(message):
+    # 父进程不使用 print_log：日志后台线程会使 fork 时的锁状态不确定，这里直接同步写 stderr
+    sys.stderr.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+    sys.stderr.flush()
+
+
+def warm_up():
+    """预热 matplotlib：首次绘制中文文本时的字体查找结果缓存在进程内，fork 出的子进程直接复用"""
+    plt.figure(figsize=(2, 2))
+    plt.title('预热')
+    plt.plot([0, 1], [0, 1])
+    plt.gcf().canvas.draw()
+    plt.close('all')
+
+
+def _run_in_child(job, output_dir, seed, done_fd):
+    """子进程：切换到作业目录、按给定种子重设随机数与信号处理，执行流水线后关闭管道通知父进程并退出（不返回）"""
+    exit_code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, signal.SIG_DFL)
+        os.chdir(output_dir)
+        os.makedirs('charts', exist_ok=True)
+        log_fd = os.open(JOB_LOG_NAME, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        os.close(log_fd)
+        np.random.seed(seed)
+        random.seed(seed)
+        plt.close('all')
+        pipeline.main(list(job.get('args', [])))
+        exit_code = 0
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            plt.close('all')
+            # 流水线日志由后台线程写出，os._exit 不执行 atexit，退出前主动等待写完
+            log_writer.writer.flush()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.close(done_fd)
+        finally:
+            os._exit(exit_code)
+
+
+class WorkerDaemon:
+    """单线程事件循环 + 每个作业 fork 一个子进程；max_jobs 限制同时运行的作业数"""
+    def __init__(self, socket_path=DEFAULT_SOCKET, jobs_root=DEFAULT_JOBS_ROOT, max_jobs=None, job_timeout=None):
+        self.socket_path = socket_path
+        self.jobs_root = os.path.abspath(jobs_root)
+        self.max_jobs = max_jobs or os.cpu_count() or 1
+        self.job_timeout = job_timeout
+        self.started = time.time()
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self._counter = 0
+        self._slots = None
+
+    def _job_dir(self, job):
+        if job.get('output_dir'):
+            path = os.path.abspath(job['output_dir'])
+        else:
+            self._counter += 1
+            path = os.path.join(self.jobs_root, f"job-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._counter:06d}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    async def run_job(self, job):
+        """fork 子进程执行作业，经管道等待子进程结束、由 waitpid 取得退出码；超时则终止子进程"""
+        async with self._slots:
+            output_dir = self._job_dir(job)
+            # 种子在父进程中确定：作业超时或被终止时仍能返回种子以便复现；未指定时从操作系统熵源取新种子
+            seed = job.get('seed')
+            if seed is None:
+                seed = int(np.random.SeedSequence().generate_state(1)[0])
+            loop = asyncio.get_running_loop()
+            read_fd, write_fd = os.pipe()
+            started = time.perf_counter()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                _run_in_child(job, output_dir, seed, write_fd)
+            os.close(write_fd)
+            self.running += 1
+            try:
+                reader = asyncio.StreamReader()
+                transport, _ = await loop.connect_read_pipe(
+                    lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, 'rb', 0))
+                timeout = job.get('timeout', self.job_timeout)
+                # 子进程退出时管道写端关闭，读到 EOF 即作业结束
+                try:
+                    await asyncio.wait_for(reader.read(), timeout)
+                    status = None
+                except asyncio.TimeoutError:
+                    os.kill(pid, signal.SIGKILL)
+                    status = 'timeout'
+                transport.close()
+                _, wait_status = os.waitpid(pid, 0)
+            finally:
+                self.running -= 1
+            exit_code = os.waitstatus_to_exitcode(wait_status)
+            status = status or ('ok' if exit_code == 0 else 'failed')
+            self.completed += status == 'ok'
+            self.failed += status != 'ok'
+            return {'status': status, 'exit_code': exit_code, 'output_dir': output_dir, 'seed': seed,
+                    'seconds': time.perf_counter() - started, 'log': os.path.join(output_dir, JOB_LOG_NAME)}
+
+    def status(self):
+        return {'status': 'ok', 'pid': os.getpid(), 'uptime': time.time() - self.started, 'running': self.running,
+                'completed': self.completed, 'failed': self.failed, 'max_jobs': self.max_jobs}
+
+    async def handle(self, reader, writer):
+        """每个连接处理一个请求"""
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'status': 'error', 'error': '请求不是合法的 JSON'}
+            else:
+                if request.get('command') == 'ping':
+                    response = self.status()
+                else:
+                    response = await self.run_job(request)
+                    _log(f"作业 {response['status']}: {response['output_dir']} ({response['seconds']:.2f} 秒)")
+            writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._slots = asyncio.Semaphore(self.max_jobs)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        _log(f"工作进程已就绪: {self.socket_path} (pid {os.getpid()}, 最多同时 {self.max_jobs} 个作业)")
+        async with server:
+            await stop.wait()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        _log(f"工作进程退出: 完成 {self.completed} 个作业, 失败 {self.failed} 个")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="常驻流水线工作进程（Unix 套接字 + 每作业 fork）")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix 套接字路径（默认 %(default)s）")
+    parser.add_argument('--jobs-root', default=DEFAULT_JOBS_ROOT, help="未指定输出目录时作业目录的上级目录（默认 %(default)s）")
+    parser.add_argument('--max-jobs', type=int, default=None, help="同时运行的作业数上限（默认 CPU 核数）")
+    parser.add_argument('--job-timeout', type=float, default=None, help="作业超时秒数（默认不限）")
+    args = parser.parse_args()
+    if not hasattr(os, 'fork'):
+        sys.exit("常驻工作进程依赖 fork 与 Unix 套接字，当前平台不支持")
+    warm_up()
+    asyncio.run(WorkerDaemon(args.socket, args.jobs_root, args.max_jobs, args.job_timeout).serve())
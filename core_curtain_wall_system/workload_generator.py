@@ -0,0 +1,320 @@
+"""
+合成工作负载生成：按项目规模生成逼真的幕墙单元件数据，用于压力与规模测试。
+项目由若干楼栋组成，每栋 4 个立面 × 楼层 × 开间排布单元件；单元件取自若干单元族下的有限个单元类型（少数类型大量重复），
+按立面位置确定转角、弧形、顶部倾斜单元，尺寸、材料与成本数据随类型、楼层相关。
+数据按分片生成，每个分片使用独立的 SeedSequence 子流，可由多个进程并行写出为列式 npz 分片（与参数扫描相同的分片 + 清单格式），
+结果与并行度无关，中断后可续写
+"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from utils import print_log
+from profiler import profiler
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+# 单元族：类型名义尺寸取值范围（高度为 None 时取楼栋层高）、曲率/倾斜角度、材料强度等级、单价与安装工时系数
+UNIT_FAMILIES = {
+    '标准视窗单元': {'宽度': (1.2, 1.8), '高度': None, '厚度': (0.12, 0.18), '曲率': (0.0, 0.0), '倾斜角度': (0.0, 0.0),
+                   '材料强度': (240, 280, 320), '单价(元/㎡)': 1800.0, '工时系数': 1.0},
+    '层间窗槛单元': {'宽度': (1.2, 1.8), '高度': (1.0, 1.4), '厚度': (0.15, 0.22), '曲率': (0.0, 0.0), '倾斜角度': (0.0, 0.0),
+                   '材料强度': (240, 280), '单价(元/㎡)': 1400.0, '工时系数': 0.8},
+    '转角单元': {'宽度': (0.5, 0.9), '高度': None, '厚度': (0.2, 0.3), '曲率': (0.0, 0.0), '倾斜角度': (0.0, 0.0),
+               '材料强度': (320, 360, 400), '单价(元/㎡)': 2600.0, '工时系数': 1.6},
+    '弧形单元': {'宽度': (1.0, 1.6), '高度': None, '厚度': (0.15, 0.25), '曲率': (0.2, 0.5), '倾斜角度': (0.0, 0.0),
+               '材料强度': (280, 320, 360), '单价(元/㎡)': 3200.0, '工时系数': 1.8},
+    '顶部倾斜单元': {'宽度': (1.0, 1.6), '高度': (1.5, 2.5), '厚度': (0.15, 0.25), '曲率': (0.0, 0.1), '倾斜角度': (5.0, 15.0),
+                   '材料强度': (280, 320), '单价(元/㎡)': 2800.0, '工时系数': 1.5},
+}
+_VISION, _SPANDREL, _CORNER, _CURVED, _CROWN = range(len(UNIT_FAMILIES))
+
+TYPES_PER_FAMILY = 12
+TYPE_ZIPF_EXPONENT = 1.1  # 类型使用频率 ∝ 1 / 排名^指数，少数类型大量重复
+SPANDREL_SHARE = 0.25  # 非定位单元中层间窗槛单元的比例
+MANUFACTURING_TOLERANCE = 0.002  # 单元件尺寸相对名义尺寸的加工偏差（标准差）
+
+# 楼栋：层数、每个立面的开间数、层高（米）、人工单价（元/小时）；顶部若干层为倾斜单元，部分楼栋有一段弧形立面
+FACADES = 4
+FLOOR_RANGE = (12, 60)
+BAY_RANGE = (20, 60)
+FLOOR_HEIGHT_RANGE = (3.0, 3.5)
+CROWN_FLOORS = 2
+CURVED_SHARE = 0.3
+HOURLY_RATE = (160.0, 15.0)
+JOINT = 0.02  # 接缝宽度（米）
+
+# 施工时间（小时）= (基础工时 + 面积 × 单位面积工时) × 工时系数 × (1 + 楼层 × 楼层增量)，再乘对数正态扰动
+BASE_HOURS = 1.5
+HOURS_PER_M2 = 0.6
+FLOOR_HOURS_FACTOR = 0.004
+
+# 每批生成的楼栋数（楼栋表按批扩展，较小规模的工作负载是较大规模的前缀）
+BUILDING_BLOCK = 1024
+
+# 整数与编码列的存储类型，其余列为 float64
+_COLUMN_DTYPES = {'样本编号': np.int64, '楼栋': np.int32, '立面': np.int8, '楼层': np.int32, '开间': np.int32,
+                  '单元族': np.int8, '单元类型': np.int16}
+
+# 与 data_generator 输出一致的列
+BASIC_COLUMNS = ['样本编号', '宽度(m)', '高度(m)', '厚度(m)', '曲率', '倾斜角度(度)', '材料强度(MPa)', '密度(kg/m³)']
+# 随基础参数一并传入流水线的附加列：实际标高供动态风荷载分析使用（替代按立面排布估算的标高）
+PIPELINE_EXTRA_COLUMNS = ['标高(m)']
+CONSTRUCTION_COLUMNS = ['样本编号', '施工时间(小时)', '人工成本(元)', '材料成本(元)']
+
+
+class WorkloadGenerator:
+    """按分片生成合成项目数据；单元类型表与楼栋表由根种子确定，各分片使用 SeedSequence 的独立子流"""
+    def __init__(self, rows: int, seed: int = 0, shard_rows: int = 1000000, types_per_family: int = TYPES_PER_FAMILY):
+        self.rows = int(rows)
+        self.seed = int(seed)
+        self.shard_rows = int(shard_rows)
+        self.types_per_family = int(types_per_family)
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed))
+        self._build_type_catalog(rng)
+        self._build_buildings(rng)
+
+    @property
+    def shard_count(self) -> int:
+        return -(-self.rows // self.shard_rows)
+
+    def config(self) -> dict:
+        return {'版本': FORMAT_VERSION, '行数': self.rows, '种子': self.seed, '分片行数': self.shard_rows,
+                '每族类型数': self.types_per_family}
+
+    def categories(self) -> dict:
+        return {'单元族': list(UNIT_FAMILIES), '单元类型': self.type_names}
+
+    def _build_type_catalog(self, rng) -> None:
+        """各单元族的名义类型：尺寸按 5 cm / 1 cm 模数取整，同族类型的材料强度从等级中选取"""
+        t = self.types_per_family
+        columns = {name: [] for name in ['宽度', '高度', '厚度', '曲率', '倾斜角度', '材料强度', '密度', '单价', '工时系数']}
+        self.type_names = []
+        for family, spec in UNIT_FAMILIES.items():
+            columns['宽度'].append(np.round(rng.uniform(*spec['宽度'], t) / 0.05) * 0.05)
+            columns['高度'].append(np.full(t, np.nan) if spec['高度'] is None else
+                                 np.round(rng.uniform(*spec['高度'], t) / 0.05) * 0.05)
+            columns['厚度'].append(np.round(rng.uniform(*spec['厚度'], t), 2))
+            columns['曲率'].append(rng.uniform(*spec['曲率'], t))
+            columns['倾斜角度'].append(rng.uniform(*spec['倾斜角度'], t))
+            columns['材料强度'].append(rng.choice(np.asarray(spec['材料强度'], dtype=np.float64), t))
+            columns['密度'].append(np.round(rng.uniform(2650, 2800, t), -1))
+            columns['单价'].append(np.full(t, spec['单价(元/㎡)']))
+            columns['工时系数'].append(np.full(t, spec['工时系数']))
+            self.type_names += [f'{family}-{k + 1:02d}' for k in range(t)]
+        self.types = {name: np.concatenate(values) for name, values in columns.items()}
+        weights = 1.0 / np.arange(1, t + 1) ** TYPE_ZIPF_EXPONENT
+        self.type_weights = weights / weights.sum()
+
+    def _build_buildings(self, rng) -> None:
+        """按批生成楼栋，直至单元件总数覆盖 rows"""
+        blocks = []
+        total = 0
+        while total < self.rows:
+            n = BUILDING_BLOCK
+            floors = rng.integers(FLOOR_RANGE[0], FLOOR_RANGE[1] + 1, n)
+            bays = rng.integers(BAY_RANGE[0], BAY_RANGE[1] + 1, n)
+            curve_length = rng.integers(3, 10, n)
+            block = {
+                '层数': floors,
+                '开间数': bays,
+                '层高': np.round(rng.uniform(*FLOOR_HEIGHT_RANGE, n), 2),
+                '人工单价': rng.normal(*HOURLY_RATE, n),
+                # 弧形段：所在立面与开间区间，无弧形段的楼栋区间为空
+                '弧形立面': rng.integers(0, FACADES, n),
+                '弧形起点': rng.integers(1, np.maximum(bays - curve_length, 2)),
+                '弧形长度': np.where(rng.random(n) < CURVED_SHARE, curve_length, 0),
+            }
+            blocks.append(block)
+            total += int((FACADES * floors * bays).sum())
+        self.buildings = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+        units = FACADES * self.buildings['层数'] * self.buildings['开间数']
+        self.building_start = np.r_[0, np.cumsum(units)[:-1]]
+
+    def shard_rng(self, shard_index: int):
+        """第 shard_index 个分片的随机数生成器（与分片总数和并行方式无关）"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(shard_index,)))
+
+    def generate_shard(self, shard_index: int) -> dict:
+        """生成一个分片的全部列"""
+        start = shard_index * self.shard_rows
+        stop = min(start + self.shard_rows, self.rows)
+        n = stop - start
+        rng = self.shard_rng(shard_index)
+        b = self.buildings
+        with profiler.measure('workload_generator.generate_shard', n):
+            index = np.arange(start, stop, dtype=np.int64)
+            building = np.searchsorted(self.building_start, index, side='right') - 1
+            local = index - self.building_start[building]
+            floors, bays = b['层数'][building], b['开间数'][building]
+            facade, cell = np.divmod(local, floors * bays)
+            floor, bay = np.divmod(cell, bays)
+
+            # 单元族：转角 > 弧形段 > 顶部楼层 > 视窗/层间随机
+            family = np.where(rng.random(n) < SPANDREL_SHARE, _SPANDREL, _VISION)
+            family[floor >= floors - CROWN_FLOORS] = _CROWN
+            curve_start = b['弧形起点'][building]
+            curved = (facade == b['弧形立面'][building]) & (bay >= curve_start) & \
+                     (bay < curve_start + b['弧形长度'][building])
+            family[curved] = _CURVED
+            family[(bay == 0) | (bay == bays - 1)] = _CORNER
+            unit_type = family * self.types_per_family + rng.choice(self.types_per_family, n, p=self.type_weights)
+
+            types = self.types
+            floor_height = b['层高'][building]
+            tolerance = lambda: 1 + rng.normal(0, MANUFACTURING_TOLERANCE, n)
+            nominal_height = types['高度'][unit_type]
+            width = types['宽度'][unit_type] * tolerance()
+            height = np.where(np.isnan(nominal_height), floor_height - JOINT, nominal_height) * tolerance()
+            thickness = types['厚度'][unit_type] * tolerance()
+            # 弧形单元在相邻立面上交替外凸/内凹
+            curvature = types['曲率'][unit_type] * np.where(facade % 2 == 0, 1.0, -1.0)
+            area = width * height
+
+            hours = (BASE_HOURS + area * HOURS_PER_M2) * types['工时系数'][unit_type] * (1 + floor * FLOOR_HOURS_FACTOR)
+            hours *= rng.lognormal(0, 0.15, n)
+            labor_cost = hours * b['人工单价'][building] * rng.lognormal(0, 0.05, n)
+            material_cost = area * types['单价'][unit_type] * (1 + 0.3 * np.abs(curvature)) * rng.lognormal(0, 0.08, n)
+
+            columns = {
+                '样本编号': index + 1,
+                '楼栋': building,
+                '立面': facade,
+                '楼层': floor,
+                '开间': bay,
+                '标高(m)': floor * floor_height + height / 2,
+                '单元族': family,
+                '单元类型': unit_type,
+                '宽度(m)': width,
+                '高度(m)': height,
+                '厚度(m)': thickness,
+                '曲率': curvature,
+                '倾斜角度(度)': types['倾斜角度'][unit_type],
+                '材料强度(MPa)': types['材料强度'][unit_type],
+                '密度(kg/m³)': types['密度'][unit_type],
+                '施工时间(小时)': hours,
+                '人工成本(元)': labor_cost,
+                '材料成本(元)': material_cost,
+            }
+            return {name: values.astype(_COLUMN_DTYPES.get(name, np.float64), copy=False)
+                    for name, values in columns.items()}
+
+    def write_shard(self, output_dir: str, shard_index: int) -> int:
+        """生成并写出一个分片（先写临时文件再替换），返回行数"""
+        columns = self.generate_shard(shard_index)
+        path = os.path.join(output_dir, f"part-{shard_index:05d}.npz")
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **columns)
+        os.replace(tmp_path, path)
+        return len(columns['样本编号'])
+
+    def run(self, output_dir: str, workers: int = None, resume: bool = True, on_progress=None) -> dict:
+        """生成全部分片；workers > 1 时由进程池并行写出，清单按完成顺序更新，配置不变时跳过已完成的分片"""
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = self._load_manifest(output_dir) if resume else None
+        if manifest is None or manifest["config"] != self.config():
+            for path in glob.glob(os.path.join(output_dir, "part-*.npz")):
+                os.remove(path)
+            manifest = {"config": self.config(), "categories": self.categories(), "completed": {}, "rows": 0}
+            self._write_manifest(output_dir, manifest)
+
+        pending = [k for k in range(self.shard_count) if str(k) not in manifest["completed"]]
+        workers = workers or os.cpu_count() or 1
+        started = time.perf_counter()
+
+        def record(shard_index, rows):
+            manifest["completed"][str(shard_index)] = rows
+            manifest["rows"] += rows
+            self._write_manifest(output_dir, manifest)
+            if on_progress:
+                on_progress(len(manifest["completed"]), self.shard_count, manifest["rows"])
+
+        with profiler.measure('workload_generator.run', self.rows - manifest["rows"]):
+            if workers > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                    futures = {executor.submit(_write_shard_task, self.config(), output_dir, k): k for k in pending}
+                    for future in as_completed(futures):
+                        record(futures[future], future.result())
+            else:
+                for k in pending:
+                    record(k, self.write_shard(output_dir, k))
+        return {"rows": manifest["rows"], "shards": self.shard_count, "generated": len(pending),
+                "seconds": time.perf_counter() - started}
+
+    def _load_manifest(self, output_dir: str):
+        path = os.path.join(output_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, output_dir: str, manifest: dict) -> None:
+        """原子写入清单，中断时不会留下写了一半的 manifest.json"""
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+
+
+# 工作进程内按配置缓存生成器（类型表与楼栋表只构建一次）
+_generators = {}
+
+
+def _write_shard_task(config: dict, output_dir: str, shard_index: int) -> int:
+    key = json.dumps(config, sort_keys=True)
+    if key not in _generators:
+        _generators[key] = WorkloadGenerator(config['行数'], config['种子'], config['分片行数'], config['每族类型数'])
+    return _generators[key].write_shard(output_dir, shard_index)
+
+
+def load_workload(output_dir: str, columns: list = None, shards: list = None) -> pd.DataFrame:
+    """读取工作负载分片为数据表（按分片顺序）；columns、shards 指定时只读取这些列与分片，编码列还原为分类"""
+    with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    indices = sorted(int(k) for k in manifest["completed"]) if shards is None else list(shards)
+    chunks = {}
+    for k in indices:
+        with np.load(os.path.join(output_dir, f"part-{k:05d}.npz")) as shard:
+            for name in shard.files:
+                if columns is None or name in columns:
+                    chunks.setdefault(name, []).append(shard[name])
+    frame = pd.DataFrame({name: np.concatenate(values) for name, values in chunks.items()})
+    for name, categories in manifest["categories"].items():
+        if name in frame:
+            frame[name] = pd.Categorical.from_codes(frame[name], categories=categories)
+    return frame
+
+
+def pipeline_frames(frame: pd.DataFrame):
+    """拆分为与 data_generator 相同结构的 (基础参数, 施工数据)，可直接作为流水线输入；基础参数附带 标高(m) 列"""
+    basic = BASIC_COLUMNS + [name for name in PIPELINE_EXTRA_COLUMNS if name in frame]
+    return frame[basic].reset_index(drop=True), frame[CONSTRUCTION_COLUMNS].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成合成幕墙项目工作负载（列式 npz 分片）")
+    parser.add_argument('--rows', type=int, default=10000000, help="单元件总数（默认 %(default)s）")
+    parser.add_argument('--seed', type=int, default=0, help="根种子（默认 %(default)s）")
+    parser.add_argument('--shard-rows', type=int, default=1000000, help="每个分片的行数（默认 %(default)s）")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    parser.add_argument('--output', default='workload', help="输出目录（默认 %(default)s）")
+    parser.add_argument('--no-resume', action='store_true', help="忽略已完成的分片，重新生成")
+    args = parser.parse_args()
+
+    generator = WorkloadGenerator(args.rows, args.seed, args.shard_rows)
+    print_log(f"===== 合成工作负载: {args.rows} 行, {generator.shard_count} 个分片, "
+              f"楼栋表 {len(generator.buildings["层数"])} 栋 =====")
+    summary = generator.run(args.output, workers=args.workers, resume=not args.no_resume,
+                            on_progress=lambda done, total, rows: print_log(f"分片 {done}/{total}, 累计 {rows} 行"))
+    print_log(f"生成 {summary['generated']} 个分片, 共 {summary['rows']} 行, 耗时 {summary['seconds']:.1f} 秒, "
+              f"{summary['rows'] / max(summary['seconds'], 1e-9) / 1e6:.2f} M 行/秒")
+    sample = load_workload(args.output, shards=[0])
+    print_log(f"单元类型 {sample['单元类型'].nunique()} 种, 前 5 种占比 "
+              f"{sample['单元类型'].value_counts(normalize=True).head(5).sum():.1%}; "
+              f"面积与材料成本相关系数 {np.corrcoef(sample['宽度(m)'] * sample['高度(m)'], sample['材料成本(元)'])[0, 1]:.2f}")
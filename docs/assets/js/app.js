@@ -49,14 +49,14 @@ function bindLogout() {
   });
 }
 
-// 加载数据集
+// 加载数据集：先读取清单，再按需加载当前方案的分片；清单不可用时退回整包数据集
 async function bootstrapDataset() {
   try {
-    const response = await fetch("data/system_dataset.json", { cache: "no-store" });
-    dataset = await response.json();
+    dataset = await loadManifest();
     document.getElementById("lastUpdated").textContent = new Date(dataset.generatedAt).toLocaleString();
     populateProfiles(dataset.profiles, dataset.activeProfileId);
-    const activeProfile = dataset.profiles.find((item) => item.id === dataset.activeProfileId) || dataset.profiles[0];
+    const activeEntry = dataset.profiles.find((item) => item.id === dataset.activeProfileId) || dataset.profiles[0];
+    const activeProfile = activeEntry && (await loadProfile(activeEntry));
     if (activeProfile) {
       applyProfileToForm(activeProfile);
       runAndRender(activeProfile, "导入基础配置");
@@ -75,6 +75,34 @@ async function bootstrapDataset() {
   }
 }
 
+async function loadManifest() {
+  const response = await fetch("data/manifest.json", { cache: "no-cache" });
+  if (response.ok) {
+    return response.json();
+  }
+  // 旧版整包数据集：方案参数已内嵌，无需分片
+  const legacy = await fetch("data/system_dataset.json", { cache: "no-store" });
+  if (!legacy.ok) {
+    throw new Error(`数据集请求失败: ${legacy.status}`);
+  }
+  return legacy.json();
+}
+
+// 分片文件名带内容哈希，可由浏览器长期缓存；已加载的方案缓存在清单条目上
+async function loadProfile(entry) {
+  if (!entry.shard) {
+    return entry;
+  }
+  if (!entry.profile) {
+    const response = await fetch(`data/${entry.shard}`, { cache: "force-cache" });
+    if (!response.ok) {
+      throw new Error(`方案分片请求失败: ${response.status}`);
+    }
+    entry.profile = (await response.json()).profile;
+  }
+  return entry.profile;
+}
+
 function populateProfiles(profiles, activeId) {
   const selector = document.getElementById("profileSelector");
   selector.innerHTML = "";
@@ -86,12 +114,19 @@ function populateProfiles(profiles, activeId) {
   });
   selector.value = activeId;
   document.getElementById("activeProfileLabel").textContent = activeId;
-  selector.addEventListener("change", (event) => {
-    const selected = dataset.profiles.find((profile) => profile.id === event.target.value);
-    if (selected) {
+  selector.addEventListener("change", async (event) => {
+    const entry = dataset.profiles.find((profile) => profile.id === event.target.value);
+    if (!entry) {
+      return;
+    }
+    try {
+      const selected = await loadProfile(entry);
       document.getElementById("activeProfileLabel").textContent = selected.id;
       applyProfileToForm(selected);
       runAndRender(selected, "方案切换重新生成");
+    } catch (error) {
+      console.error("加载方案失败", error);
+      showToast(`无法载入方案 ${entry.id}。`);
     }
   });
 }
@@ -1,17 +1,34 @@
 """Generate deterministic seed data for the facade unit system."""
 from __future__ import annotations
 
+import argparse
+import csv
+import gzip
+import hashlib
 import json
-from dataclasses import dataclass, asdict
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，缺失时只生成 gzip 预压缩文件
+    brotli = None
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_PATH = BASE_DIR / "data" / "system_dataset.json"
 PUBLIC_DATA_PATH = BASE_DIR / "public" / "data" / "system_dataset.json"
+PORTFOLIO_PATH = BASE_DIR / "data" / "portfolio_dataset.json"
+SITE_DATA_DIR = BASE_DIR / "docs" / "data"
+MANIFEST_NAME = "manifest.json"
+SHARD_DIR_NAME = "shards"
 
 # 设计参数类
 @dataclass
@@ -263,6 +280,355 @@ def build_data_association(profile: DesignProfile, corrections: Dict) -> Dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# 组合模式：批量读取设计参数并按数组一次性计算全部方案
+# ---------------------------------------------------------------------------
+
+NUMERIC_FIELDS = [f.name for f in fields(DesignProfile) if f.name not in ("id", "name", "material")]
+TIMELINE = ["Concept", "Design Freeze", "Mockup", "Fabrication", "Installation"]
+STRESS_NODES = 7
+CORRECTION_ITERATIONS = 5
+
+
+def load_profiles(path: Path) -> List[DesignProfile]:
+    """Load design profiles from a JSON list (or {"profiles": [...]}) or a CSV file."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(rows, dict):
+            rows = rows["profiles"]
+
+    profiles = []
+    for row in rows:
+        values = {key: (float(row[key]) if row.get(key) not in (None, "") else None) for key in NUMERIC_FIELDS}
+        profiles.append(DesignProfile(id=str(row["id"]), name=str(row.get("name", row["id"])),
+                                      material=str(row.get("material", "aluminum")), **values))
+    return profiles
+
+
+def generate_sample_profiles(count: int, seed: int = 0) -> List[DesignProfile]:
+    """Synthetic portfolio spread around RULE_SET for load testing the portfolio mode."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for key, rule in RULE_SET.items():
+        margin = (rule["max"] - rule["min"]) * 0.1
+        columns[key] = rng.uniform(rule["min"] - margin, rule["max"] + margin, count)
+    columns["wind_speed"] = rng.uniform(25, 50, count)
+    columns["thermal_gradient"] = rng.uniform(8, 24, count)
+    materials = rng.choice(list(MATERIAL_DENSITY), count)
+    return [
+        DesignProfile(id=f"PF-{i + 1:05d}", name=f"Portfolio Unit {i + 1}", material=str(materials[i]),
+                      **{key: round(float(columns[key][i]), 4) for key in NUMERIC_FIELDS})
+        for i in range(count)
+    ]
+
+
+def profile_arrays(profiles: List[DesignProfile]) -> Dict[str, np.ndarray]:
+    # 缺失参数记为 NaN
+    arrays = {
+        key: np.array([np.nan if getattr(p, key) is None else getattr(p, key) for p in profiles], dtype=float)
+        for key in NUMERIC_FIELDS
+    }
+    arrays["density"] = np.array([MATERIAL_DENSITY.get(p.material, 30.0) for p in profiles])
+    return arrays
+
+
+def _round(values, digits: int) -> np.ndarray:
+    """Vectorised counterpart of the builtin round(); near-ties fall back to round() so results match exactly."""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, digits) for v in values[near_tie].tolist()]
+    return rounded
+
+
+def analyze_parameter_integrity_batch(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    keys = list(RULE_SET.keys())
+    values = np.column_stack([arrays[key] for key in keys])
+    target = np.array([RULE_SET[key]["target"] for key in keys])
+    spread = np.array([(RULE_SET[key]["max"] - RULE_SET[key]["min"]) or RULE_SET[key]["target"] for key in keys])
+    weight = np.array([RULE_SET[key]["weight"] for key in keys])
+
+    missing = np.isnan(values)
+    # 缺失参数按最大偏差计入
+    normalized_gap = np.where(missing, 1.8, np.minimum(np.abs(values - target) / (spread / 2), 1.8))
+    penalty = (normalized_gap * weight).sum(axis=1)
+    return {
+        "missing": missing,
+        "completenessScore": _round((1 - missing.sum(axis=1) / len(keys)) * 100, 2),
+        "ruleMatchScore": _round(np.maximum(0.0, 100 - penalty * 18), 2),
+        "normalizedIndicators": _round(100 - normalized_gap * 55 * weight, 2),
+    }
+
+
+def generate_unit_geometry_batch(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    width, height = arrays["module_width"], arrays["module_height"]
+    area = width * height
+    envelope_volume = area * arrays["module_depth"]
+    curvature_factor = 1 / np.maximum(arrays["curvature_radius"], 1)
+    tilt_factor = np.deg2rad(arrays["tilt_angle"])
+    frame_weight = _round(envelope_volume * arrays["density"] * 0.85, 2)
+
+    path_weights_raw = np.column_stack([
+        area,
+        envelope_volume * (1 + curvature_factor * 12),
+        frame_weight * (0.5 + np.abs(tilt_factor)),
+        arrays["panel_thickness"] * 10,
+    ])
+    return {
+        "projectedArea": _round(area, 3),
+        "envelopeVolume": _round(envelope_volume, 3),
+        "frameWeight": frame_weight,
+        "controlPoints": np.stack([
+            np.zeros((len(width), 2)),
+            np.column_stack([width * 0.4, height * 0.18]),
+            np.column_stack([width * 0.65, height * 0.55]),
+            np.column_stack([width, height]),
+        ], axis=1),
+        "pathWeights": _round(path_weights_raw / path_weights_raw.sum(axis=1, keepdims=True), 3),
+        "curvatureInfluence": _round(curvature_factor * 120, 2),
+        "tiltResponse": _round(np.sin(tilt_factor) * 45, 2),
+        "mullionCoupling": _round(arrays["mullion_spacing"] / width, 3),
+        "thicknessRatio": _round(arrays["panel_thickness"] / arrays["module_depth"], 3),
+    }
+
+
+def run_structural_verification_batch(arrays: Dict[str, np.ndarray], geometry: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    height = arrays["module_height"]
+    exposure_factor = 0.5 + height / 12
+    wind_pressure = 0.613 * (arrays["wind_speed"] ** 2) * exposure_factor / 1000
+    dead_load = geometry["frameWeight"] * 0.0098
+
+    # 受力节点网格 (方案数, 节点数)
+    idx = np.arange(STRESS_NODES)
+    elevation = np.linspace(0, height, STRESS_NODES, axis=1)
+    baseline_stress = np.sqrt(wind_pressure ** 2 + dead_load ** 2)[:, None]
+    gradient_factor = 1 + (idx / (STRESS_NODES - 1)) * 0.32
+    generated = baseline_stress * gradient_factor * (1 + geometry["curvatureInfluence"][:, None] / 400)
+    optimized = generated * (0.92 - idx * 0.015)
+
+    # 节点应力在逐方案版本中是 numpy 标量，沿用 np.round 的舍入方式
+    generated_rounded = np.round(generated, 3)
+    optimized_rounded = np.round(optimized, 3)
+    stability_index = np.round(100 - np.abs(generated_rounded - optimized_rounded).mean(axis=1) * 38, 2)
+    return {
+        "windPressure": _round(wind_pressure, 3),
+        "deadLoad": _round(dead_load, 3),
+        "stabilityIndex": np.clip(stability_index, 0, 100),
+        "elevation": np.round(elevation, 2),
+        "baseline": np.round(baseline_stress * gradient_factor, 3),
+        "generated": generated_rounded,
+        "optimized": optimized_rounded,
+    }
+
+
+def compute_error_correction_batch(arrays: Dict[str, np.ndarray], geometry: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    drift = geometry["curvatureInfluence"] * 0.18 + arrays["thermal_gradient"] * 0.014
+    # 修正迭代 (方案数, 迭代次数)
+    i = np.arange(CORRECTION_ITERATIONS)
+    reduction_factor = 0.72 - i * 0.12
+    deviation_mm = _round(drift[:, None] * reduction_factor, 3)
+    shape_offset = _round(geometry["tiltResponse"][:, None] * reduction_factor, 3)
+    path_weights = geometry["pathWeights"]
+    path_reweight = _round(path_weights[:, i % path_weights.shape[1]], 3)
+
+    residual = np.maximum(0.0, deviation_mm[:, -1] * 0.45)
+    suitability = _round(100 - residual * 12, 2)
+    return {
+        "deviationMm": deviation_mm,
+        "shapeOffsetDeg": shape_offset,
+        "pathReweight": path_reweight,
+        "residualDeviation": _round(residual, 3),
+        "assemblySuitability": np.clip(suitability, 0, 100),
+    }
+
+
+def build_data_association_batch(arrays: Dict[str, np.ndarray], corrections: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    idx = np.arange(len(TIMELINE))
+    base = 0.68 + corrections["assemblySuitability"] / 250
+    correlation = np.clip(base[:, None] * (1 - idx * 0.06) + 0.05 * idx, 0.4, 0.98)
+    width = arrays["module_width"][:, None]
+    return {
+        "correlation": _round(correlation, 3),
+        "designParam": _round(width * (1 + 0.015 * idx), 3),
+        "fieldValue": _round(width * (1 + 0.01 * idx), 3),
+        "syncLag": np.maximum(0, 5 - idx) * 2,
+    }
+
+
+def _to_list(values: np.ndarray) -> list:
+    """ndarray.tolist() with non-finite floats (from missing inputs) mapped to None, i.e. JSON null."""
+    if values.dtype.kind != "f" or np.isfinite(values).all():
+        return values.tolist()
+    values = values.astype(object)
+    values[~np.isfinite(values.astype(float))] = None
+    return values.tolist()
+
+
+def _portfolio_records(profiles: List[DesignProfile]) -> List[Dict]:
+    """Evaluate a chunk of profiles with the batch functions and rebuild the per-profile structure."""
+    arrays = profile_arrays(profiles)
+    integrity = analyze_parameter_integrity_batch(arrays)
+    geometry = generate_unit_geometry_batch(arrays)
+    structural = run_structural_verification_batch(arrays, geometry)
+    corrections = compute_error_correction_batch(arrays, geometry)
+    association = build_data_association_batch(arrays, corrections)
+
+    # 批量转换为 Python 标量，避免逐元素调用 float()；缺失参数导致的 NaN 记为 None
+    keys = list(RULE_SET.keys())
+    integ = {name: _to_list(integrity[name]) for name in ("completenessScore", "ruleMatchScore", "normalizedIndicators", "missing")}
+    geo = {name: _to_list(value) for name, value in geometry.items()}
+    struct = {name: _to_list(value) for name, value in structural.items()}
+    corr = {name: _to_list(value) for name, value in corrections.items()}
+    assoc = {name: _to_list(value) for name, value in association.items()}
+    syncs = assoc["syncLag"]
+
+    records = []
+    for n, profile in enumerate(profiles):
+        completeness, rule_match = integ["completenessScore"][n], integ["ruleMatchScore"][n]
+        records.append({
+            "profileId": profile.id,
+            "integrity": {
+                "completenessScore": completeness,
+                "ruleMatchScore": rule_match,
+                "normalizedIndicators": dict(zip(keys, integ["normalizedIndicators"][n])),
+                "missingParameters": [key for key, miss in zip(keys, integ["missing"][n]) if miss],
+                "notes": (
+                    "Parameter coverage satisfactory; proceed to geometry synthesis"
+                    if completeness > 90 and rule_match > 72
+                    else "Review highlighted inputs to strengthen rule alignment"
+                ),
+            },
+            "geometry": {
+                "projectedArea": geo["projectedArea"][n],
+                "envelopeVolume": geo["envelopeVolume"][n],
+                "frameWeight": geo["frameWeight"][n],
+                "controlPoints": geo["controlPoints"][n],
+                "pathWeights": geo["pathWeights"][n],
+                "dynamicCoefficients": {
+                    "curvatureInfluence": geo["curvatureInfluence"][n],
+                    "tiltResponse": geo["tiltResponse"][n],
+                    "mullionCoupling": geo["mullionCoupling"][n],
+                    "thicknessRatio": geo["thicknessRatio"][n],
+                },
+            },
+            "structural": {
+                "windPressure": struct["windPressure"][n],
+                "deadLoad": struct["deadLoad"][n],
+                "stabilityIndex": struct["stabilityIndex"][n],
+                "stressDistribution": [
+                    {"node": k + 1, "elevation": e, "baseline": b, "generated": g, "optimized": o}
+                    for k, (e, b, g, o) in enumerate(zip(struct["elevation"][n], struct["baseline"][n],
+                                                         struct["generated"][n], struct["optimized"][n]))
+                ],
+            },
+            "corrections": {
+                "iterations": [
+                    {"iteration": k + 1, "deviationMm": d, "shapeOffsetDeg": s, "pathReweight": w}
+                    for k, (d, s, w) in enumerate(zip(corr["deviationMm"][n], corr["shapeOffsetDeg"][n],
+                                                      corr["pathReweight"][n]))
+                ],
+                "residualDeviation": corr["residualDeviation"][n],
+                "assemblySuitability": corr["assemblySuitability"][n],
+            },
+            "association": {
+                "correlations": [{"stage": stage, "correlation": c}
+                                 for stage, c in zip(TIMELINE, assoc["correlation"][n])],
+                "linkageTable": [
+                    {"stage": stage, "designParam": d, "fieldValue": f, "syncLag": syncs[k]}
+                    for k, (stage, d, f) in enumerate(zip(TIMELINE, assoc["designParam"][n], assoc["fieldValue"][n]))
+                ],
+            },
+        })
+    return records
+
+
+def build_portfolio(profiles: List[DesignProfile], workers: Optional[int] = None, chunk_size: int = 2000) -> Dict:
+    """Evaluate every profile; chunks are spread over a process pool when workers > 1."""
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    chunks = [profiles[i:i + chunk_size] for i in range(0, len(profiles), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            parts = list(executor.map(_portfolio_records, chunks))
+    else:
+        parts = [_portfolio_records(chunk) for chunk in chunks]
+    return {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "profileCount": len(profiles),
+        "profiles": [asdict(profile) for profile in profiles],
+        "results": [record for part in parts for record in part],
+    }
+
+
+# ---------------------------------------------------------------------------
+# 分片数据集：小清单 + 按方案拆分、内容哈希命名的分片文件
+# ---------------------------------------------------------------------------
+
+def _compact_json(payload) -> bytes:
+    # allow_nan=False：非有限值须先转为 None，否则浏览器端 JSON 解析失败
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(payload)
+    os.replace(temp_path, path)
+
+
+def write_shard(shard_dir: Path, profile_id: str, payload: bytes) -> tuple[str, bool]:
+    """Write one shard plus .gz/.br siblings; returns (file name, whether it was written).
+
+    The name carries a content hash, so an existing file with the same name is already up to date.
+    """
+    digest = hashlib.sha256(payload).hexdigest()[:16]
+    name = f"{re.sub(r'[^A-Za-z0-9_-]', '_', profile_id)}.{digest}.json"
+    path = shard_dir / name
+    if path.exists():
+        return name, False
+    # mtime=0 使相同内容的 gzip 文件逐字节一致
+    _write_atomic(path.with_name(name + ".gz"), gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path.with_name(name + ".br"), brotli.compress(payload, quality=11))
+    _write_atomic(path, payload)
+    return name, True
+
+
+def write_sharded_dataset(site_dir: Path, profiles: List[DesignProfile], records: List[Dict],
+                          active_profile_id: str, generated_at: str) -> Dict:
+    """Write manifest.json and one shard per profile under site_dir; stale shards are removed."""
+    shard_dir = site_dir / SHARD_DIR_NAME
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    entries, written, keep = [], 0, set()
+    for profile, record in zip(profiles, records):
+        shard = {"profile": asdict(profile), **{key: value for key, value in record.items() if key != "profileId"}}
+        name, changed = write_shard(shard_dir, profile.id, _compact_json(shard))
+        written += changed
+        keep.update({name, name + ".gz", name + ".br"})
+        entries.append({"id": profile.id, "name": profile.name, "shard": f"{SHARD_DIR_NAME}/{name}"})
+
+    removed = 0
+    for stale in shard_dir.iterdir():
+        if stale.name not in keep:
+            stale.unlink()
+            removed += 1
+
+    manifest = {
+        "generatedAt": generated_at,
+        "activeProfileId": active_profile_id,
+        "profileCount": len(entries),
+        "encodings": ["gzip", "br"] if brotli is not None else ["gzip"],
+        "profiles": entries,
+    }
+    _write_atomic(site_dir / MANIFEST_NAME, _compact_json(manifest))
+    return {"shards": len(entries), "written": written, "unchanged": len(entries) - written, "removed": removed}
+
+
 def build_dataset() -> Dict:
     profiles = build_profiles()
     active_profile = profiles[0]
@@ -285,16 +651,69 @@ def build_dataset() -> Dict:
     }
 
 
-def main() -> None:
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=Path,
+                        help="JSON/CSV file of design profiles; evaluates all of them instead of the seed dataset")
+    parser.add_argument("--sample-profiles", type=int, metavar="COUNT",
+                        help="write COUNT synthetic profiles to --profiles before running")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size for portfolio mode (default: CPU count)")
+    parser.add_argument("--portfolio-output", type=Path, default=PORTFOLIO_PATH,
+                        help="portfolio results path (default: %(default)s)")
+    parser.add_argument("--site-dir", type=Path, default=None,
+                        help=f"directory receiving the sharded dashboard dataset (default: {SITE_DATA_DIR}); "
+                             "portfolio mode writes shards only when this is given")
+    return parser.parse_args(argv)
+
+
+def _report_shards(site_dir: Path, stats: Dict) -> None:
+    print(f"Sharded dataset at: {site_dir / MANIFEST_NAME} "
+          f"({stats['shards']} shards, {stats['written']} written, {stats['unchanged']} unchanged, "
+          f"{stats['removed']} stale files removed)")
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.profiles:
+        if args.sample_profiles:
+            args.profiles.parent.mkdir(parents=True, exist_ok=True)
+            args.profiles.write_text(json.dumps(
+                [asdict(p) for p in generate_sample_profiles(args.sample_profiles)], ensure_ascii=False, indent=2))
+            print(f"Sample profiles written to: {args.profiles}")
+        profiles = load_profiles(args.profiles)
+
+        started = time.perf_counter()
+        portfolio = build_portfolio(profiles, workers=args.workers)
+        elapsed = time.perf_counter() - started
+        args.portfolio_output.parent.mkdir(parents=True, exist_ok=True)
+        args.portfolio_output.write_bytes(_compact_json(portfolio))
+        print(f"Portfolio of {len(profiles)} profiles evaluated in {elapsed:.2f}s: {args.portfolio_output}")
+
+        # 组合模式默认不写分片：清理过期分片会覆盖仓库中跟踪的 docs/data
+        if args.site_dir is not None:
+            stats = write_sharded_dataset(args.site_dir, profiles, portfolio["results"],
+                                          profiles[0].id, portfolio["generatedAt"])
+            _report_shards(args.site_dir, stats)
+        return
+
     dataset = build_dataset()
+    # 只序列化一次，基线备份与旧版前端兼容文件共用
+    text = json.dumps(dataset, ensure_ascii=False, indent=2)
     DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    DATA_PATH.write_text(json.dumps(dataset, ensure_ascii=False, indent=2))
+    DATA_PATH.write_text(text)
     print(f"Dataset generated at: {DATA_PATH}")
 
     PUBLIC_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    PUBLIC_DATA_PATH.write_text(json.dumps(dataset, ensure_ascii=False, indent=2))
+    PUBLIC_DATA_PATH.write_text(text)
     print(f"Dataset replicated to: {PUBLIC_DATA_PATH}")
 
+    site_dir = args.site_dir or SITE_DATA_DIR
+    profiles = build_profiles()
+    stats = write_sharded_dataset(site_dir, profiles, _portfolio_records(profiles),
+                                  dataset["activeProfileId"], dataset["generatedAt"])
+    _report_shards(site_dir, stats)
+
 
 if __name__ == "__main__":
     main()